@@ -1,9 +1,11 @@
+import asyncio
+import importlib
 import os
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 # from fastapi.middleware.gzip import GZipMiddleware
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
@@ -11,28 +13,33 @@ from slowapi.middleware import SlowAPIMiddleware
 
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from config import LAZY_ROUTERS
 from lifespan import lifespan, limiter
-from security import check_app_auth, get_client_ip, is_ip_blocked
-from src.routes.user_routes import router as user_router
-from src.routes.file_store_routes import router as docs_router
-from src.routes.reference_router import router as reference_router
-from src.routes.chat_routes import router as chat_router
-from src.routes.notification_routes import router as notification_router
-from src.routes.comment_subject_routes import router as comment_subject_router
+from security import admit_request, check_app_auth, get_client_ip
+from src.utils.db_pool_telemetry import SessionHoldTimeMiddleware
 
-from src.routes.counterparty.counterparty_routes import router as counterparty_router
-from src.routes.counterparty.bank_details_routes import router as bank_details_router
 
-from src.routes.application.application_routes import router as application_router
-from src.routes.application.mt_application_routes import router as mt_application_router
-
-from src.routes.commercial_proposal_routes import router as commercial_proposal_router
+# Порядок подключения = порядок сопоставления маршрутов
+ROUTER_MODULES = [
+    "src.routes.user_routes",
+    "src.routes.file_store_routes",
+    "src.routes.reference_router",
+    "src.routes.chat_routes",
+    "src.routes.notification_routes",
+    "src.routes.counterparty.counterparty_routes",
+    "src.routes.application.application_routes",
+    "src.routes.application.mt_application_routes",
+    "src.routes.commercial_proposal_routes",
+    "src.routes.counterparty.bank_details_routes",
+    "src.routes.comment_subject_routes",
+]
 
 
 
 app = FastAPI(
     title="Delcreda WEB",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # Сериализация ответов через orjson (явные JSONResponse в эндпоинтах не затрагиваются)
 )
 
 # Подключение prometheus
@@ -51,8 +58,11 @@ app.add_middleware(SlowAPIMiddleware)
 @app.middleware("http")
 async def block_ip_middleware(request: Request, call_next):
     ip = get_client_ip(request)
-    if await is_ip_blocked(ip):
+    rejection = await admit_request(ip)
+    if rejection == "blocked":
         return JSONResponse(status_code=429, content={"msg": "Too many failed login attempts. Try again later."})
+    if rejection == "rate_limited":
+        return JSONResponse(status_code=429, content={"msg": "Too many requests. Try again later."})
     response = await call_next(request)
     return response
 
@@ -66,6 +76,9 @@ app.add_middleware(
     expose_headers=["Content-Disposition"],
 )
 
+# Метка эндпоинта для времени удержания соединений с БД (db_session_hold_seconds) - внешний middleware
+app.add_middleware(SessionHoldTimeMiddleware)
+
 # Подключение GZipMiddleware
 # app.add_middleware(
 #     GZipMiddleware,
@@ -74,15 +87,33 @@ app.add_middleware(
 # )
 
 # ___________
-app.include_router(user_router)
-app.include_router(docs_router)
-app.include_router(reference_router)
-app.include_router(chat_router)
-app.include_router(notification_router)
-app.include_router(counterparty_router)
-app.include_router(application_router)
-app.include_router(mt_application_router)
-app.include_router(commercial_proposal_router)
-app.include_router(bank_details_router)
-app.include_router(comment_subject_router)
+def include_routers() -> None:
+    for module_path in ROUTER_MODULES:
+        app.include_router(importlib.import_module(module_path).router)
+    app.openapi_schema = None  # Схема OpenAPI пересобирается с учетом подключенных роутеров
+
+
+class LazyRoutersMiddleware:
+    """
+    Подключает роутеры (а вместе с ними сервисы, QaS и pydantic-схемы со справочниками) при первом HTTP/WebSocket запросе,
+    что сокращает время старта воркера и память до первого запроса.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.lock = asyncio.Lock()
+        self.included = False
+    
+    async def __call__(self, scope, receive, send):
+        if not self.included and scope["type"] in ("http", "websocket"):
+            async with self.lock:
+                if not self.included:
+                    include_routers()
+                    self.included = True
+        await self.app(scope, receive, send)
+
+
+if LAZY_ROUTERS:
+    app.add_middleware(LazyRoutersMiddleware)
+else:
+    include_routers()
 # ___________
@@ -43,3 +43,34 @@ TG_CHAT_ID = os.getenv("TG_CHAT_ID")
 SIGNAL_URL = os.getenv("SIGNAL_URL")
 SIGNAL_LOGIN = os.getenv("SIGNAL_LOGIN")
 SIGNAL_PASSWORD = os.getenv("SIGNAL_PASSWORD")
+DOWNLOAD_DIRECTORY_CONCURRENCY = int(os.getenv("DOWNLOAD_DIRECTORY_CONCURRENCY", 4))  # сколько файлов одновременно скачивается из хранилища при выгрузке директории в ZIP
+USER_STORAGE_QUOTA = int(os.getenv("USER_STORAGE_QUOTA", 0))  # квота на Пользователя в байтах (0 - без ограничений)
+DIRECTORY_STORAGE_QUOTA = int(os.getenv("DIRECTORY_STORAGE_QUOTA", 0))  # квота на директорию (вместе с поддиректориями) в байтах (0 - без ограничений)
+STORAGE_CLEANUP_CONCURRENCY = int(os.getenv("STORAGE_CLEANUP_CONCURRENCY", 4))  # сколько объектов одновременно удаляется из хранилища фоновой очередью
+CPU_EXECUTOR_KIND = os.getenv("CPU_EXECUTOR_KIND", "process")  # "process" или "thread" - вид пула для CPU-bound операций
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", 4))  # размер пула для CPU-bound операций (шифрование, хеширование)
+CPU_EXECUTOR_TIMEOUT = float(os.getenv("CPU_EXECUTOR_TIMEOUT", 10))  # сколько секунд запрос ждет результат из пула (0 - без ограничения)
+ADMISSION_RATE_LIMIT = int(os.getenv("ADMISSION_RATE_LIMIT", 0))  # общий лимит запросов с одного IP за окно (0 - без ограничения, остаются лимиты эндпоинтов)
+ADMISSION_RATE_WINDOW_MS = int(os.getenv("ADMISSION_RATE_WINDOW_MS", 1000))  # окно общего лимита запросов в миллисекундах
+LAZY_ROUTERS = bool(int(os.getenv("LAZY_ROUTERS", 0)))  # 1 - роутеры (а с ними сервисы и схемы) импортируются при первом запросе, а не при старте воркера
+ADMISSION_CLEAN_IP_CACHE_TTL = float(os.getenv("ADMISSION_CLEAN_IP_CACHE_TTL", 1))  # сколько секунд не перепроверять в Redis незаблокированный IP (0 - не кешировать)
+REFERENCE_CACHE_MAX_AGE = int(os.getenv("REFERENCE_CACHE_MAX_AGE", 3600))  # сколько секунд клиент хранит справочники (/get_countries) без повторной проверки по ETag
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 0))  # кеш подготовленных выражений asyncpg на соединениях через pgbouncer (0 - выключен; >0 - только при pgbouncer >= 1.21 с max_prepared_statements)
+DB_DIRECT_READS = bool(int(os.getenv("DB_DIRECT_READS", 0)))  # 1 - эндпоинты списков читают напрямую из Postgres (минуя pgbouncer) с кешем подготовленных выражений
+DB_DIRECT_POOL_SIZE = int(os.getenv("DB_DIRECT_POOL_SIZE", 5))  # размер пула прямых соединений с Postgres для чтения
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]  # реплики Postgres для чтения: "host[:port],host[:port]" (пусто - чтение из основной БД)
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", 5))  # реплика с отставанием больше стольких секунд исключается из чтения до следующей проверки
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", 2))  # как часто (в секундах) проверяется отставание реплик
+DB_READ_STICKY_SECONDS = int(os.getenv("DB_READ_STICKY_SECONDS", 10))  # сколько секунд после записи клиента его чтения идут в основную БД (read-your-writes; 0 - выключено)
+DB_POOL_SHED_WAIT = float(os.getenv("DB_POOL_SHED_WAIT", 0))  # сколько секунд запрос ждет соединение из пула БД, затем 503 (0 - ждать pool_timeout движка)
+ERRLOG_QUEUE_SIZE = int(os.getenv("ERRLOG_QUEUE_SIZE", 10_000))  # сколько записей журнала ошибок ждет записи в БД (при переполнении новые записи только выводятся в лог процесса)
+ERRLOG_BATCH_SIZE = int(os.getenv("ERRLOG_BATCH_SIZE", 200))  # сколько записей журнала ошибок пишется одной вставкой
+ERRLOG_FLUSH_INTERVAL = float(os.getenv("ERRLOG_FLUSH_INTERVAL", 1))  # сколько секунд копится пачка записей журнала ошибок
+ERRLOG_ALERT_WINDOW = float(os.getenv("ERRLOG_ALERT_WINDOW", 300))  # одинаковые ошибки (по трассировке) попадают в Telegram не чаще раза за столько секунд - повторы сводятся в одно сообщение
+ERRLOG_ALERT_MAX_PER_MINUTE = int(os.getenv("ERRLOG_ALERT_MAX_PER_MINUTE", 20))  # общий лимит сообщений об ошибках в Telegram в минуту
+ERRLOG_RETENTION_DAYS = int(os.getenv("ERRLOG_RETENTION_DAYS", 90))  # записи журнала ошибок старше стольких дней удаляются: целыми помесячными партициями или, пока таблица не партиционирована, пачками (0 - бессрочно)
+PARTITION_PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", 3))  # на сколько месяцев вперед заранее создаются партиции message, notification и errlog
+MESSAGE_ARCHIVE_AFTER_DAYS = int(os.getenv("MESSAGE_ARCHIVE_AFTER_DAYS", 0))  # партиции сообщений, целиком старше стольких дней, отсоединяются в схему archive (0 - не отсоединяются)
+NOTIFICATION_ARCHIVE_AFTER_DAYS = int(os.getenv("NOTIFICATION_ARCHIVE_AFTER_DAYS", 0))  # партиции уведомлений, целиком старше стольких дней, отсоединяются в схему archive (0 - не отсоединяются)
+PARTITION_CONVERT_EXISTING = bool(int(os.getenv("PARTITION_CONVERT_EXISTING", 0)))  # 1 - при подготовке БД существующие обычные таблицы message, notification и errlog переводятся на партиционирование (перестройка ключа и подключение партиции - в окно обслуживания)
+BUILD_MISSING_INDEXES = bool(int(os.getenv("BUILD_MISSING_INDEXES", 0)))  # 1 - при подготовке БД недостающие индексы моделей на существующих таблицах строятся через CREATE INDEX CONCURRENTLY (0 - только предупреждение в логе)
@@ -1,6 +1,12 @@
+import asyncio
+import itertools
+import logging
+import math
 import urllib.parse
 from collections import defaultdict
+from contextvars import ContextVar
 from typing import Any, AsyncGenerator, Dict, List, Literal, Optional, Set
+from uuid import uuid4
 
 import aioredis
 import aiohttp
@@ -8,16 +14,21 @@ from aiohttp import FormData
 from fastapi import HTTPException, UploadFile, WebSocket, status
 from fastapi.concurrency import asynccontextmanager
 from fastapi.responses import StreamingResponse
-from sqlalchemy import create_engine, URL
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
+from prometheus_client import Gauge
+from sqlalchemy import create_engine, event, text, URL
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session, sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncEngine, AsyncSession
 
 from config import (
     DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME,
     PG_BOUNCER_HOST, PG_BOUNCER_PORT,
+    DB_STATEMENT_CACHE_SIZE, DB_DIRECT_READS, DB_DIRECT_POOL_SIZE,
+    DB_REPLICA_HOSTS, DB_REPLICA_MAX_LAG, DB_REPLICA_LAG_CHECK_INTERVAL, DB_READ_STICKY_SECONDS,
+    DB_POOL_SHED_WAIT,
     REDIS_HOST, REDIS_PORT, REDIS_PASSWORD,
     SIGNAL_URL, SIGNAL_LOGIN, SIGNAL_PASSWORD,
 )
+from src.utils.db_pool_telemetry import InstrumentedAsyncQueuePool
 
 
 class Base(DeclarativeBase):
@@ -61,14 +72,20 @@ sync_engine = create_engine(DATABASE_BOUNCER_DSN_SYNC)
 async_engine = create_async_engine(
     DATABASE_BOUNCER_DSN_ASYNC,
     
+    poolclass=InstrumentedAsyncQueuePool,  # Метрики пула на /metrics (src/utils/db_pool_telemetry.py)
+    pool_logging_name="bouncer",
     pool_size=10,
     max_overflow=20,
-    pool_timeout=70,
+    pool_timeout=DB_POOL_SHED_WAIT or 70,
     pool_pre_ping=True,
     pool_recycle=3600,
     
     connect_args={
-        "prepared_statement_cache_size": 0,  # Должно быть int, а не строка
+        # pgbouncer в transaction mode: до 1.21 подготовленные выражения не переживают смену серверного соединения - кеш выключен (0).
+        # pgbouncer >= 1.21 с max_prepared_statements сам переподготавливает выражения на серверных соединениях -
+        # тогда кеш включается через DB_STATEMENT_CACHE_SIZE, а имена выражений делаются уникальными (без пересечений между клиентами)
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,  # Должно быть int, а не строка
+        "prepared_statement_name_func": (lambda: f"__asyncpg_{uuid4()}__") if DB_STATEMENT_CACHE_SIZE else None,
         "command_timeout": 180,
         "server_settings": {
             "application_name": "delcreda_web_api",
@@ -91,22 +108,130 @@ sync_engine_without_bouncer = create_engine(
 )
 async_engine_without_bouncer = create_async_engine(
     DATABASE_DSN_ASYNC,
+    
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_logging_name="direct",
+    pool_size=DB_DIRECT_POOL_SIZE,
+    max_overflow=DB_DIRECT_POOL_SIZE,
+    pool_timeout=DB_POOL_SHED_WAIT or 70,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    
     connect_args={
+        "prepared_statement_cache_size": 500,  # Прямое соединение с Postgres - выражения кешируются на соединении (разбор и план - один раз)
+        "command_timeout": 180,
         "server_settings": {
             "application_name": "delcreda_web_api"
         }
     },
 )
 
+async_replica_engines: List[AsyncEngine] = [
+    create_async_engine(
+        f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{host if ':' in host else f'{host}:{DB_PORT}'}/{DB_NAME}",
+        
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_logging_name=f"replica_{host}",
+        pool_size=DB_DIRECT_POOL_SIZE,
+        max_overflow=DB_DIRECT_POOL_SIZE,
+        pool_timeout=DB_POOL_SHED_WAIT or 70,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        
+        connect_args={
+            "prepared_statement_cache_size": 500,
+            "command_timeout": 180,
+            "server_settings": {
+                "application_name": "delcreda_web_api"
+            }
+        },
+    ).execution_options(postgresql_readonly=True)
+    for host in DB_REPLICA_HOSTS
+]
+
+# Клиент текущего запроса (UUID пользователя) - ключ read-your-writes при маршрутизации чтения на реплики
+db_client_key: ContextVar[Optional[str]] = ContextVar("db_client_key", default=None)
+
+
+class WriteTrackingSession(Session):
+    """Синхронная часть UnitOfWorkAsyncSession: отмечает в info["has_writes"], что в текущей транзакции были изменения."""
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _mark_flush_write(session: Session, flush_context: Any) -> None:
+    session.info["has_writes"] = True
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _mark_statement_write(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+@event.listens_for(WriteTrackingSession, "after_rollback")
+def _reset_write_mark(session: Session) -> None:
+    session.info.pop("has_writes", None)
+
+
+class UnitOfWorkAsyncSession(AsyncSession):
+    """
+    AsyncSession с режимом единицы работы: внутри блока unit_of_work() вызовы commit() (в т.ч. из QaS-методов)
+    выполняют только flush, а фиксация транзакции происходит один раз - на выходе из внешнего блока.
+    При исключении внутри блока транзакция откатывается целиком.
+    Фиксация транзакции с изменениями включает read-your-writes для клиента запроса (DatabaseRouter).
+    """
+    sync_session_class = WriteTrackingSession
+    
+    async def commit(self) -> None:
+        if self.info.get("unit_of_work_depth"):
+            await self.flush()
+            return
+        await self.__commit()
+    
+    async def __commit(self) -> None:
+        await super().commit()
+        if self.info.pop("has_writes", False):
+            await DatabaseRouter.mark_write()
+    
+    async def release_connection(self) -> None:
+        """
+        Возвращает соединение в пул перед внешним вызовом (DELCREDA SIGNAL): транзакция, в которой были только чтения,
+        завершается (объекты сессии не сбрасываются - expire_on_commit=False), следующий запрос возьмет соединение заново.
+        Внутри unit_of_work() и при незафиксированных изменениях ничего не делает - соединение держится до фиксации.
+        """
+        if (
+            not self.in_transaction()
+            or self.info.get("unit_of_work_depth")
+            or self.info.get("has_writes")
+            or self.new or self.dirty or self.deleted
+        ):
+            return
+        await super().commit()
+    
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncGenerator["UnitOfWorkAsyncSession", None]:
+        self.info["unit_of_work_depth"] = self.info.get("unit_of_work_depth", 0) + 1
+        try:
+            yield self
+        except BaseException:
+            self.info["unit_of_work_depth"] -= 1
+            if not self.info["unit_of_work_depth"]:
+                await self.rollback()
+            raise
+        else:
+            self.info["unit_of_work_depth"] -= 1
+            if not self.info["unit_of_work_depth"]:
+                await self.__commit()
+
+
 sync_session_maker = sessionmaker(sync_engine)
 async_session_maker = async_sessionmaker(
     async_engine,
+    class_=UnitOfWorkAsyncSession,
     expire_on_commit=False,
     autoflush=False,
     autocommit=False,
 )
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_async_session() -> AsyncGenerator[UnitOfWorkAsyncSession, None]:
     async with async_session_maker() as session:
         try:
             yield session
@@ -116,11 +241,50 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+# Сессии эндпоинтов только на чтение (списки): реплика (DatabaseRouter), иначе основная БД -
+# при DB_DIRECT_READS напрямую в Postgres в read-only транзакциях
+async_read_session_maker = async_sessionmaker(
+    async_engine_without_bouncer.execution_options(postgresql_readonly=True) if DB_DIRECT_READS else async_engine,
+    class_=UnitOfWorkAsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    autocommit=False,
+)
+
+async def get_async_read_session() -> AsyncGenerator[UnitOfWorkAsyncSession, None]:
+    async with async_read_session_maker(bind=await DatabaseRouter.get_read_engine()) as session:
+        try:
+            yield session
+        except Exception as e:
+            await session.rollback()
+            raise e
+        finally:
+            await session.close()
+
 
 class RedisConnector:
     DSN_SLOW = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/0"
     DSN_CONN = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/1"
     
+    __shared_pool: Optional[aioredis.Redis] = None
+    __shared_pool_lock = asyncio.Lock()
+    
+    @classmethod
+    async def get_shared_redis_pool(cls) -> aioredis.Redis:
+        """Общий на процесс пул соединений Redis для горячего пути (без создания пула на каждый запрос)."""
+        if cls.__shared_pool is None or cls.__shared_pool.closed:
+            async with cls.__shared_pool_lock:
+                if cls.__shared_pool is None or cls.__shared_pool.closed:
+                    cls.__shared_pool = await aioredis.create_redis_pool(cls.DSN_CONN)
+        return cls.__shared_pool
+    
+    @classmethod
+    async def close_shared_redis_pool(cls) -> None:
+        if cls.__shared_pool is not None:
+            cls.__shared_pool.close()
+            await cls.__shared_pool.wait_closed()
+            cls.__shared_pool = None
+    
     @asynccontextmanager
     @staticmethod
     async def get_async_redis_session() -> AsyncGenerator[aioredis.Redis, None]:
@@ -143,6 +307,90 @@ class RedisConnector:
             await redis_pool.wait_closed()
 
 
+DB_REPLICA_LAG_SECONDS = Gauge("db_replica_lag_seconds", "Отставание реплики Postgres (inf - недоступна)", ["replica"])
+
+class DatabaseRouter:
+    """
+    Маршрутизация сессий чтения между репликами (DB_REPLICA_HOSTS) и основной БД.
+    - Отставание реплик проверяется фоновой задачей раз в DB_REPLICA_LAG_CHECK_INTERVAL секунд;
+      реплика с отставанием больше DB_REPLICA_MAX_LAG (или недоступная) не используется до следующей проверки.
+    - read-your-writes: после фиксации изменений клиентом его чтения DB_READ_STICKY_SECONDS секунд идут в основную БД
+      (метка в Redis - общая для всех воркеров).
+    - Нет подходящих реплик (или задача проверки не запущена) - чтение из основной БД.
+    """
+    LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )  # Не реплика (функции возвращают NULL) - отставание 0: так отдельный Postgres подходит как локальная замена реплики
+    
+    __lags: List[float] = [math.inf] * len(async_replica_engines)
+    __counter = itertools.count()
+    __monitor: Optional[asyncio.Task] = None
+    
+    @classmethod
+    def start(cls) -> None:
+        if async_replica_engines and cls.__monitor is None:
+            cls.__monitor = asyncio.create_task(cls.__monitor_lag())
+    
+    @classmethod
+    async def stop(cls) -> None:
+        if cls.__monitor is not None:
+            cls.__monitor.cancel()
+            await asyncio.gather(cls.__monitor, return_exceptions=True)
+            cls.__monitor = None
+        cls.__lags = [math.inf] * len(async_replica_engines)
+        for engine in async_replica_engines:
+            await engine.dispose()
+    
+    @classmethod
+    async def get_read_engine(cls) -> AsyncEngine:
+        primary = async_read_session_maker.kw["bind"]
+        replicas = [engine for engine, lag in zip(async_replica_engines, cls.__lags) if lag <= DB_REPLICA_MAX_LAG]
+        if not replicas:
+            return primary
+        
+        client_key = db_client_key.get()
+        if client_key is not None and DB_READ_STICKY_SECONDS:
+            try:
+                redis = await RedisConnector.get_shared_redis_pool()
+                if await redis.exists(f"db_sticky:{client_key}"):
+                    return primary
+            except Exception:  # Без Redis нельзя гарантировать read-your-writes - читаем из основной БД
+                return primary
+        
+        return replicas[next(cls.__counter) % len(replicas)]
+    
+    @classmethod
+    async def mark_write(cls) -> None:
+        """Вызывается после фиксации транзакции с изменениями: следующие чтения клиента идут в основную БД."""
+        client_key = db_client_key.get()
+        if not async_replica_engines or not DB_READ_STICKY_SECONDS or client_key is None:
+            return
+        try:
+            redis = await RedisConnector.get_shared_redis_pool()
+            await redis.set(f"db_sticky:{client_key}", 1, expire=DB_READ_STICKY_SECONDS)
+        except Exception as e:
+            logging.warning(f"Не удалось отметить запись клиента {client_key} для read-your-writes: {e}")
+    
+    @classmethod
+    async def __monitor_lag(cls) -> None:
+        while True:
+            cls.__lags = list(await asyncio.gather(*[cls.__check_lag(engine) for engine in async_replica_engines]))
+            for host, lag in zip(DB_REPLICA_HOSTS, cls.__lags):
+                DB_REPLICA_LAG_SECONDS.labels(replica=host).set(lag)
+            await asyncio.sleep(DB_REPLICA_LAG_CHECK_INTERVAL)
+    
+    @classmethod
+    async def __check_lag(cls, engine: AsyncEngine) -> float:
+        async def __query() -> float:
+            async with engine.connect() as connection:
+                return float((await connection.execute(cls.LAG_QUERY)).scalar())
+        
+        try:
+            return await asyncio.wait_for(__query(), timeout=max(DB_REPLICA_LAG_CHECK_INTERVAL, 1))
+        except Exception:  # Недоступная реплика исключается из чтения до следующей проверки
+            return math.inf
+
 class WSConnectionManager:
     def __init__(self):
         # Храним соединения по каналам (channel -> set of websockets)
@@ -380,6 +628,28 @@ class SignalConnector:
             headers=headers
         )
     
+    @classmethod
+    async def iter_s3(
+        cls,
+        
+        path: str,
+        chunk_size: int = 262_144,
+    ) -> AsyncGenerator[bytes, None]:
+        """Потоковое чтение файла из хранилища чанками (без формирования StreamingResponse)."""
+        async with aiohttp.ClientSession(auth=cls.auth) as session:
+            async with session.post(
+                cls.api_url + "file_store/download",
+                params={"path": path},
+                headers={"accept": "application/json"},
+                ssl=False,
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise HTTPException(status_code=response.status, detail=error_text[:200])
+                
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+    
     @classmethod
     async def get_object_info_s3(
         cls,
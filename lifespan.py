@@ -1,20 +1,32 @@
+import time
+
 import aioredis
 from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
+from prometheus_client import Gauge
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from connection_module import Base, sync_engine_without_bouncer, RedisConnector
-from src.models.commercial_proposal_models import CommercialProposalStatus, CommercialProposalType
-from src.models.counterparty.counterparty_models import CounterpartyType
+from config import SECRET_KEY, STORAGE_CLEANUP_CONCURRENCY
+from connection_module import Base, DatabaseRouter, sync_engine_without_bouncer, RedisConnector
+from security import warm_up_encryption_key
+from src.models.commercial_proposal_models import CommercialProposal, CommercialProposalStatus, CommercialProposalType
+from src.models.counterparty.counterparty_models import Counterparty, CounterpartyType
 from src.models.application.mt_models import MTApplicationType
-from src.models.application.application_models import ApplicationStatus, ApplicationType
-from src.models.chat_models import ChatSubject
-from src.models.notification_models import NotificationSubject
-from src.models.file_store_models import Directory, DirectoryType, DocumentType
-from src.models.reference_models import Country, Currency, ServiceNoteSubject
+from src.models.application.application_models import Application, ApplicationStatus, ApplicationType
+from src.models.chat_models import ChatSubject, Message
+from src.models.notification_models import Notification, NotificationSubject
+from src.models.file_store_models import Directory, DirectoryType, Document, DocumentType
+from src.models.reference_models import Country, Currency, ErrLog, ServiceNoteSubject
 from src.models.user_models import Token, UserAccount, UserPrivilege
-from src.utils.preparer_reference_information import prepare_reference
+from src.utils.preparer_reference_information import (
+    compute_schema_version, get_schema_version, schema_preparation_lock, set_schema_version,
+    prepare_directory_closure, prepare_indexes, prepare_notification_uuid_registry, prepare_partitioned_tables, prepare_reference, prepare_storage_usage, refresh_reference_maps,
+)
+from src.utils.cpu_executor import CPUExecutor
+from src.utils.errlog_queue import ErrLogQueue
+from src.utils.partition_maintenance import PartitionMaintenance
+from src.utils.storage_cleanup import StorageCleanupQueue
 from src.utils.reference_mapping_data.app.app_reference_data import COUNTRY, CURRENCY
 from src.utils.reference_mapping_data.user.reference import ADMIN, ADMIN_DIRECTORY, ADMIN_TOKEN, PRIVILEGE, SERVICE_NOTE_SUBJECT
 from src.utils.reference_mapping_data.file_store.reference import DIRECTORY_TYPE
@@ -31,13 +43,13 @@ limiter = Limiter(
     storage_uri=RedisConnector.DSN_SLOW,
 )
 
+STARTUP_SECONDS = Gauge("app_startup_seconds", "Время холодного старта воркера (подготовка БД и фоновых сервисов)", ["schema_prepared"])
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=sync_engine_without_bouncer)
-    
-    redis_conns = aioredis.create_connection(RedisConnector.DSN_CONN)
+    started_at = time.perf_counter()
     
-    for idx, (table, reference) in enumerate(
+    references = list(
         zip(
             [
                 UserPrivilege, Token, UserAccount,
@@ -78,12 +90,55 @@ async def lifespan(app: FastAPI):
                 SERVICE_NOTE_SUBJECT,
             ],
         )
-    ):
-        prepare_reference(
-            table=table,
-            reference_data=reference,
-            first_iteration=True if idx == 0 else False,
-        )
+    )
+    schema_version = compute_schema_version(references=references)
+    
+    schema_prepared = False
+    if get_schema_version() != schema_version:  # Быстрый путь: схема и справочники не менялись - DDL и заполнение пропускаются
+        with schema_preparation_lock():
+            if get_schema_version() != schema_version:  # Пока ждали блокировку, БД мог подготовить другой воркер
+                prepare_partitioned_tables(tables=[Message, Notification, ErrLog])
+                Base.metadata.create_all(bind=sync_engine_without_bouncer)
+                prepare_indexes(
+                    tables=[
+                        Document,
+                        Counterparty,
+                        Application,
+                        CommercialProposal,
+                    ],
+                )
+                
+                for idx, (table, reference) in enumerate(references):
+                    prepare_reference(
+                        table=table,
+                        reference_data=reference,
+                        first_iteration=True if idx == 0 else False,
+                    )
+                
+                prepare_directory_closure()
+                prepare_storage_usage()
+                prepare_notification_uuid_registry()
+                
+                set_schema_version(version=schema_version)
+                schema_prepared = True
+    
+    refresh_reference_maps()
+    
+    redis_conns = aioredis.create_connection(RedisConnector.DSN_CONN)
+    
+    StorageCleanupQueue.start(concurrency=STORAGE_CLEANUP_CONCURRENCY)
+    ErrLogQueue.start()
+    DatabaseRouter.start()
+    await PartitionMaintenance.start()
+    await warm_up_encryption_key(secret_key=SECRET_KEY)
+    
+    STARTUP_SECONDS.labels(schema_prepared=str(schema_prepared).lower()).set(time.perf_counter() - started_at)
     
     yield
+    await StorageCleanupQueue.stop()
+    await ErrLogQueue.stop()
+    await DatabaseRouter.stop()
+    await PartitionMaintenance.stop()
+    CPUExecutor.shutdown()
+    await RedisConnector.close_shared_redis_pool()
     redis_conns.close()
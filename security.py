@@ -1,11 +1,18 @@
+import asyncio
 import base64
+import functools
 import hashlib
 import os
+import time
+from typing import Dict, List, Literal, Optional
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from prometheus_client import Counter, Histogram
+from sqlalchemy.ext.asyncio import AsyncSession
 
 try:
+    from cryptography.exceptions import InvalidTag
     from cryptography.fernet import Fernet
     from cryptography.hazmat.primitives import hashes
     from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -14,29 +21,100 @@ try:
 except ImportError:
     raise Exception('Install "cryptography" Python package to use security utils.')
 
-from connection_module import RedisConnector
+from config import ADMISSION_CLEAN_IP_CACHE_TTL, ADMISSION_RATE_LIMIT, ADMISSION_RATE_WINDOW_MS
+from connection_module import RedisConnector, get_async_session
+from src.utils.cpu_executor import CPUExecutor
 from src.query_and_statement.reference_qas_manager import ReferenceQueryAndStatementManager
+from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager
+from src.schemas.user_schema import ClientState, RequestContext, UserSchema
 
 def __generate_fernet_key(secret_key: str) -> bytes:
     key = hashlib.sha256(secret_key.encode()).digest()
     return base64.urlsafe_b64encode(key)
 
 
+@functools.lru_cache(maxsize=1024)
 def __generate_fernet_key_kdf(secret_key: str, salt: bytes) -> bytes:
     kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000)
     return base64.urlsafe_b64encode(kdf.derive(secret_key.encode("utf-8")))
 
 
-def encrypt(plain_text: str, secret_key: str) -> str:
-    salt = os.urandom(16)
-    key = __generate_fernet_key_kdf(secret_key, salt)
-    f = Fernet(key)
-    return base64.urlsafe_b64encode(
-        salt + f.encrypt(plain_text.encode("utf-8"))
+ENVELOPE_PREFIX = "v2."  # В urlsafe-base64 нет ".", поэтому старые токены (соль + Fernet) с этим префиксом не пересекаются
+ENVELOPE_SALT = b"delcreda_web_api:envelope:v2"
+ENVELOPE_NONCE_SIZE = 12
+
+
+__envelope_keys: Dict[str, bytes] = {}
+__envelope_key_tasks: Dict[str, asyncio.Future] = {}
+__envelope_ciphers: Dict[str, AESGCM] = {}
+
+
+def __derive_envelope_key(secret_key: str) -> bytes:
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=ENVELOPE_SALT, iterations=100000)
+    return kdf.derive(secret_key.encode("utf-8"))
+
+
+def __get_envelope_cipher(secret_key: str) -> AESGCM:
+    """Ключ выводится из SECRET_KEY один раз на процесс (PBKDF2), дальше используется закешированный AES-GCM."""
+    cipher = __envelope_ciphers.get(secret_key)
+    if cipher is None:
+        __envelope_keys[secret_key] = __derive_envelope_key(secret_key)
+        cipher = __envelope_ciphers[secret_key] = AESGCM(__envelope_keys[secret_key])
+    return cipher
+
+
+async def __get_envelope_key_async(secret_key: str) -> bytes:
+    """
+    Ключ из SECRET_KEY для задач CPU-пула: выводится в пуле один раз и хранится в основном процессе.
+    Одновременные запросы до вывода ключа ждут одну задачу, а не ставят PBKDF2 в очередь пула каждый.
+    """
+    key = __envelope_keys.get(secret_key)
+    if key is None:
+        task = __envelope_key_tasks.get(secret_key)
+        if task is None:
+            task = __envelope_key_tasks[secret_key] = asyncio.ensure_future(CPUExecutor.run(__derive_envelope_key, secret_key, timeout=0))
+            task.add_done_callback(lambda _: __envelope_key_tasks.pop(secret_key, None))
+        key = await asyncio.shield(task)
+        if secret_key not in __envelope_keys:
+            __envelope_keys[secret_key] = key
+            __envelope_ciphers[secret_key] = AESGCM(key)
+    return key
+
+
+def __seal(ag: AESGCM, plain_text: str) -> str:
+    nonce = os.urandom(ENVELOPE_NONCE_SIZE)
+    return ENVELOPE_PREFIX + base64.urlsafe_b64encode(
+        nonce + ag.encrypt(nonce, plain_text.encode("utf-8"), None)
     ).decode()
 
 
+def encrypt(plain_text: str, secret_key: str) -> str:
+    return __seal(__get_envelope_cipher(secret_key), plain_text)
+
+
+def encrypt_many(plain_texts: List[str], envelope_key: bytes) -> List[str]:
+    """Задача CPU-пула: шифрует несколько значений уже выведенным ключом - процесс пула не повторяет PBKDF2."""
+    ag = AESGCM(envelope_key)
+    return [__seal(ag, plain_text) for plain_text in plain_texts]
+
+
+async def encrypt_many_async(plain_texts: List[str], secret_key: str) -> List[str]:
+    """Шифрование вне event loop одной задачей CPU-пула на все значения (одна передача между процессами вместо нескольких)."""
+    return await CPUExecutor.run(encrypt_many, plain_texts, await __get_envelope_key_async(secret_key))
+
+
 def decrypt(encrypted_data: str, secret_key: str) -> str:
+    if encrypted_data.startswith(ENVELOPE_PREFIX):
+        encrypted_data_bytes = base64.urlsafe_b64decode(encrypted_data[len(ENVELOPE_PREFIX):])
+        ag = __get_envelope_cipher(secret_key)
+        try:
+            return ag.decrypt(
+                encrypted_data_bytes[:ENVELOPE_NONCE_SIZE], encrypted_data_bytes[ENVELOPE_NONCE_SIZE:], None
+            ).decode("utf-8")
+        except InvalidTag:
+            raise InvalidToken
+    
+    # Старый формат: соль + Fernet (ключ выводится PBKDF2 по соли токена)
     encrypted_data_bytes = base64.urlsafe_b64decode(encrypted_data)
     salt = encrypted_data_bytes[:16]
     key = __generate_fernet_key_kdf(secret_key, salt)
@@ -44,6 +122,12 @@ def decrypt(encrypted_data: str, secret_key: str) -> str:
     return f.decrypt(encrypted_data_bytes[16:]).decode("utf-8")
 
 
+async def warm_up_encryption_key(secret_key: str) -> None:
+    """Выводит ключ шифрования при старте приложения в CPU-пуле, чтобы первый запрос не блокировал event loop."""
+    if secret_key:
+        await __get_envelope_key_async(secret_key)
+
+
 def encrypt_aes_gcm_256(plain_text: str, secret_key: str) -> str:
     nonce = os.urandom(32)
     salt = os.urandom(16)
@@ -71,6 +155,31 @@ InvalidToken = InvalidToken
 MAX_FAILED_ATTEMPTS = 5
 LOCKOUT_TIME_SECONDS = 120  # секунд блокировки
 REDIS_KEY_PREFIX = "auth_fail:"
+REDIS_RATE_KEY_PREFIX = "admission_rate:"
+
+ADMISSION_LATENCY_SECONDS = Histogram("admission_latency_seconds", "Время проверки допуска запроса (блокировка IP и общий лимит)")
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Отклоненные при допуске запросы", ["reason"])
+
+# Проверка блокировки и общий лимит - за один вызов Redis
+# KEYS[1] - счетчик неудачных входов, KEYS[2] - счетчик запросов в окне
+# ARGV[1] - MAX_FAILED_ATTEMPTS, ARGV[2] - лимит запросов (0 - без лимита), ARGV[3] - окно в мс
+ADMISSION_LUA = """
+local fails = tonumber(redis.call('GET', KEYS[1]) or '0')
+if fails >= tonumber(ARGV[1]) then
+    return {1, fails, 0}
+end
+local hits = 0
+if tonumber(ARGV[2]) > 0 then
+    hits = redis.call('INCR', KEYS[2])
+    if hits == 1 then
+        redis.call('PEXPIRE', KEYS[2], ARGV[3])
+    end
+end
+return {0, fails, hits}
+"""
+
+__clean_ips: Dict[str, float] = {}  # IP без неудачных входов -> до какого момента (monotonic) не перепроверять в Redis
+CLEAN_IPS_CACHE_SIZE = 10_000
 
 def get_client_ip(request: Request) -> str:
     forwarded = request.headers.get("X-Forwarded-For")
@@ -78,27 +187,65 @@ def get_client_ip(request: Request) -> str:
         return forwarded.split(",")[0].strip()
     return request.client.host
 
+async def admit_request(ip: str) -> Optional[Literal["blocked", "rate_limited"]]:
+    """
+    Допуск запроса: проверка блокировки IP и общего лимита запросов одним вызовом Redis (Lua).
+    IP без неудачных входов кешируется локально на ADMISSION_CLEAN_IP_CACHE_TTL секунд - при выключенном общем лимите
+    такие запросы в Redis не ходят вовсе. Возвращает причину отказа или None.
+    """
+    started_at = time.perf_counter()
+    try:
+        now = time.monotonic()
+        if not ADMISSION_RATE_LIMIT and __clean_ips.get(ip, 0) > now:
+            return None
+        
+        redis = await RedisConnector.get_shared_redis_pool()
+        blocked, fails, hits = await redis.eval(
+            ADMISSION_LUA,
+            keys=[REDIS_KEY_PREFIX + ip, REDIS_RATE_KEY_PREFIX + ip],
+            args=[MAX_FAILED_ATTEMPTS, ADMISSION_RATE_LIMIT, ADMISSION_RATE_WINDOW_MS],
+        )
+        if blocked:
+            ADMISSION_REJECTED.labels(reason="blocked").inc()
+            return "blocked"
+        
+        if not fails and ADMISSION_CLEAN_IP_CACHE_TTL:
+            if len(__clean_ips) >= CLEAN_IPS_CACHE_SIZE:
+                __clean_ips.clear()
+            __clean_ips[ip] = now + ADMISSION_CLEAN_IP_CACHE_TTL
+        
+        if ADMISSION_RATE_LIMIT and hits > ADMISSION_RATE_LIMIT:
+            ADMISSION_REJECTED.labels(reason="rate_limited").inc()
+            return "rate_limited"
+        
+        return None
+    finally:
+        ADMISSION_LATENCY_SECONDS.observe(time.perf_counter() - started_at)
+
 async def is_ip_blocked(ip: str) -> bool:
-    async with RedisConnector.get_async_redis_session() as redis:
-        key = REDIS_KEY_PREFIX + ip
-        count = await redis.get(key)
-        if count is not None and int(count) >= MAX_FAILED_ATTEMPTS:
-            return True
+    redis = await RedisConnector.get_shared_redis_pool()
+    key = REDIS_KEY_PREFIX + ip
+    count = await redis.get(key)
+    if count is not None and int(count) >= MAX_FAILED_ATTEMPTS:
+        return True
     return False
 
 async def record_failed_attempt(ip: str):
-    async with RedisConnector.get_async_redis_session() as redis:
-        key = REDIS_KEY_PREFIX + ip
-        # Увеличиваем счётчик; если ключа нет — создаём с TTL
-        current = await redis.incr(key)
-        if current == 1:
-            # Устанавливаем TTL только при первом инкременте
-            await redis.expire(key, LOCKOUT_TIME_SECONDS)
+    __clean_ips.pop(ip, None)
+    redis = await RedisConnector.get_shared_redis_pool()
+    key = REDIS_KEY_PREFIX + ip
+    # Увеличиваем счётчик; если ключа нет — создаём с TTL
+    current = await redis.incr(key)
+    if current == 1:
+        # Устанавливаем TTL только при первом инкременте
+        await redis.expire(key, LOCKOUT_TIME_SECONDS)
 
 async def clear_failed_attempts(ip: str):
-    async with RedisConnector.get_async_redis_session() as redis:
-        key = REDIS_KEY_PREFIX + ip
-        await redis.delete(key)
+    if __clean_ips.get(ip, 0) > time.monotonic():  # admit_request только что видел, что неудачных входов нет - удалять нечего
+        return
+    redis = await RedisConnector.get_shared_redis_pool()
+    key = REDIS_KEY_PREFIX + ip
+    await redis.delete(key)
 
 security = HTTPBasic()
 
@@ -122,3 +269,39 @@ async def check_app_auth(
         )
     else:
         await clear_failed_attempts(ip)
+
+async def get_request_context(
+    request: Request,
+    token: str,
+    _: None = Depends(check_app_auth),
+    session: AsyncSession = Depends(get_async_session),
+    
+    client_state: Optional[ClientState] = None,  # То же поле тела, что и client_state эндпоинта (FastAPI разбирает его один раз)
+) -> RequestContext:
+    """
+    Единая зависимость запроса: учетные данные приложения (check_app_auth), пользователь (один запрос к БД в сессии запроса -
+    той же, что получает эндпоинт через get_async_session) и состояние клиента (один конвейер Redis на общем пуле;
+    если клиент передал client_state в теле запроса - без обращения к Redis).
+    Сразу после аутентификации соединение возвращается в пул: эндпоинты списков читают через отдельную сессию чтения
+    (get_async_read_session) и не должны держать второе соединение, остальные возьмут соединение заново при первом запросе.
+    Результат запоминается в request.state на время запроса.
+    Зависимость должна объявляться в эндпоинте до сессии чтения (get_async_read_session) - она учитывает клиента запроса.
+    """
+    context: Optional[RequestContext] = getattr(request.state, "request_context", None)
+    if context is None:
+        user_data: UserSchema = await UserQueryAndStatementManager.authenticate_token(
+            session=session,
+            
+            token=token,
+        )
+        await session.release_connection()
+        if client_state is None:
+            client_state = await UserQueryAndStatementManager.get_client_state(
+                client_uuid=user_data.user_uuid,
+            )
+        context = request.state.request_context = RequestContext(
+            user=user_data,
+            client_state=client_state,
+        )
+    
+    return context
@@ -33,6 +33,10 @@ class Application(Base):
     
     updated_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_application_directory_uuid", directory_uuid),
+    )
 
 class ApplicationType(Base):
     __tablename__ = "application_type"
@@ -29,7 +29,7 @@ class ChatSubject(Base):  # Контрагент, Заявка
 class Message(Base):
     __tablename__ = "message"
     
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)  # Первичный ключ таблицы - (id, created_at): в него обязан входить ключ партиционирования
     
     user_id = Column(Integer, ForeignKey("user_account.id", ondelete="NO ACTION", onupdate="CASCADE"), nullable=False)
     user_uuid = Column(String(length=36), nullable=False)
@@ -39,9 +39,11 @@ class Message(Base):
     
     data = Column(String(length=1000), nullable=False)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), primary_key=True, nullable=False)
     
     __table_args__ = (
         Index("idx_message_chat", chat_id),
-        Index("idx_message_user_uuid", user_uuid)
-    ,)
+        Index("idx_message_user_uuid", user_uuid),
+        {"postgresql_partition_by": "RANGE (created_at)"},  # Помесячные партиции - PartitionMaintenance
+    )
+    __mapper_args__ = {"primary_key": [id]}
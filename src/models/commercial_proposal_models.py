@@ -43,6 +43,10 @@ class CommercialProposal(Base):
     
     updated_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_commercial_proposal_directory_uuid", directory_uuid),
+    )
 
 class CommercialProposalType(Base):
     __tablename__ = "commercial_proposal_type"
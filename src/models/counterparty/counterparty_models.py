@@ -39,6 +39,7 @@ class Counterparty(Base):
             'country', 'identifier_type', 'identifier_value', 
             name='uq_country_id_type_id_value'
         ),
+        Index("idx_counterparty_directory_uuid", directory_uuid),
     )
 
 class CounterpartyType(Base):
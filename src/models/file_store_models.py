@@ -46,6 +46,7 @@ class Document(Base):
     
     __table_args__ = (
         Index("idx_document_uuid", uuid),
+        Index("idx_document_directory_id", directory_id),
         Index("uix_directory_name_not_deleted", directory_uuid, name, unique=True, postgresql_where=and_(is_deleted == False))  # noqa: E712
     ,)
 
@@ -86,6 +87,63 @@ class Directory(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
 
+# Таблица замыкания директорий (все пары предок-потомок, включая саму директорию с depth=0)
+class DirectoryClosure(Base):
+    __tablename__ = "directory_closure"
+    
+    ancestor_id = Column(BigInteger, ForeignKey("directory.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    descendant_id = Column(BigInteger, ForeignKey("directory.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_directory_closure_descendant_id", descendant_id),
+    )
+
+# Занятое место в директории (с учетом всех поддиректорий), обновляется инкрементально
+class DirectoryUsage(Base):
+    __tablename__ = "directory_usage"
+    
+    directory_id = Column(BigInteger, ForeignKey("directory.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    
+    documents_count = Column(BigInteger, server_default="0", nullable=False)
+    size = Column(BigInteger, server_default="0", nullable=False)
+    visible_documents_count = Column(BigInteger, server_default="0", nullable=False)
+    visible_size = Column(BigInteger, server_default="0", nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
+
+# Занятое место Пользователя (по владельцу документа, а при его отсутствии - по загрузившему)
+class UserStorageUsage(Base):
+    __tablename__ = "user_storage_usage"
+    
+    user_uuid = Column(String(length=36), primary_key=True)
+    
+    documents_count = Column(BigInteger, server_default="0", nullable=False)
+    size = Column(BigInteger, server_default="0", nullable=False)
+    visible_documents_count = Column(BigInteger, server_default="0", nullable=False)
+    visible_size = Column(BigInteger, server_default="0", nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
+
+# Задачи удаления из хранилища (outbox): строка добавляется в транзакции удаления из БД и удаляется после успешного вызова SIGNAL (StorageCleanupQueue)
+class StorageCleanupTask(Base):
+    __tablename__ = "storage_cleanup_task"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    
+    kind = Column(String(length=16), nullable=False)  # path - объект хранилища (путь как в БД), s3_user - пользователь хранилища
+    target = Column(String, nullable=False)
+    
+    attempts = Column(Integer, server_default="0", nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # Задача взята воркером - время окончания аренды
+    last_error = Column(Text)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_storage_cleanup_task_next_attempt_at", next_attempt_at),
+    )
+
 class DirectoryType(Base):
     __tablename__ = "directory_type"
     
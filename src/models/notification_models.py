@@ -1,6 +1,6 @@
 
 from sqlalchemy import (
-    Column, Integer, SmallInteger, Text, func, ForeignKey,
+    Column, Integer, SmallInteger, Text, func, ForeignKey, UniqueConstraint,
     Boolean, 
     BigInteger,
     String,
@@ -14,7 +14,7 @@ class Notification(Base):
     __tablename__ = "notification"
     
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    uuid = Column(String(length=36), unique=True, nullable=False)
+    uuid = Column(String(length=36), nullable=False)
     
     for_admin = Column(Boolean, nullable=False)
     subject_id = Column(SmallInteger, ForeignKey("notification_subject.id", ondelete="NO ACTION", onupdate="CASCADE"), nullable=True)
@@ -34,7 +34,20 @@ class Notification(Base):
     is_important = Column(Boolean, nullable=False)
     time_importance_change = Column(DateTime(timezone=True), nullable=True)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), primary_key=True, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('uuid', 'created_at', name='uq_notification_uuid_created_at'),  # Уникальность одного uuid обеспечивает NotificationUUID
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
+# Реестр uuid уведомлений (обычная таблица): уникальность uuid по всем партициям notification держит ее первичный ключ,
+# строки добавляет и удаляет триггер на notification (prepare_notification_uuid_registry)
+class NotificationUUID(Base):
+    __tablename__ = "notification_uuid"
+    
+    uuid = Column(String(length=36), primary_key=True)
 
 class NotificationSubject(Base):
     __tablename__ = "notification_subject"
@@ -36,7 +36,12 @@ class ErrLog(Base):
     
     user_uuid = Column(String(length=36), nullable=False)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), primary_key=True, nullable=False)
+    
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
 
 class ServiceNote(Base):
     __tablename__ = "service_note"
@@ -66,3 +71,12 @@ class ServiceNoteSubject(Base):
     
     name = Column(String)
     description = Column(Text)
+
+# Версия схемы и справочников, с которой была подготовлена БД (при совпадении старт идет без DDL и заполнения справочников)
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    
+    id = Column(SmallInteger, primary_key=True)
+    version = Column(String(length=64), nullable=False)
+    
+    applied_at = Column(DateTime(timezone=True), server_default=func.timezone('UTC', func.current_timestamp()), nullable=False)
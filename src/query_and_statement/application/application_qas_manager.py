@@ -1,11 +1,13 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import and_, delete, select, update
+from sqlalchemy import String, and_, any_, delete, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.chat_models import Chat, Message
 from src.models.application.application_models import Application
 from src.models.application.mt_models import MTApplicationData
+from src.query_and_statement.file_store_qas_manager import FileStoreQueryAndStatementManager
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
 from src.utils.reference_mapping_data.chat.mapping import CHAT_SUBJECT_MAPPING
 
@@ -61,6 +63,43 @@ class ApplicationQueryAndStatementManager:
         
         return result
     
+    @staticmethod
+    async def check_access_many(
+        session: AsyncSession,
+        
+        requester_user_uuid: str,
+        requester_user_privilege: int,
+        
+        application_uuids: List[str],
+        
+        for_update_or_delete_application: bool = False,
+    ) -> Tuple[Dict[str, Tuple[int, int, str]], List[str]]:
+        """Проверка доступа сразу к набору Заявок одним запросом. Возвращает ({uuid: (id, data_id, directory_uuid)} доступных, [uuid] недоступных)."""
+        if not application_uuids:
+            return {}, []
+        
+        _filters = [Application.uuid == any_(literal(list(set(application_uuids)), ARRAY(String)))]
+        
+        if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
+            _filters.append(Application.user_uuid == requester_user_uuid)
+            if for_update_or_delete_application:
+                _filters.append(Application.can_be_updated_by_user == True)  # noqa: E712
+        
+        query = (
+            select(Application.uuid, Application.id, Application.data_id, Application.directory_uuid)
+            .filter(
+                and_(
+                    *_filters
+                )
+            )
+        )
+        
+        response = await session.execute(query)
+        granted: Dict[str, Tuple[int, int, str]] = {row[0]: tuple(row[1:]) for row in response.fetchall()}
+        denied: List[str] = [uuid for uuid in dict.fromkeys(application_uuids) if uuid not in granted]
+        
+        return granted, denied
+    
     @staticmethod
     async def change_applications_edit_status(
         session: AsyncSession,
@@ -157,3 +196,4 @@ class ApplicationQueryAndStatementManager:
         await session.execute(stmt_delete_application_data)
         
         await session.commit()
+        FileStoreQueryAndStatementManager.forget_subjects(subject_uuids=application_uuids)
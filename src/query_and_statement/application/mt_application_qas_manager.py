@@ -2,7 +2,7 @@ import datetime
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple, Literal
 
-from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy import Row, and_, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.user_models import UserAccount
@@ -218,7 +218,7 @@ class MTApplicationQueryAndStatementManager:
         
         filter: Optional[FiltersApplications] = None,
         order: Optional[OrdersApplications] = None,
-    ) -> Dict[str, List[Optional[Application]]|Optional[int]]:
+    ) -> Dict[str, List[Row]|Optional[int]]:
         _filters = []
         
         if user_uuid:
@@ -278,14 +278,30 @@ class MTApplicationQueryAndStatementManager:
             _order_clauses.append(Application.id.asc())
         # ===== КОНЕЦ блока сортировки =====
         
+        # Выбираются только колонки, нужные для вывода списка (строки Row, без ORM-объектов)
+        _columns = (
+            Application.uuid,
+            Application.name,
+            Application.user_id,
+            Application.user_uuid,
+            Application.counterparty_id,
+            Application.counterparty_uuid,
+            Application.directory_id,
+            Application.directory_uuid,
+            Application.status,
+            Application.data_id,
+            Application.can_be_updated_by_user,
+            Application.updated_at,
+            Application.created_at,
+        )
         if extended_output:  # FIXME
             query = (
                 select(
-                    Application,
+                    *_columns,
                     
-                    MTApplicationData.type,
+                    MTApplicationData.type.label("mt_type"),
                     MTApplicationData.priority,
-                    MTApplicationData.updated_at,
+                    MTApplicationData.updated_at.label("data_updated_at"),
                     MTApplicationData.order_name,
                     
                     UserAccount.login,
@@ -312,7 +328,7 @@ class MTApplicationQueryAndStatementManager:
                 )
         else:
             query = (
-                select(Application)
+                select(*_columns)
                 .filter(and_(*_filters))
                 .order_by(*_order_clauses)
             )
@@ -332,24 +348,7 @@ class MTApplicationQueryAndStatementManager:
         total_pages = (total_records + page_size - 1) // page_size if total_records else 0
         
         response = await session.execute(query)
-        
-        if extended_output:
-            data = [{
-                "application": item[0],
-                
-                "type": item[1],
-                "priority": item[2],
-                "updated_at": item[3],
-                "order_name": item[4],
-                
-                "login": item[5],
-                "name_latin": item[6],
-                "name_national": item[7],
-                
-                # TODO тут можно добавить вывод полей (согласовать с Юрием)
-            } for item in response.fetchall()]
-        else:
-            data = [item[0] for item in response.fetchall()]
+        data = response.fetchall()
         
         return {
             "data": data,
@@ -363,7 +362,7 @@ class MTApplicationQueryAndStatementManager:
         
         application_uuid_list: List[Optional[int]],
         counterparty_uuid: Optional[str],
-    ) -> List[Optional[MTApplicationData]]:
+    ) -> List[Row]:
         _filters = []
         
         if application_uuid_list:
@@ -373,7 +372,7 @@ class MTApplicationQueryAndStatementManager:
             _filters.append(Application.counterparty_uuid == counterparty_uuid)
         
         query = (
-            select(MTApplicationData)
+            select(*MTApplicationData.__table__.columns)
             .select_from(MTApplicationData)
             .outerjoin(Application, Application.data_id == MTApplicationData.id)
             .where(
@@ -384,7 +383,7 @@ class MTApplicationQueryAndStatementManager:
         )
         
         response = await session.execute(query)
-        result = [item[0] for item in response.all()]
+        result = response.fetchall()
         return result
     
     @staticmethod
@@ -3,13 +3,15 @@ from pathlib import Path
 from typing import Dict, List, Literal, Optional, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, func, insert, select, delete, update
+from sqlalchemy import String, and_, any_, func, insert, literal, select, delete, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.file_store_models import Document
 from src.models.chat_models import Chat, Message
 from src.schemas.commercial_proposal_schema import FiltersCommercialProposals, OrdersCommercialProposals
 from src.models.commercial_proposal_models import CommercialProposal
+from src.query_and_statement.file_store_qas_manager import FileStoreQueryAndStatementManager
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
 from src.utils.reference_mapping_data.commercial_proposal.mapping import COMMERCIAL_PROPOSAL_STATUS_MAPPING, COMMERCIAL_PROPOSAL_TYPE_MAPPING
 from src.utils.reference_mapping_data.chat.mapping import CHAT_SUBJECT_MAPPING
@@ -242,18 +244,28 @@ class CommercialProposalQueryAndStatementManager:
         commercial_proposal_uuids: Optional[List[str]] = None,
         commercial_proposal_ids: Optional[List[int]] = None,
         
-        counterparty_uuid: Optional[str] = None,
-        application_uuid: Optional[str] = None,
+        counterparty_uuids: Optional[List[str]] = None,
+        application_uuids: Optional[List[str]] = None,
     ) -> None:
-        if not commercial_proposal_uuids and not commercial_proposal_ids:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Для удаления должны быть указаны либо массив UUID, либо массив ID заявок на КП!")
+        if not commercial_proposal_uuids and not commercial_proposal_ids and not counterparty_uuids and not application_uuids:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Для удаления должны быть указаны либо массив UUID, либо массив ID заявок на КП, либо UUID Контрагентов/Заявок!")
         
         if not commercial_proposal_uuids:
+            _cp_filters = []
+            if commercial_proposal_ids:
+                _cp_filters.append(CommercialProposal.id.in_(commercial_proposal_ids))
+            if counterparty_uuids:
+                _cp_filters.append(CommercialProposal.counterparty_uuid.in_(counterparty_uuids))
+            if application_uuids:
+                _cp_filters.append(CommercialProposal.application_uuid.in_(application_uuids))
+            
             query_cp = (select(CommercialProposal.uuid)
-                .filter(CommercialProposal.id.in_(commercial_proposal_ids))
+                .filter(and_(*_cp_filters))
             )
             response_cp = await session.execute(query_cp)
             commercial_proposal_uuids = [item[0] for item in response_cp.all()]
+            if not commercial_proposal_uuids:
+                return
         
         query_chat = (
             select(Chat.id)
@@ -282,16 +294,7 @@ class CommercialProposalQueryAndStatementManager:
             delete(Chat)
             .filter(Chat.id.in_(chat_ids))
         )
-        _filters = []
-        
-        if commercial_proposal_uuids:
-            _filters.append(CommercialProposal.uuid.in_(commercial_proposal_uuids))
-        
-        if counterparty_uuid:
-            _filters.append(CommercialProposal.counterparty_uuid == counterparty_uuid)
-        
-        if application_uuid:
-            _filters.append(CommercialProposal.application_uuid == application_uuid)
+        _filters = [CommercialProposal.uuid.in_(commercial_proposal_uuids)]
         
         stmt_del_cps = (
             delete(CommercialProposal)
@@ -307,6 +310,7 @@ class CommercialProposalQueryAndStatementManager:
         await session.execute(stmt_del_cps)
         
         await session.commit()
+        FileStoreQueryAndStatementManager.forget_subjects(subject_uuids=commercial_proposal_uuids)
     
     @staticmethod
     async def check_access(
@@ -338,3 +342,39 @@ class CommercialProposalQueryAndStatementManager:
         result = response.one_or_none()
         
         return result
+    
+    @staticmethod
+    async def check_access_many(
+        session: AsyncSession,
+        
+        requester_user_uuid: str,
+        requester_user_privilege: int,
+        
+        commercial_proposal_uuids: List[str],
+        
+        for_update_or_delete_commercial_proposal: bool = False,
+    ) -> Tuple[Dict[str, Tuple[int, str]], List[str]]:
+        """Проверка доступа сразу к набору заявок на КП одним запросом. Возвращает ({uuid: (id, directory_uuid)} доступных, [uuid] недоступных)."""
+        if not commercial_proposal_uuids:
+            return {}, []
+        
+        _filters = [CommercialProposal.uuid == any_(literal(list(set(commercial_proposal_uuids)), ARRAY(String)))]
+        
+        if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
+            _filters.append(CommercialProposal.user_uuid == requester_user_uuid)
+            if for_update_or_delete_commercial_proposal:
+                _filters.append(CommercialProposal.can_be_updated_by_user == True)  # noqa: E712
+        
+        query = (
+            select(CommercialProposal.uuid, CommercialProposal.id, CommercialProposal.directory_uuid, )
+            .filter(
+                and_(
+                    *_filters
+                )
+            )
+        )
+        response = await session.execute(query)
+        granted: Dict[str, Tuple[int, str]] = {row[0]: tuple(row[1:]) for row in response.fetchall()}
+        denied: List[str] = [uuid for uuid in dict.fromkeys(commercial_proposal_uuids) if uuid not in granted]
+        
+        return granted, denied
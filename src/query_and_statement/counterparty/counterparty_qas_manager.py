@@ -1,16 +1,19 @@
 import datetime
-from typing import Dict, List, Literal, Optional, Tuple
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
-from sqlalchemy import and_, func, or_, select, update, delete
+from sqlalchemy import BigInteger, Row, String, and_, any_, func, literal, or_, select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 
 from src.models.chat_models import Chat, Message
+from src.models.commercial_proposal_models import CommercialProposal
+from src.models.file_store_models import Directory
 from src.models.application.mt_models import MTApplicationData
 from src.models.application.application_models import Application
 from src.schemas.counterparty.counterparty_schema import CreateIndividualDataSchema, CreateLegalEntityDataSchema, FiltersCounterparties, OrdersCounterparties, FiltersPersons, OrdersPersons, CreatePersonsSchema, UpdateCounterpartySchema, UpdateIndividualDataSchema, UpdateLegalEntityDataSchema
 from src.models.counterparty.bank_details_models import BankDetails
 from src.models.counterparty.counterparty_models import Counterparty, IndividualData, LegalEntityData, ApplicationAccessList, Person
+from src.query_and_statement.file_store_qas_manager import FileStoreQueryAndStatementManager
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
 from src.utils.reference_mapping_data.app.app_mapping_data import COUNTRY_MAPPING
 from src.utils.reference_mapping_data.application.mapping import APPLICATION_TYPE_MAPPING
@@ -129,7 +132,7 @@ class CounterpartyQueryAndStatementManager:
         
         filter: Optional[FiltersCounterparties] = None,
         order: Optional[OrdersCounterparties] = None,
-    ) -> Dict[str, List[Optional[Counterparty|int|bool]] | List[Optional[Tuple[Counterparty, bool]]]]:
+    ) -> Dict[str, List[Row]|Optional[int]]:
         _filters = []
         
         if user_uuid:
@@ -184,20 +187,38 @@ class CounterpartyQueryAndStatementManager:
             _order_clauses.append(Counterparty.id.asc())
         # ===== КОНЕЦ блока сортировки =====
         
+        # Выбираются только колонки, нужные для вывода списка (строки Row, без ORM-объектов)
+        _columns = (
+            Counterparty.uuid,
+            Counterparty.country,
+            Counterparty.identifier_type,
+            Counterparty.identifier_value,
+            Counterparty.tax_identifier,
+            Counterparty.user_id,
+            Counterparty.user_uuid,
+            Counterparty.directory_id,
+            Counterparty.directory_uuid,
+            Counterparty.data_id,
+            Counterparty.can_be_updated_by_user,
+            Counterparty.application_access_list,
+            Counterparty.is_active,
+            Counterparty.updated_at,
+            Counterparty.created_at,
+            
+            ApplicationAccessList.mt,
+        )
         if extended_output:
             if counterparty_type == "ЮЛ":
                 query = (
                     select(
-                        Counterparty,
+                        *_columns,
                         
                         LegalEntityData.name_latin,
                         LegalEntityData.name_national,
                         LegalEntityData.organizational_and_legal_form_latin,
                         LegalEntityData.organizational_and_legal_form_national,
-                        LegalEntityData.updated_at,
+                        LegalEntityData.updated_at.label("data_updated_at"),
                         # TODO тут можно добавить вывод полей (согласовать с Юрием)
-                        
-                        ApplicationAccessList.mt,
                     )
                     .outerjoin(LegalEntityData, Counterparty.data_id == LegalEntityData.id)
                     .outerjoin(ApplicationAccessList, Counterparty.application_access_list == ApplicationAccessList.id)
@@ -217,7 +238,7 @@ class CounterpartyQueryAndStatementManager:
                 ...  # TODO тут логика для комбинированного набора данных
         else:
             query = (
-                select(Counterparty, ApplicationAccessList.mt)
+                select(*_columns)
                 .outerjoin(ApplicationAccessList, Counterparty.application_access_list == ApplicationAccessList.id)
                 .filter(and_(*_filters))
                 .order_by(*_order_clauses)
@@ -237,26 +258,7 @@ class CounterpartyQueryAndStatementManager:
         total_pages = (total_records + page_size - 1) // page_size if total_records else 0
         
         response = await session.execute(query)
-        if extended_output:
-            if counterparty_type == "ЮЛ":
-                data = [{
-                    "counterparty": item[0],
-                    
-                    "name_latin": item[1],
-                    "name_national": item[2],
-                    "organizational_and_legal_form_latin": item[3],
-                    "organizational_and_legal_form_national": item[4],
-                    "updated_at": item[5],
-                    # TODO тут можно добавить вывод полей (согласовать с Юрием)
-                    
-                    "mt": item[6],
-                } for item in response.fetchall()]
-            elif counterparty_type == "ФЛ":
-                ...  # TODO тут логики для
-            else:
-                ...  # TODO тут логика для комбинированного набора данных
-        else:
-            data = [(item[0], item[1]) for item in response.fetchall()]  # FIXME при вводе ФЛ тут нужны будут правки
+        data = response.fetchall()  # FIXME при вводе ФЛ тут нужны будут правки
         
         return {
             "data": data,
@@ -410,6 +412,47 @@ class CounterpartyQueryAndStatementManager:
         
         return result
     
+    @staticmethod
+    async def check_access_many(
+        session: AsyncSession,
+        
+        requester_user_uuid: str,
+        requester_user_privilege: int,
+        
+        counterparty_uuids: List[str],
+        
+        for_create_application: bool = False,
+        for_update_or_delete_counterparty: bool = False,
+    ) -> Tuple[Dict[str, Tuple[int, int, int, str]], List[str]]:
+        """Проверка доступа сразу к набору Контрагентов одним запросом. Возвращает ({uuid: (id, type, data_id, directory_uuid)} доступных, [uuid] недоступных)."""
+        if not counterparty_uuids:
+            return {}, []
+        
+        _filters = [Counterparty.uuid == any_(literal(list(set(counterparty_uuids)), ARRAY(String)))]
+        
+        if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
+            _filters.append(Counterparty.user_uuid == requester_user_uuid)
+            if for_update_or_delete_counterparty:
+                _filters.append(Counterparty.can_be_updated_by_user == True)  # noqa: E712
+        
+        if for_create_application:
+            _filters.append(Counterparty.is_active == True)  # noqa: E712
+        
+        query = (
+            select(Counterparty.uuid, Counterparty.id, Counterparty.type, Counterparty.data_id, Counterparty.directory_uuid,)
+            .filter(
+                and_(
+                    *_filters
+                )
+            )
+        )
+        
+        response = await session.execute(query)
+        granted: Dict[str, Tuple[int, int, int, str]] = {row[0]: tuple(row[1:]) for row in response.fetchall()}
+        denied: List[str] = [uuid for uuid in dict.fromkeys(counterparty_uuids) if uuid not in granted]
+        
+        return granted, denied
+    
     @staticmethod
     async def update_counterparty_data(
         session: AsyncSession,
@@ -449,125 +492,147 @@ class CounterpartyQueryAndStatementManager:
         await session.commit()
     
     @staticmethod
-    async def delete_counterparties(
+    async def get_counterparty_ids_by_user_uuids(
         session: AsyncSession,
         
-        counterparty_uuids: List[str],
-        counterparty_ids_with_counterparty_type_ids_with_counterparty_data_ids_with_dir_uuid: List[Tuple[int, int, int, str]],
-    ) -> None:
-        counterparty_ids = [counterparty_id for counterparty_id, _, _, _ in counterparty_ids_with_counterparty_type_ids_with_counterparty_data_ids_with_dir_uuid]
-        
-        counterparty_ids_with_type_ids = [(counterparty_id, counterparty_type_id) for counterparty_id, counterparty_type_id, _, _ in counterparty_ids_with_counterparty_type_ids_with_counterparty_data_ids_with_dir_uuid]
-        counterparty_le_ids = [le_id for le_id, counterparty_type_id in counterparty_ids_with_type_ids if counterparty_type_id == COUNTERPARTY_TYPE_MAPPING["ЮЛ"]]
-        counterparty_individual_ids = [individual_id for individual_id, counterparty_type_id in counterparty_ids_with_type_ids if counterparty_type_id == COUNTERPARTY_TYPE_MAPPING["ФЛ"]]
+        user_uuids: List[str],
+    ) -> List[int]:
+        query = (
+            select(Counterparty.id)
+            .filter(Counterparty.user_uuid == any_(literal(list(set(user_uuids)), ARRAY(String))))
+        )
+        response = await session.execute(query)
         
-        application_ids = []
+        return list(response.scalars().all())
+    
+    @staticmethod
+    async def get_counterparties_deletion_graph(
+        session: AsyncSession,
         
-        query_chat = (
-            select(Chat.id)
-            .filter(
-                and_(
-                    Chat.chat_subject_id == CHAT_SUBJECT_MAPPING["Контрагент"],
-                    Chat.subject_uuid.in_(counterparty_uuids),
-                )
+        counterparty_ids: List[int],
+    ) -> Dict[str, Any]:
+        """
+        Собирает граф зависимостей удаляемых Контрагентов (Заявки, Заявки на КП, директории) несколькими set-запросами,
+        независимо от количества Контрагентов.
+        """
+        counterparty_ids_array = literal(list(set(counterparty_ids)), ARRAY(BigInteger))
+        
+        query_counterparty = (
+            select(
+                Counterparty.id, Counterparty.uuid, Counterparty.type, Counterparty.data_id,
+                Counterparty.directory_id, Counterparty.application_access_list,
             )
+            .filter(Counterparty.id == any_(counterparty_ids_array))
         )
-        response_chat = await session.execute(query_chat)
-        chat_ids = [item[0] for item in response_chat.all()]
+        response_counterparty = await session.execute(query_counterparty)
+        counterparties = response_counterparty.all()
         
-        query_msg = (
-            select(Message.id)
-            .filter(Message.chat_id.in_(chat_ids))
+        query_application = (
+            select(Application.id, Application.uuid, Application.type, Application.data_id, Application.directory_id)
+            .filter(Application.counterparty_id == any_(counterparty_ids_array))
         )
-        response_msg = await session.execute(query_msg)
-        msg_ids = [item[0] for item in response_msg.all()]
+        response_application = await session.execute(query_application)
+        applications = response_application.all()
         
-        stmt_del_msgs = (
-            delete(Message)
-            .filter(Message.id.in_(msg_ids))
-        )
-        stmt_del_chats = (
-            delete(Chat)
-            .filter(Chat.id.in_(chat_ids))
-        )
+        counterparty_uuids = [counterparty.uuid for counterparty in counterparties]
+        application_uuids = [application.uuid for application in applications]
         
-        # MT
-        query_application_and_application_data_ids_from_MT = (
-            select(Application.id, Application.data_id)
-            .where(
-                and_(
-                    Application.type == APPLICATION_TYPE_MAPPING["MT"],
-                    Application.counterparty_id.in_(counterparty_ids),
+        query_commercial_proposal = (
+            select(CommercialProposal.id, CommercialProposal.uuid, CommercialProposal.directory_id)
+            .filter(
+                or_(
+                    CommercialProposal.counterparty_uuid == any_(literal(counterparty_uuids, ARRAY(String))),
+                    CommercialProposal.application_uuid == any_(literal(application_uuids, ARRAY(String))),
                 )
             )
         )
-        # ...  TODO тут будут другие бизнес-направления
-        
-        # MT
-        result_MT = await session.execute(query_application_and_application_data_ids_from_MT)
-        # ...  TODO тут будут другие бизнес-направления
-        
-        # MT
-        application_and_application_data_ids_MT: List[Tuple[int, int]] = [ids for ids in result_MT.all()]
-        # ...  TODO тут будут другие бизнес-направления
-        
-        # MT
-        application_ids_from_MT = [ids[0] for ids in application_and_application_data_ids_MT]
-        application_data_ids_from_MT = [ids[1] for ids in application_and_application_data_ids_MT]
-        # ...  TODO тут будут другие бизнес-направления
-        
-        application_ids.extend(application_ids_from_MT)
-        
-        stmt_delete_counterparty_bank_details = (
-            delete(BankDetails)
-            .where(BankDetails.counterparty_uuid.in_(counterparty_uuids))
-        )
-        
-        stmt_delete_counterparty_persons = (
-            delete(Person)
-            .where(Person.counterparty_uuid.in_(counterparty_uuids))
-        )
-        
-        stmt_delete_applications = (
-            delete(Application)
-            .where(Application.id.in_(application_ids))
-        )
-        
-        # MT
-        if application_data_ids_from_MT:
-            stmt_delete_applications_data_from_MT = (
-                delete(MTApplicationData)
-                .where(MTApplicationData.id.in_(application_data_ids_from_MT))
+        response_commercial_proposal = await session.execute(query_commercial_proposal)
+        commercial_proposals = response_commercial_proposal.all()
+        
+        directory_ids = list(set(
+            [counterparty.directory_id for counterparty in counterparties]
+            + [application.directory_id for application in applications]
+            + [commercial_proposal.directory_id for commercial_proposal in commercial_proposals]
+        ))
+        query_directory = (
+            select(Directory.id, Directory.path)
+            .filter(
+                and_(
+                    Directory.id == any_(literal(directory_ids, ARRAY(BigInteger))),
+                    Directory.is_deleted.is_not(True),
+                )
             )
-        # ...  TODO тут будут другие бизнес-направления
-        stmt_delete_counterparty_data_le = (
-            delete(LegalEntityData)
-            .where(LegalEntityData.id.in_(counterparty_le_ids))
         )
+        response_directory = await session.execute(query_directory)
+        directories = response_directory.all()
         
-        stmt_delete_counterparty_data_individual = (
-            delete(IndividualData)
-            .where(IndividualData.id.in_(counterparty_individual_ids))
-        )
-        stmt_delete_counterparty = (
-            delete(Counterparty)
-            .where(Counterparty.id.in_(counterparty_ids))
+        return {
+            "counterparty_ids": [counterparty.id for counterparty in counterparties],
+            "counterparty_uuids": counterparty_uuids,
+            "legal_entity_data_ids": [counterparty.data_id for counterparty in counterparties if counterparty.type == COUNTERPARTY_TYPE_MAPPING["ЮЛ"]],
+            "individual_data_ids": [counterparty.data_id for counterparty in counterparties if counterparty.type == COUNTERPARTY_TYPE_MAPPING["ФЛ"]],
+            "applications_access_lists_ids": [counterparty.application_access_list for counterparty in counterparties if counterparty.application_access_list is not None],
+            
+            "application_ids": [application.id for application in applications],
+            "application_uuids": application_uuids,
+            # MT
+            "mt_application_data_ids": [application.data_id for application in applications if application.type == APPLICATION_TYPE_MAPPING["MT"]],
+            # ...  TODO тут будут другие бизнес-направления
+            
+            "commercial_proposal_ids": [commercial_proposal.id for commercial_proposal in commercial_proposals],
+            "commercial_proposal_uuids": [commercial_proposal.uuid for commercial_proposal in commercial_proposals],
+            
+            "directory_ids": [directory.id for directory in directories],
+            "directory_paths": [directory.path for directory in directories],
+        }
+    
+    @staticmethod
+    async def delete_counterparties(
+        session: AsyncSession,
+        
+        deletion_graph: Dict[str, Any],
+    ) -> None:
+        """Удаляет Контрагентов и все зависимые записи (граф из get_counterparties_deletion_graph) в порядке зависимостей, по одному DELETE на таблицу."""
+        def __array(key: str, type_: Any = BigInteger) -> Any:
+            return any_(literal(deletion_graph[key], ARRAY(type_)))
+        
+        chat_filter = or_(
+            and_(
+                Chat.chat_subject_id == CHAT_SUBJECT_MAPPING["Контрагент"],
+                Chat.subject_uuid == __array("counterparty_uuids", String),
+            ),
+            and_(
+                Chat.chat_subject_id == CHAT_SUBJECT_MAPPING["Заявка"],
+                Chat.subject_uuid == __array("application_uuids", String),
+            ),
+            and_(
+                Chat.chat_subject_id == CHAT_SUBJECT_MAPPING["Заявка на КП"],
+                Chat.subject_uuid == __array("commercial_proposal_uuids", String),
+            ),
         )
         
-        await session.execute(stmt_del_msgs)
-        await session.execute(stmt_del_chats)
-        await session.execute(stmt_delete_counterparty_bank_details)
-        await session.execute(stmt_delete_counterparty_persons)
-        await session.execute(stmt_delete_applications)
-        # MT
-        if application_data_ids_from_MT:
-            await session.execute(stmt_delete_applications_data_from_MT)
-        # ...  TODO тут будут другие бизнес-направления
-        await session.execute(stmt_delete_counterparty)
-        await session.execute(stmt_delete_counterparty_data_le)
-        await session.execute(stmt_delete_counterparty_data_individual)
+        stmts = [
+            delete(Message).filter(Message.chat_id.in_(select(Chat.id).filter(chat_filter))),
+            delete(Chat).filter(chat_filter),
+            delete(CommercialProposal).filter(CommercialProposal.id == __array("commercial_proposal_ids")),
+            delete(BankDetails).filter(BankDetails.counterparty_uuid == __array("counterparty_uuids", String)),
+            delete(Person).filter(Person.counterparty_uuid == __array("counterparty_uuids", String)),
+            delete(Application).filter(Application.id == __array("application_ids")),
+            # MT
+            delete(MTApplicationData).filter(MTApplicationData.id == __array("mt_application_data_ids")),
+            # ...  TODO тут будут другие бизнес-направления
+            delete(Counterparty).filter(Counterparty.id == __array("counterparty_ids")),
+            delete(LegalEntityData).filter(LegalEntityData.id == __array("legal_entity_data_ids")),
+            delete(IndividualData).filter(IndividualData.id == __array("individual_data_ids")),
+            delete(ApplicationAccessList).filter(ApplicationAccessList.id == __array("applications_access_lists_ids")),
+        ]
+        for stmt in stmts:
+            await session.execute(stmt)
         
         await session.commit()
+        FileStoreQueryAndStatementManager.forget_subjects(
+            subject_uuids=deletion_graph["counterparty_uuids"] + deletion_graph["application_uuids"] + deletion_graph["commercial_proposal_uuids"],
+        )
     
     @staticmethod
     async def delete_applications_access_lists(
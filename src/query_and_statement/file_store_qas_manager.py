@@ -1,17 +1,19 @@
 import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from fastapi import HTTPException
 from fastapi import status
-from sqlalchemy import and_, func, select, update
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import BigInteger, Row, String, and_, any_, delete, exists, func, literal, or_, select, union_all, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from connection_module import async_session_maker
 from src.models.commercial_proposal_models import CommercialProposal
 from src.models.counterparty.counterparty_models import Counterparty
 from src.models.application.application_models import Application
 from src.schemas.file_store_schema import FiltersUserDirsInfo, FiltersUserFilesInfo, OrdersUserDirsInfo, OrdersUserFilesInfo
-from src.models.file_store_models import Document, Directory
+from src.models.file_store_models import Document, Directory, DirectoryClosure, DirectoryUsage, StorageCleanupTask, UserStorageUsage
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
 from src.utils.reference_mapping_data.file_store.mapping import FILE_STORE_SUBJECT_MAPPING
@@ -19,6 +21,9 @@ from src.utils.reference_mapping_data.file_store.mapping import FILE_STORE_SUBJE
 
 
 class FileStoreQueryAndStatementManager:
+    __subject_by_directory_uuid_cache: Dict[str, Tuple[int, str]] = {}  # принадлежность директории субъекту не меняется
+    __SUBJECT_BY_DIRECTORY_UUID_CACHE_SIZE = 10_000
+    
     @staticmethod
     async def get_subject_info_by_directory_uuid(
         session: AsyncSession,
@@ -28,37 +33,37 @@ class FileStoreQueryAndStatementManager:
         if not directory_uuid:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Для получения информации о субъекте по директории - должен быть указан uuid директории!")
         
-        query_counterparty = (
-            select(Counterparty.uuid)
-            .filter(Counterparty.directory_uuid == directory_uuid)
-        )
-        response_counterparty = await session.execute(query_counterparty)
-        subject_uuid = response_counterparty.scalar_one_or_none()
-        
-        if subject_uuid:
-            return FILE_STORE_SUBJECT_MAPPING["Контрагент"], subject_uuid
-        
-        query_commercial_proposal = (
-            select(CommercialProposal.uuid)
-            .filter(CommercialProposal.directory_uuid == directory_uuid)
-        )
-        response_commercial_proposal = await session.execute(query_commercial_proposal)
-        subject_uuid = response_commercial_proposal.scalar_one_or_none()
-        
-        if subject_uuid:
-            return FILE_STORE_SUBJECT_MAPPING["Заявка на КП"], subject_uuid
+        cache = FileStoreQueryAndStatementManager.__subject_by_directory_uuid_cache
+        if directory_uuid in cache:
+            return cache[directory_uuid]
+        
+        query = union_all(
+            select(literal(FILE_STORE_SUBJECT_MAPPING["Контрагент"]), Counterparty.uuid)
+            .filter(Counterparty.directory_uuid == directory_uuid),
+            select(literal(FILE_STORE_SUBJECT_MAPPING["Заявка на КП"]), CommercialProposal.uuid)
+            .filter(CommercialProposal.directory_uuid == directory_uuid),
+            select(literal(FILE_STORE_SUBJECT_MAPPING["Заявка"]), Application.uuid)
+            .filter(Application.directory_uuid == directory_uuid),
+        ).limit(1)
+        response = await session.execute(query)
+        subject_info = response.first()
         
-        query_application = (
-            select(Application.uuid)
-            .filter(Application.directory_uuid == directory_uuid)
-        )
-        response_application = await session.execute(query_application)
-        subject_uuid = response_application.scalar_one_or_none()
+        if subject_info is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="По данному UUID-директории не найдены субъекты!")
         
-        if subject_uuid:
-            return FILE_STORE_SUBJECT_MAPPING["Заявка"], subject_uuid
+        if len(cache) >= FileStoreQueryAndStatementManager.__SUBJECT_BY_DIRECTORY_UUID_CACHE_SIZE:
+            cache.pop(next(iter(cache)))
+        cache[directory_uuid] = (subject_info[0], subject_info[1])
         
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="По данному UUID-директории не найдены субъекты!")
+        return cache[directory_uuid]
+    
+    @staticmethod
+    def forget_subjects(subject_uuids: List[str]) -> None:
+        """Убирает из кеша get_subject_info_by_directory_uuid директории удаленных субъектов (Контрагентов, Заявок, Заявок на КП)."""
+        cache = FileStoreQueryAndStatementManager.__subject_by_directory_uuid_cache
+        subject_uuids = set(subject_uuids)
+        for directory_uuid in [directory_uuid for directory_uuid, (_, subject_uuid) in cache.items() if subject_uuid in subject_uuids]:
+            del cache[directory_uuid]
     
     @staticmethod
     async def check_access(
@@ -100,6 +105,39 @@ class FileStoreQueryAndStatementManager:
         result = response.scalar()
         return result
     
+    @staticmethod
+    async def check_access_many(
+        session: AsyncSession,
+        
+        requester_user_uuid: str,
+        requester_user_privilege: int,
+        
+        uuids: List[str],
+        is_document: bool,
+    ) -> Tuple[Dict[str, int], List[str]]:
+        """Проверка доступа сразу к набору файлов/директорий одним запросом. Возвращает ({uuid: id} доступных, [uuid] недоступных)."""
+        if not uuids:
+            return {}, []
+        
+        table = Document if is_document else Directory
+        
+        _filters = [table.uuid == any_(literal(list(set(uuids)), ARRAY(String)))]
+        if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
+            _filters.append(table.owner_user_uuid == requester_user_uuid)
+        
+        query = (
+            select(table.uuid, table.id)
+            .filter(
+                and_(
+                    *_filters
+                )
+            )
+        )
+        response = await session.execute(query)
+        granted: Dict[str, int] = {row[0]: row[1] for row in response.fetchall()}
+        denied: List[str] = [uuid for uuid in dict.fromkeys(uuids) if uuid not in granted]
+        return granted, denied
+    
     @staticmethod
     async def get_dir_or_doc_id_by_uuid(
         session: AsyncSession,
@@ -144,10 +182,33 @@ class FileStoreQueryAndStatementManager:
             )
             .returning(Directory.id)
         )
-        dir_id = await session.execute(stmt)
+        dir_id = (await session.execute(stmt)).scalar()
+        
+        # Таблица замыкания: все предки родителя + сама директория
+        closure_rows = select(
+            literal(dir_id, BigInteger).label("ancestor_id"),
+            literal(dir_id, BigInteger).label("descendant_id"),
+            literal(0).label("depth"),
+        )
+        if parent_dir_id is not None:
+            closure_rows = union_all(
+                closure_rows,
+                select(
+                    DirectoryClosure.ancestor_id,
+                    literal(dir_id, BigInteger),
+                    DirectoryClosure.depth + 1,
+                )
+                .filter(DirectoryClosure.descendant_id == parent_dir_id),
+            )
+        stmt_closure = (
+            insert(DirectoryClosure)
+            .from_select(["ancestor_id", "descendant_id", "depth"], closure_rows)
+            .on_conflict_do_nothing()
+        )
+        await session.execute(stmt_closure)
         await session.commit()
         
-        return dir_id.scalar()
+        return dir_id
     
     @staticmethod
     async def get_dir_info(
@@ -279,6 +340,12 @@ class FileStoreQueryAndStatementManager:
             )
         )
         await session.execute(stmt)
+        await FileStoreQueryAndStatementManager.__apply_storage_usage(
+            session=session,
+            
+            doc_filters=[Document.uuid == doc_info_data.get("uuid")],
+            sign=1,
+        )
         await session.commit()
     
     @staticmethod
@@ -296,7 +363,7 @@ class FileStoreQueryAndStatementManager:
         
         filter: Optional[FiltersUserFilesInfo] = None,
         order: Optional[OrdersUserFilesInfo] = None,
-    ) -> Dict[str, List[Optional[Document]]|Optional[int]]:
+    ) -> Dict[str, List[Row]|Optional[int]]:
         _filters = []
         if owner_user_uuid:
             _filters.append(Document.owner_user_uuid == owner_user_uuid)
@@ -356,7 +423,7 @@ class FileStoreQueryAndStatementManager:
         # ===== КОНЕЦ блока сортировки =====
         
         query = (
-            select(Document)
+            select(*Document.__table__.columns)  # Строки Row вместо ORM-объектов (только чтение)
             .filter(and_(*_filters))
             .order_by(*_order_clauses)
         )
@@ -376,13 +443,86 @@ class FileStoreQueryAndStatementManager:
         total_pages = (total_records + page_size - 1) // page_size if total_records else 0
         
         response = await session.execute(query)
-        data = [item[0] for item in response.fetchall()]
+        data = response.fetchall()
         return {
             "data": data,
             "total_records": total_records,
             "total_pages": total_pages,
         }
     
+    @staticmethod
+    async def get_dir_tree_docs(
+        session: AsyncSession,
+        
+        directory_id: int,
+        owner_user_uuid: Optional[str] = None,
+        visible: Optional[bool] = None,
+    ) -> List[Tuple[str, str, Optional[datetime.datetime]]]:
+        """Возвращает (uuid, path, created_at) всех неудаленных документов директории и ее поддиректорий одним запросом (по таблице замыкания)."""
+        subtree = (
+            select(DirectoryClosure.descendant_id)
+            .filter(DirectoryClosure.ancestor_id == directory_id)
+        )
+        
+        _doc_filters = [
+            Document.directory_id.in_(subtree),
+            Document.is_deleted.is_not(True),
+        ]
+        
+        # Документ исключается, если хотя бы одна директория на пути к нему (внутри поддерева) не проходит фильтры
+        path_dir_closure = aliased(DirectoryClosure)
+        path_dir = aliased(Directory)
+        _blocked_dir_filters = [path_dir.is_deleted.is_(True)]
+        if owner_user_uuid:
+            _doc_filters.append(Document.owner_user_uuid == owner_user_uuid)
+            _blocked_dir_filters.append(path_dir.owner_user_uuid.is_distinct_from(owner_user_uuid))
+        if visible is not None:
+            _doc_filters.append(Document.visible == visible)
+            _blocked_dir_filters.append(path_dir.visible != visible)
+        
+        _doc_filters.append(
+            ~exists()
+            .where(
+                and_(
+                    path_dir_closure.descendant_id == Document.directory_id,
+                    path_dir_closure.ancestor_id.in_(subtree),
+                    path_dir.id == path_dir_closure.ancestor_id,
+                    or_(*_blocked_dir_filters),
+                )
+            )
+        )
+        
+        query = (
+            select(Document.uuid, Document.path, Document.created_at)
+            .filter(and_(*_doc_filters))
+            .order_by(Document.path.asc())
+        )
+        
+        response = await session.execute(query)
+        return [tuple(row) for row in response.fetchall()]
+    
+    @staticmethod
+    async def get_subtree_size(
+        session: AsyncSession,
+        
+        directory_id: int,
+    ) -> Tuple[int, int]:
+        """Возвращает (кол-во документов, суммарный размер в байтах) неудаленных документов директории и всех ее поддиректорий."""
+        query = (
+            select(func.count(Document.id), func.coalesce(func.sum(Document.size), 0))
+            .join(DirectoryClosure, DirectoryClosure.descendant_id == Document.directory_id)
+            .filter(
+                and_(
+                    DirectoryClosure.ancestor_id == directory_id,
+                    Document.is_deleted.is_not(True),
+                )
+            )
+        )
+        
+        response = await session.execute(query)
+        documents_count, size = response.one()
+        return documents_count, size
+    
     # _____________________________________________________________________________________________________
     
     @staticmethod
@@ -396,6 +536,19 @@ class FileStoreQueryAndStatementManager:
         is_document: bool,
     ) -> None:
         table = Document if is_document else Directory
+        if is_document:
+            await FileStoreQueryAndStatementManager.__apply_storage_usage(
+                session=session,
+                
+                doc_filters=[
+                    Document.uuid.in_(uuids),
+                    Document.visible != visibility_status,
+                    Document.is_deleted.is_not(True),
+                ],
+                sign=1 if visibility_status else -1,
+                only_visibility=True,
+            )
+        
         stmt = (
             update(table)
             .filter(
@@ -422,6 +575,17 @@ class FileStoreQueryAndStatementManager:
         is_document: bool,
     ) -> None:
         table = Document if is_document else Directory
+        if is_document:
+            await FileStoreQueryAndStatementManager.__apply_storage_usage(
+                session=session,
+                
+                doc_filters=[
+                    Document.uuid == uuid,
+                    Document.is_deleted.is_not(True),
+                ],
+                sign=-1,
+            )
+        
         stmt = (
             update(table)
             .filter(
@@ -437,3 +601,279 @@ class FileStoreQueryAndStatementManager:
         
         await session.execute(stmt)
         await session.commit()
+    
+    @staticmethod
+    async def change_deletion_status_subtree(
+        session: AsyncSession,
+        
+        requester_user_id: int, requester_user_uuid: str,
+        
+        directory_ids: List[int],
+    ) -> None:
+        """Помечает удаленными директории, все их поддиректории и документы в них одним запросом."""
+        deleted_at = datetime.datetime.now(tz=datetime.timezone.utc)
+        subtree = (
+            select(DirectoryClosure.descendant_id)
+            .filter(DirectoryClosure.ancestor_id == any_(literal(list(set(directory_ids)), ARRAY(BigInteger))))
+        )
+        
+        await FileStoreQueryAndStatementManager.__apply_storage_usage(
+            session=session,
+            
+            doc_filters=[
+                Document.directory_id.in_(subtree),
+                Document.is_deleted.is_not(True),
+            ],
+            sign=-1,
+        )
+        
+        cte_deleted_dirs = (
+            update(Directory)
+            .filter(
+                and_(
+                    Directory.id.in_(subtree),
+                    Directory.is_deleted.is_not(True),
+                )
+            )
+            .values(
+                is_deleted = True,
+                deleted_at = deleted_at,
+                deleters_user_id = requester_user_id,
+                deleters_user_uuid = requester_user_uuid,
+            )
+            .returning(Directory.id)
+            .cte("deleted_dirs")
+        )
+        stmt = (
+            update(Document)
+            .filter(
+                and_(
+                    Document.directory_id.in_(subtree),
+                    Document.is_deleted.is_not(True),
+                )
+            )
+            .values(
+                is_deleted = True,
+                deleted_at = deleted_at,
+                deleters_user_id = requester_user_id,
+                deleters_user_uuid = requester_user_uuid,
+            )
+            .add_cte(cte_deleted_dirs)
+        )
+        
+        await session.execute(stmt)
+        await session.commit()
+    
+    @staticmethod
+    async def get_root_directories_paths(
+        session: AsyncSession,
+        
+        owner_user_uuids: List[str],
+    ) -> List[str]:
+        """Пути корневых (не удаленных) директорий указанных Пользователей."""
+        query = (
+            select(Directory.path)
+            .filter(
+                and_(
+                    Directory.owner_user_uuid == any_(literal(list(set(owner_user_uuids)), ARRAY(String))),
+                    Directory.parent.is_(None),
+                    Directory.is_deleted.is_not(True),
+                )
+            )
+        )
+        response = await session.execute(query)
+        
+        return list(response.scalars().all())
+    
+    # _____________________________________________________________________________________________________
+    @staticmethod
+    async def __apply_storage_usage(
+        session: AsyncSession,
+        
+        doc_filters: List[Any],
+        sign: Literal[1, -1],
+        only_visibility: bool = False,
+    ) -> None:
+        """
+        Добавляет (sign=1) или вычитает (sign=-1) вклад документов, попадающих под фильтры, из счетчиков занятого места
+        всех директорий-предков и Пользователей. Вызывается в рамках транзакции изменения документов (без commit).
+        only_visibility - меняются только счетчики видимых документов (при смене видимости).
+        """
+        if only_visibility:
+            documents_count = literal(0, BigInteger)
+            size = literal(0, BigInteger)
+            visible_documents_count = sign * func.count(Document.id)
+            visible_size = sign * func.coalesce(func.sum(Document.size), 0)
+        else:
+            documents_count = sign * func.count(Document.id)
+            size = sign * func.coalesce(func.sum(Document.size), 0)
+            visible_documents_count = sign * func.count(Document.id).filter(Document.visible.is_(True))
+            visible_size = sign * func.coalesce(func.sum(Document.size).filter(Document.visible.is_(True)), 0)
+        
+        counter_columns = ["documents_count", "size", "visible_documents_count", "visible_size"]
+        
+        # Директории (все предки, включая саму директорию документа)
+        dir_select = (
+            select(DirectoryClosure.ancestor_id, documents_count, size, visible_documents_count, visible_size)
+            .select_from(Document)
+            .join(DirectoryClosure, DirectoryClosure.descendant_id == Document.directory_id)
+            .filter(and_(*doc_filters))
+            .group_by(DirectoryClosure.ancestor_id)
+        )
+        stmt_dir = insert(DirectoryUsage).from_select(["directory_id", *counter_columns], dir_select)
+        stmt_dir = stmt_dir.on_conflict_do_update(
+            index_elements=[DirectoryUsage.directory_id],
+            set_={
+                **{column: getattr(DirectoryUsage, column) + getattr(stmt_dir.excluded, column) for column in counter_columns},
+                "updated_at": func.timezone('UTC', func.current_timestamp()),
+            },
+        )
+        
+        # Пользователи
+        user_uuid = func.coalesce(Document.owner_user_uuid, Document.uploader_user_uuid)
+        user_select = (
+            select(user_uuid, documents_count, size, visible_documents_count, visible_size)
+            .filter(and_(*doc_filters))
+            .group_by(user_uuid)
+        )
+        stmt_user = insert(UserStorageUsage).from_select(["user_uuid", *counter_columns], user_select)
+        stmt_user = stmt_user.on_conflict_do_update(
+            index_elements=[UserStorageUsage.user_uuid],
+            set_={
+                **{column: getattr(UserStorageUsage, column) + getattr(stmt_user.excluded, column) for column in counter_columns},
+                "updated_at": func.timezone('UTC', func.current_timestamp()),
+            },
+        )
+        
+        await session.execute(stmt_dir)
+        await session.execute(stmt_user)
+    
+    @staticmethod
+    async def get_storage_usage_for_upload(
+        session: AsyncSession,
+        
+        directory_id: int,
+        user_uuid: str,
+    ) -> Tuple[int, int]:
+        """Возвращает (занятое место Пользователя, максимальное занятое место среди директории и ее предков) в байтах."""
+        user_size = (
+            select(UserStorageUsage.size)
+            .filter(UserStorageUsage.user_uuid == user_uuid)
+            .scalar_subquery()
+        )
+        dir_size = (
+            select(func.max(DirectoryUsage.size))
+            .join(DirectoryClosure, DirectoryClosure.ancestor_id == DirectoryUsage.directory_id)
+            .filter(DirectoryClosure.descendant_id == directory_id)
+            .scalar_subquery()
+        )
+        query = select(func.coalesce(user_size, 0), func.coalesce(dir_size, 0))
+        
+        response = await session.execute(query)
+        used_by_user, used_in_directory = response.one()
+        return used_by_user, used_in_directory
+    
+    @staticmethod
+    async def get_storage_usage(
+        session: AsyncSession,
+        
+        user_uuid: Optional[str] = None,
+        directory_uuid: Optional[str] = None,
+        
+        page: Optional[int] = None,
+        page_size: Optional[int] = None,
+    ) -> Dict[str, List[Any]]:
+        if page is None or (page is not None and page < 1):
+            page = 1
+        if page_size is None or (page is not None and page_size < 1):
+            page_size = 50
+        
+        users: List[UserStorageUsage] = []
+        directories: List[Tuple[str, DirectoryUsage]] = []
+        
+        if user_uuid or not directory_uuid:
+            query_users = (
+                select(UserStorageUsage)
+                .order_by(UserStorageUsage.size.desc())
+            )
+            if user_uuid:
+                query_users = query_users.filter(UserStorageUsage.user_uuid == user_uuid)
+            else:
+                query_users = query_users.limit(page_size).offset((page - 1) * page_size)
+            
+            response_users = await session.execute(query_users)
+            users = [item[0] for item in response_users.fetchall()]
+        
+        if directory_uuid:
+            query_directories = (
+                select(Directory.uuid, DirectoryUsage)
+                .join(DirectoryUsage, DirectoryUsage.directory_id == Directory.id)
+                .filter(Directory.uuid == directory_uuid)
+            )
+            response_directories = await session.execute(query_directories)
+            directories = [tuple(item) for item in response_directories.fetchall()]
+        
+        return {
+            "users": users,
+            "directories": directories,
+        }
+    
+    @staticmethod
+    async def add_storage_cleanup_tasks(
+        session: AsyncSession,
+        
+        tasks: List[Tuple[str, str]],
+    ) -> None:
+        """Задачи удаления из хранилища (вид, цель) - в транзакции удаления из БД: после ее фиксации задачи не потеряются."""
+        if not tasks:
+            return
+        await session.execute(insert(StorageCleanupTask), [{"kind": kind, "target": target} for kind, target in tasks])
+        await session.commit()
+    
+    @staticmethod
+    async def claim_storage_cleanup_tasks(
+        limit: int,
+        lease_seconds: int,
+    ) -> List[Row]:
+        """Забирает готовые задачи: следующая попытка переносится на конец аренды (задачи упавшего воркера возьмет другой)."""
+        claimable = (
+            select(StorageCleanupTask.id)
+            .filter(StorageCleanupTask.next_attempt_at <= func.now())
+            .order_by(StorageCleanupTask.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(StorageCleanupTask)
+            .filter(StorageCleanupTask.id.in_(claimable.scalar_subquery()))
+            .values(next_attempt_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, lease_seconds))
+            .returning(StorageCleanupTask.id, StorageCleanupTask.kind, StorageCleanupTask.target, StorageCleanupTask.attempts)
+        )
+        async with async_session_maker() as session:
+            response = await session.execute(stmt)
+            tasks = response.all()
+            await session.commit()
+        return tasks
+    
+    @staticmethod
+    async def complete_storage_cleanup_task(
+        task_id: int,
+    ) -> None:
+        async with async_session_maker() as session:
+            await session.execute(delete(StorageCleanupTask).filter(StorageCleanupTask.id == task_id))
+            await session.commit()
+    
+    @staticmethod
+    async def postpone_storage_cleanup_tasks(
+        task_ids: List[int],
+        delay_seconds: int,
+        
+        error: Optional[str] = None,
+    ) -> None:
+        """Следующая попытка - через delay_seconds. С error - неудачная попытка (счетчик и текст ошибки), без - возврат невыполненной задачи."""
+        values: Dict[str, Any] = {"next_attempt_at": func.now() + func.make_interval(0, 0, 0, 0, 0, 0, delay_seconds)}
+        if error is not None:
+            values.update(attempts=StorageCleanupTask.attempts + 1, last_error=error)
+        async with async_session_maker() as session:
+            await session.execute(update(StorageCleanupTask).filter(StorageCleanupTask.id.in_(task_ids)).values(**values))
+            await session.commit()
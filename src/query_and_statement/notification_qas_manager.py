@@ -1,7 +1,7 @@
 import datetime
 from typing import Any, Dict, List, Literal, Optional
 
-from sqlalchemy import and_, delete, func, or_, select, text, update
+from sqlalchemy import Row, and_, delete, func, or_, select, text, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -167,9 +167,9 @@ class NotificationQueryAndStatementManager:
         
         filter: Optional[FiltersNotifications] = None,
         order: Optional[OrdersNotifications] = None,
-    ) -> Dict[str, List[Optional[Notification]]|Optional[int]]:
+    ) -> Dict[str, List[Row]|Optional[int]]:
         query = (
-            select(Notification)
+            select(*Notification.__table__.columns)  # Строки Row вместо ORM-объектов (только чтение)
         )
         _filters = [Notification.for_admin == for_admin]
         if notification_list_uuid:
@@ -294,7 +294,7 @@ class NotificationQueryAndStatementManager:
         total_pages = (total_records + page_size - 1) // page_size if total_records else 0
         
         response = await session.execute(query)
-        data = [item[0] for item in response.fetchall()]
+        data = response.fetchall()
         return {
             "data": data,
             "total_records": total_records,
@@ -231,29 +231,13 @@ class ReferenceQueryAndStatementManager:
     
     
     @staticmethod
-    async def create_errlog(
-        endpoint: str,
-        
-        params: Optional[Dict],
-        msg: Optional[str],
-        
-        user_uuid: str,
-    ) -> int:
+    async def create_errlogs(
+        records: List[Dict[str, Any]],
+    ) -> None:
+        """Пакетная запись журнала ошибок (id записей назначаются до вставки - ErrLogQueue)."""
         async with async_session_maker() as session:
-            stmt = (
-                insert(ErrLog)
-                .values(
-                    endpoint=endpoint,
-                    params=params,
-                    msg=msg,
-                    user_uuid=user_uuid,
-                ).returning(ErrLog.id)
-            )
-            
-            log_id = await session.execute(stmt)
+            await session.execute(insert(ErrLog), records)
             await session.commit()
-            
-            return log_id.scalar()
     
     @staticmethod
     async def _test(
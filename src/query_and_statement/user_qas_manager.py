@@ -1,17 +1,17 @@
 import json
 from typing import Any, Dict, List, Literal, Optional, Tuple
 
-from sqlalchemy import and_, func, or_, select, update, delete
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import BigInteger, Integer, String, and_, any_, func, literal, or_, select, update, delete
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
-from connection_module import async_session_maker, RedisConnector
+from connection_module import async_session_maker, db_client_key, RedisConnector
 
 from src.models.notification_models import Notification
 from src.models.chat_models import Message
 from src.models.counterparty.bank_details_models import BankDetails
-from src.models.file_store_models import Directory, Document
+from src.models.file_store_models import Directory, Document, UserStorageUsage
 from src.models.user_models import Token, UserAccount, UserContact, UserPrivilege
 from src.schemas.user_schema import ClientState, UpdateUserContactData, UserSchema, FiltersUsersInfo, OrdersUsersInfo
 
@@ -71,56 +71,71 @@ class UserQueryAndStatementManager:
     async def get_current_user_data(
         token: str,
     ) -> UserSchema:
-        # TODO тут должно быть дешефрование token
         async with async_session_maker() as session:
-            query = (
-                select(Token, UserAccount, UserPrivilege.id, Directory.uuid)
-                .outerjoin(UserAccount, Token.id == UserAccount.token)
-                .outerjoin(UserPrivilege, UserAccount.privilege == UserPrivilege.id)
-                .outerjoin(Directory, UserAccount.uuid == Directory.owner_user_uuid)
-                .filter(
-                    and_(
-                        Token.value == token,
-                        Directory.parent == None,  # noqa: E711
-                    )
-                )
+            return await UserQueryAndStatementManager.authenticate_token(
+                session=session,
+                
+                token=token,
             )
-            response = await session.execute(query)  # аутентификация пользователя
-            result = response.one_or_none()
-            
-            if not result:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail=f"Несуществующий токен или у пользователя отсутствует корневая Директория - {token}!"
-                )
-            if not result[0].is_active:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail=f"Неактивный токен - {token}!"
-                )
-            if not result[1].is_active:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Неактивный пользователь!"
-                )
-            if not result[2]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="У пользователя нет прав!"
-                )
-            if not result[3]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="У пользователя нет своей Директории!"
+    
+    @staticmethod
+    async def authenticate_token(
+        session: AsyncSession,
+        
+        token: str,
+    ) -> UserSchema:
+        """Аутентификация пользователя по токену одним запросом в переданной сессии."""
+        # TODO тут должно быть дешефрование token
+        query = (
+            select(Token, UserAccount, UserPrivilege.id, Directory.uuid)
+            .outerjoin(UserAccount, Token.id == UserAccount.token)
+            .outerjoin(UserPrivilege, UserAccount.privilege == UserPrivilege.id)
+            .outerjoin(Directory, UserAccount.uuid == Directory.owner_user_uuid)
+            .filter(
+                and_(
+                    Token.value == token,
+                    Directory.parent == None,  # noqa: E711
                 )
-            
-            user_data = UserSchema()
-            user_data.user_id = result[1].id
-            user_data.user_uuid = result[1].uuid
-            user_data.user_dir_uuid = result[3]
-            user_data.privilege_id = result[2]
-            
-            return user_data
+            )
+        )
+        response = await session.execute(query)  # аутентификация пользователя
+        result = response.one_or_none()
+        
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Несуществующий токен или у пользователя отсутствует корневая Директория - {token}!"
+            )
+        if not result[0].is_active:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Неактивный токен - {token}!"
+            )
+        if not result[1].is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Неактивный пользователь!"
+            )
+        if not result[2]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="У пользователя нет прав!"
+            )
+        if not result[3]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="У пользователя нет своей Директории!"
+            )
+        
+        user_data = UserSchema()
+        user_data.user_id = result[1].id
+        user_data.user_uuid = result[1].uuid
+        user_data.user_dir_uuid = result[3]
+        user_data.privilege_id = result[2]
+        
+        db_client_key.set(user_data.user_uuid)  # read-your-writes: запись в любом эндпоинте отмечает клиента для DatabaseRouter
+        
+        return user_data
     
     @staticmethod
     async def get_user_id_by_uuid(
@@ -193,15 +208,16 @@ class UserQueryAndStatementManager:
     
     @staticmethod
     async def get_client_state(client_uuid: str) -> ClientState:
-        async with RedisConnector.get_async_redis_pipe() as pipe:
-            pipe.get(client_uuid)
-            pipe.ttl(client_uuid)
-            data, ttl = await pipe.execute()
-            
-            return ClientState(
-                data=json.loads(data.decode()) if data else {},
-                ttl=ttl,  # Значение: -1 => нет TTL; -2 => ключ не существует.
-            )
+        redis = await RedisConnector.get_shared_redis_pool()
+        pipe = redis.pipeline()
+        pipe.get(client_uuid)
+        pipe.ttl(client_uuid)
+        data, ttl = await pipe.execute()
+        
+        return ClientState(
+            data=json.loads(data.decode()) if data else {},
+            ttl=ttl,  # Значение: -1 => нет TTL; -2 => ключ не существует.
+        )
     
     @staticmethod
     async def get_user_contact_data(
@@ -440,72 +456,101 @@ class UserQueryAndStatementManager:
                 await session.set(client_uuid, serialized_state)
     
     # TODO нужно удалять также все смс и прочие связанные сущности!
+    @staticmethod
+    async def get_users_for_deletion(
+        session: AsyncSession,
+        
+        tokens: List[str],
+        uuids: List[str],
+    ) -> List[Any]:
+        """Одним запросом находит Пользователей по токенам и UUID (id, uuid, s3_login, privilege, token_value)."""
+        query = (
+            select(
+                UserAccount.id, UserAccount.uuid, UserAccount.s3_login, UserAccount.privilege,
+                Token.value.label("token_value"),
+            )
+            .outerjoin(Token, UserAccount.token == Token.id)
+            .filter(
+                or_(
+                    Token.value == any_(literal(list(set(tokens)), ARRAY(String))),
+                    UserAccount.uuid == any_(literal(list(set(uuids)), ARRAY(String))),
+                )
+            )
+        )
+        response = await session.execute(query)
+        
+        return list(response.all())
+    
     @staticmethod
     async def delete_users(
         session: AsyncSession,
         
         user_uuids: List[str],
     ) -> None:
+        user_uuids_array = literal(list(set(user_uuids)), ARRAY(String))
+        
+        query = (
+            select(UserAccount.id, UserAccount.token, UserAccount.contact)
+            .filter(UserAccount.uuid == any_(user_uuids_array))
+        )
+        user_account_id_token_id_contact_id_response = await session.execute(query)
+        user_account_id_token_id_contact_id_result = user_account_id_token_id_contact_id_response.all()
+        
+        user_ids_array = literal([user_id for user_id, _, _ in user_account_id_token_id_contact_id_result], ARRAY(Integer))
+        token_ids_array = literal([token_id for _, token_id, _ in user_account_id_token_id_contact_id_result if token_id is not None], ARRAY(Integer))
+        contact_ids_array = literal([contact_id for _, _, contact_id in user_account_id_token_id_contact_id_result if contact_id is not None], ARRAY(BigInteger))
+        
         stmt_delete_messages = (
             delete(Message)
-            .filter(Message.user_uuid.in_(user_uuids))
+            .filter(Message.user_uuid == any_(user_uuids_array))
         )
         stmt_delete_notifications = (
             delete(Notification)
             .filter(
                 or_(
-                    Notification.initiator_user_uuid.in_(user_uuids),
-                    Notification.recipient_user_uuid.in_(user_uuids)
+                    Notification.initiator_user_uuid == any_(user_uuids_array),
+                    Notification.recipient_user_uuid == any_(user_uuids_array),
                 )
             )
         )
         stmt_delete_bank_details = (
             delete(BankDetails)
-            .filter(BankDetails.user_uuid.in_(user_uuids))
+            .filter(BankDetails.user_uuid == any_(user_uuids_array))
+        )
+        stmt_delete_docs = (
+            delete(Document)
+            .filter(Document.owner_user_id == any_(user_ids_array))
+        )
+        stmt_delete_dirs = (  # Строки directory_closure и directory_usage удаляются каскадно
+            delete(Directory)
+            .filter(Directory.owner_user_id == any_(user_ids_array))
+        )
+        stmt_delete_storage_usage = (
+            delete(UserStorageUsage)
+            .filter(UserStorageUsage.user_uuid == any_(user_uuids_array))
+        )
+        stmt_delete_user_accounts = (
+            delete(UserAccount)
+            .filter(UserAccount.id == any_(user_ids_array))
+        )
+        stmt_delete_tokens = (
+            delete(Token)
+            .filter(Token.id == any_(token_ids_array))
+        )
+        stmt_delete_contacts = (
+            delete(UserContact)
+            .filter(UserContact.id == any_(contact_ids_array))
         )
         
         await session.execute(stmt_delete_messages)
         await session.execute(stmt_delete_notifications)
         await session.execute(stmt_delete_bank_details)
-        
-        query = (
-            select(UserAccount.id, Token.id, UserContact.id)
-            .outerjoin(Token, UserAccount.token == Token.id)
-            .outerjoin(UserContact, UserAccount.contact == UserContact.id)
-            .filter(UserAccount.uuid.in_(user_uuids))
-        )
-        
-        user_account_id_token_id_contact_id_response = await session.execute(query)
-        user_account_id_token_id_contact_id_result = user_account_id_token_id_contact_id_response.fetchall()
-        
-        for user_account_id_token_id_contact_id in user_account_id_token_id_contact_id_result:
-            stmt_delete_docs = (
-                delete(Document)
-                .filter(Document.owner_user_id == user_account_id_token_id_contact_id[0])
-            )
-            stmt_delete_dirs = (
-                delete(Directory)
-                .filter(Directory.owner_user_id == user_account_id_token_id_contact_id[0])
-            )
-            
-            stmt_delete_user_account = (
-                delete(UserAccount)
-                .filter(UserAccount.id == user_account_id_token_id_contact_id[0])
-            )
-            stmt_delete_token = (
-                delete(Token)
-                .filter(Token.id == user_account_id_token_id_contact_id[1])
-            )
-            stmt_delete_contact = (
-                delete(UserContact)
-                .filter(UserContact.id == user_account_id_token_id_contact_id[2])
-            )
-            
-            await session.execute(stmt_delete_docs)
-            await session.execute(stmt_delete_dirs)
-            await session.execute(stmt_delete_user_account)
-            await session.execute(stmt_delete_token)
-            await session.execute(stmt_delete_contact)
+        await session.execute(stmt_delete_docs)
+        await session.execute(stmt_delete_dirs)
+        await session.execute(stmt_delete_storage_usage)
+        await session.execute(stmt_delete_user_accounts)
+        await session.execute(stmt_delete_tokens)
+        await session.execute(stmt_delete_contacts)
         
         await session.commit()
     
@@ -2,16 +2,16 @@ import datetime
 import traceback
 from typing import Any, Dict, List, Optional, Tuple
 
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
 
-from connection_module import get_async_session
+from connection_module import get_async_session, get_async_read_session
 from lifespan import limiter
-from security import check_app_auth
+from security import check_app_auth, get_request_context
 from src.query_and_statement.application.application_qas_manager import ApplicationQueryAndStatementManager
-from src.schemas.user_schema import ClientState
-from src.service.user_service import UserService
+from src.schemas.user_schema import ClientState, RequestContext
 from src.service.reference_service import ReferenceService
 from src.schemas.application.application_schema import BaseApplication, FiltersApplications, OrdersApplications
 from src.schemas.application.mt_application_schema import ResponseGetMTApplications
@@ -25,7 +25,7 @@ from src.utils.reference_mapping_data.app.app_mapping_data import COUNTRY_MAPPIN
 from src.utils.reference_mapping_data.application.application.mt_mapping import MT_APPLICATION_TYPE_MAPPING
 from src.utils.reference_mapping_data.application.mapping import APPLICATION_STATUS_MAPPING
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
-from src.utils.tz_converter import convert_tz
+from src.utils.tz_converter import format_dt
 
 
 router = APIRouter(
@@ -286,24 +286,20 @@ async def get_applications(
     filter: Optional[FiltersApplications] = None,
     order: Optional[OrdersApplications] = None,
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
     
     client_state: Optional[ClientState] = None,
 ) -> ResponseGetMTApplications:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
-        applications: Dict[str, List[Optional[Application]]|Optional[int]] = await MTApplicationService.get_applications(
+        applications: Dict[str, List[Row]|Optional[int]] = await MTApplicationService.get_applications(
             session=session,
             
             requester_user_uuid=user_data["user_uuid"],
@@ -334,24 +330,24 @@ async def get_applications(
             if extended_output:
                 response_content.data.append(
                     ExtendedMTApplication(
-                        uuid=application["application"].uuid,
-                        name=application["application"].name,
+                        uuid=application.uuid,
+                        name=application.name,
                         
-                        mt_type=list(MT_APPLICATION_TYPE_MAPPING)[list(MT_APPLICATION_TYPE_MAPPING.values()).index(application["type"])] if application.get("type") else application["type"],
-                        priority=application["priority"],
-                        user_login=application["login"],
-                        legal_entity_name_latin=application["name_latin"],
-                        legal_entity_name_national=application["name_national"],
-                        data_updated_at=convert_tz(application["updated_at"].strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if application["updated_at"] else None,
-                        order_name=application["order_name"],
+                        mt_type=MT_APPLICATION_TYPE_MAPPING.name_of(application.mt_type),
+                        priority=application.priority,
+                        user_login=application.login,
+                        legal_entity_name_latin=application.name_latin,
+                        legal_entity_name_national=application.name_national,
+                        data_updated_at=format_dt(application.data_updated_at, tz_city=client_state_data.get("tz")),
+                        order_name=application.order_name,
                         # TODO тут можно добавить вывод полей (согласовать с Юрием)
                         
-                        user_id=application["application"].user_id,
-                        user_uuid=application["application"].user_uuid,
-                        counterparty_id=application["application"].counterparty_id,
-                        counterparty_uuid=application["application"].counterparty_uuid,
-                        directory_id=application["application"].directory_id,
-                        directory_uuid=application["application"].directory_uuid,
+                        user_id=application.user_id,
+                        user_uuid=application.user_uuid,
+                        counterparty_id=application.counterparty_id,
+                        counterparty_uuid=application.counterparty_uuid,
+                        directory_id=application.directory_id,
+                        directory_uuid=application.directory_uuid,
                         type="MT",
                         status={
                             "Запрошен": "Requested",
@@ -361,11 +357,11 @@ async def get_applications(
                             "В очереди": "In_queue",
                             "Завершен успешно": "Completed_successfully",
                             "Завершен неуспешно": "Completed_unsuccessfully",
-                        }[{v:k for k, v in APPLICATION_STATUS_MAPPING.items()}[application["application"].status]] if application["application"].status else application["application"].status,
-                        data_id=application["application"].data_id,  # FIXME это возможно не стоит возвращать
-                        can_be_updated_by_user=application["application"].can_be_updated_by_user,
-                        updated_at=convert_tz(application["application"].updated_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if application["application"].updated_at else None,
-                        created_at=convert_tz(application["application"].created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if application["application"].created_at else None,
+                        }[APPLICATION_STATUS_MAPPING.reverse[application.status]] if application.status else application.status,
+                        data_id=application.data_id,  # FIXME это возможно не стоит возвращать
+                        can_be_updated_by_user=application.can_be_updated_by_user,
+                        updated_at=format_dt(application.updated_at, tz_city=client_state_data.get("tz")),
+                        created_at=format_dt(application.created_at, tz_city=client_state_data.get("tz")),
                     )
                 )
             else:
@@ -388,11 +384,11 @@ async def get_applications(
                             "Требует внимания заказчика": "Requires_customer_attention",
                             "Завершен успешно": "Completed_successfully",
                             "Завершен неуспешно": "Completed_unsuccessfully",
-                        }[{v:k for k, v in APPLICATION_STATUS_MAPPING.items()}[application.status]] if application.status else application.status,
+                        }[APPLICATION_STATUS_MAPPING.reverse[application.status]] if application.status else application.status,
                         data_id=application.data_id,  # FIXME это возможно не стоит возвращать
                         can_be_updated_by_user=application.can_be_updated_by_user,
-                        updated_at=convert_tz(application.updated_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if application.updated_at else None,
-                        created_at=convert_tz(application.created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if application.created_at else None,
+                        updated_at=format_dt(application.updated_at, tz_city=client_state_data.get("tz")),
+                        created_at=format_dt(application.created_at, tz_city=client_state_data.get("tz")),
                     )
                 )
             response_content.count += 1
@@ -459,24 +455,20 @@ async def get_applications_data(
         max_length=36
     ),
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
     
     client_state: Optional[ClientState] = None,
 ) -> JSONResponse:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
-        applications_data: List[Optional[MTApplicationData]] = await MTApplicationService.get_applications_data(
+        applications_data: List[Row] = await MTApplicationService.get_applications_data(
             session=session,
             
             requester_user_uuid=user_data["user_uuid"],
@@ -497,9 +489,9 @@ async def get_applications_data(
                 "payment_deadline_no_later_than": datetime.datetime.strftime(application_data.payment_deadline_no_later_than, "%d.%m.%Y") if application_data.payment_deadline_no_later_than else None,
                 "invoice_date": datetime.datetime.strftime(application_data.invoice_date, "%d.%m.%Y") if application_data.invoice_date else None,
                 
-                "type":  {v:k for k, v in MT_APPLICATION_TYPE_MAPPING.items()}[application_data.type],
+                "type":  MT_APPLICATION_TYPE_MAPPING.reverse[application_data.type],
                 
-                "invoice_currency": {v:k for k, v in CURRENCY_MAPPING.items()}[application_data.invoice_currency] if application_data.invoice_currency else None,
+                "invoice_currency": CURRENCY_MAPPING.name_of(application_data.invoice_currency),
                 "invoice_amount": str(float(application_data.invoice_amount)) if application_data.invoice_amount else None,
                 "payment_amount": str(float(application_data.payment_amount)) if application_data.payment_amount else None,
                 "payment_amount_in_words": application_data.payment_amount_in_words,
@@ -513,8 +505,8 @@ async def get_applications_data(
                 "is_amount_different": application_data.is_amount_different,
                 "source_bank": application_data.source_bank,
                 "target_bank": application_data.target_bank,
-                "source_currency": {v:k for k, v in CURRENCY_MAPPING.items()}[application_data.source_currency] if application_data.source_currency else None,
-                "target_currency": {v:k for k, v in CURRENCY_MAPPING.items()}[application_data.target_currency] if application_data.target_currency else None,
+                "source_currency": CURRENCY_MAPPING.name_of(application_data.source_currency),
+                "target_currency": CURRENCY_MAPPING.name_of(application_data.target_currency),
                 "amount": str(float(application_data.amount)) if application_data.amount else None,
                 "subagent_bank": application_data.subagent_bank,
                 "payment_purpose_ru": application_data.payment_purpose_ru,
@@ -533,7 +525,7 @@ async def get_applications_data(
                 
                 "end_customer_company_name": application_data.end_customer_company_name,
                 "end_customer_company_legal_form": application_data.end_customer_company_legal_form,
-                "end_customer_company_registration_country": {v:k for k, v in COUNTRY_MAPPING.items()}[application_data.end_customer_company_registration_country] if application_data.end_customer_company_registration_country else None,
+                "end_customer_company_registration_country": COUNTRY_MAPPING.name_of(application_data.end_customer_company_registration_country),
                 
                 "company_name_latin": application_data.company_name_latin,
                 "company_name_national": application_data.company_name_national,
@@ -566,10 +558,10 @@ async def get_applications_data(
                 "sender_company_name_latin": application_data.sender_company_name_latin,
                 "sender_company_name_national": application_data.sender_company_name_national,
                 "sender_company_legal_form": application_data.sender_company_legal_form,
-                "sender_country": {v:k for k, v in COUNTRY_MAPPING.items()}[application_data.sender_country] if application_data.sender_country else None,
+                "sender_country": COUNTRY_MAPPING.name_of(application_data.sender_country),
                 
                 "comment": application_data.comment,
-                "updated_at": convert_tz(datetime.datetime.strftime(application_data.updated_at, "%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if application_data.updated_at else None,
+                "updated_at": format_dt(application_data.updated_at, tz_city=client_state_data.get("tz")),
             }
         
         return JSONResponse(content=response_content)
@@ -10,17 +10,16 @@ from fastapi.responses import JSONResponse
 
 from lifespan import limiter
 from connection_module import WSConnectionManager, get_async_session, ws_connection_manager
-from security import check_app_auth
-from src.service.user_service import UserService
+from security import check_app_auth, get_request_context
 from src.service.reference_service import ReferenceService
 from src.schemas.chat_schema import MessageData, ResponseGetMessages
-from src.schemas.user_schema import ClientState, UserSchema
+from src.schemas.user_schema import ClientState, RequestContext, UserSchema
 from src.query_and_statement.chat_qas_manager import ChatQueryAndStatementManager
 from src.service.chat_service import ChatService
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager as UserQaSM
 from src.models.chat_models import Message
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
-from src.utils.tz_converter import convert_tz
+from src.utils.tz_converter import format_dt
 
 
 router = APIRouter(
@@ -235,21 +234,17 @@ async def get_messages(
         example=50
     ),
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
     session: AsyncSession = Depends(get_async_session),
     
     client_state: Optional[ClientState] = None,
 ) -> ResponseGetMessages:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
         messages: Dict[str, List[Optional[Message]]|Optional[int]] = await ChatService.get_messages(
@@ -274,10 +269,10 @@ async def get_messages(
             msg_data = MessageData(
                 user_id=message.user_id,
                 user_uuid=message.user_uuid,
-                user_privilege={v: k for k, v in PRIVILEGE_MAPPING.items()}[message.user_privilege_id],
+                user_privilege=PRIVILEGE_MAPPING.reverse[message.user_privilege_id],
                 chat_id=message.chat_id,
                 data=message.data,
-                created_at=convert_tz(message.created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if message.created_at else None,
+                created_at=format_dt(message.created_at, tz_city=client_state_data.get("tz")),
             )
             response_content.count += 1
             response_content.data.append(msg_data)
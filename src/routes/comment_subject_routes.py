@@ -7,15 +7,14 @@ from fastapi.responses import JSONResponse
 
 from connection_module import get_async_session
 from lifespan import limiter
-from security import check_app_auth
-from src.schemas.user_schema import ClientState
-from src.service.user_service import UserService
+from security import check_app_auth, get_request_context
+from src.schemas.user_schema import ClientState, RequestContext
 from src.service.reference_service import ReferenceService
 from src.models.comment_subject_models import CommentSubject
 from src.service.comment_subject_service import CommentSubjectService
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager as UserQaSM
 from src.utils.reference_mapping_data.comment_subject.mapping import COMMENT_SUBJECT_MAPPING
-from src.utils.tz_converter import convert_tz
+from src.utils.tz_converter import format_dt
 
 
 router = APIRouter(
@@ -124,21 +123,17 @@ async def get_comment_subject(
         max_length=36
     ),
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
     session: AsyncSession = Depends(get_async_session),
     
     client_state: Optional[ClientState] = None,
 ) -> JSONResponse:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
         comments: List[Optional[CommentSubject]] = await CommentSubjectService.get_comment_subject(
@@ -160,8 +155,8 @@ async def get_comment_subject(
                         "creator_uuid": comments[0].creator_uuid,
                         "last_updater_uuid": comments[0].last_updater_uuid,
                         "data": comments[0].data,
-                        "updated_at": convert_tz(comments[0].updated_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if comments[0].updated_at else None,
-                        "created_at": convert_tz(comments[0].created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if comments[0].created_at else None,
+                        "updated_at": format_dt(comments[0].updated_at, tz_city=client_state_data.get("tz")),
+                        "created_at": format_dt(comments[0].created_at, tz_city=client_state_data.get("tz")),
                     },
                     "count": 1,
             }
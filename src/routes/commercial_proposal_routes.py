@@ -14,7 +14,7 @@ from src.service.reference_service import ReferenceService
 from src.schemas.commercial_proposal_schema import CommercialProposal, FiltersCommercialProposals, OrdersCommercialProposals, ResponseGetCommercialProposals
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager as UserQaSM
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
-from src.utils.tz_converter import convert_tz
+from src.utils.tz_converter import format_dt
 
 
 router = APIRouter(
@@ -252,8 +252,8 @@ async def get_commercial_proposals(
                     document_uuid=commercial_proposal.document_uuid,
                     status=commercial_proposal.status,
                     can_be_updated_by_user=commercial_proposal.can_be_updated_by_user,
-                    updated_at=convert_tz(commercial_proposal.updated_at.strftime("%d.%m.%Y %H:%M:%S UTC")) if commercial_proposal.updated_at else None,
-                    created_at=convert_tz(commercial_proposal.created_at.strftime("%d.%m.%Y %H:%M:%S UTC")) if commercial_proposal.created_at else None,
+                    updated_at=format_dt(commercial_proposal.updated_at),
+                    created_at=format_dt(commercial_proposal.created_at),
                 )
             )
             response_content.count += 1
@@ -7,9 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from connection_module import get_async_session
 from lifespan import limiter
-from security import check_app_auth
-from src.schemas.user_schema import ClientState
-from src.service.user_service import UserService
+from security import check_app_auth, get_request_context
+from src.schemas.user_schema import ClientState, RequestContext
 from src.service.reference_service import ReferenceService
 from src.service.notification_service import NotificationService
 from src.models.counterparty.bank_details_models import BankDetails
@@ -17,7 +16,7 @@ from src.service.counterparty.bank_details_service import BankDetailsService
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager as UserQaSM
 from src.schemas.counterparty.bank_details_schema import CreateBanksDetailsSchema, UpdateBankDetailsSchema
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
-from src.utils.tz_converter import convert_tz
+from src.utils.tz_converter import format_dt
 
 
 router = APIRouter(
@@ -128,21 +127,17 @@ async def get_banks_details(
         description="(Опционально) Фильтр по UUID пользователя (точное совпадение)."
     ),
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
     session: AsyncSession = Depends(get_async_session),
     
     client_state: Optional[ClientState] = None,
 ) -> JSONResponse:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
         banks_details: List[Optional[BankDetails]] = await BankDetailsService.get_banks_details(
@@ -183,7 +178,7 @@ async def get_banks_details(
                     "current_account_chf": bank_details.current_account_chf,
                     "correspondence_account": bank_details.correspondence_account,
                     "address": bank_details.address,
-                    "created_at": convert_tz(bank_details.created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if bank_details.created_at else None,
+                    "created_at": format_dt(bank_details.created_at, tz_city=client_state_data.get("tz")),
                 }
             )
         
@@ -1,19 +1,19 @@
 import traceback
 from typing import Any, Dict, List, Literal, Optional, Tuple
 
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
-from connection_module import get_async_session
+from connection_module import get_async_session, get_async_read_session
 from lifespan import limiter
-from security import check_app_auth
+from security import check_app_auth, get_request_context
 from src.query_and_statement.counterparty.counterparty_qas_manager import CounterpartyQueryAndStatementManager
-from src.schemas.user_schema import ClientState
-from src.service.user_service import UserService
+from src.schemas.user_schema import ClientState, RequestContext
 from src.service.reference_service import ReferenceService
 from src.schemas.counterparty.counterparty_schema import (
-    BaseLegalEntity, CreateIndividualDataSchema, ExtendedLegalEntity, FiltersCounterparties, OrdersCounterparties, FiltersPersons, OrdersPersons, PersonData, RegistrationIdentifierType,
+    CreateIndividualDataSchema, FiltersCounterparties, OrdersCounterparties, FiltersPersons, OrdersPersons, PersonData, RegistrationIdentifierType,
     CreateLegalEntityDataSchema, UpdateCounterpartySchema, CreatePersonsSchema, ResponseGetLegalEntities, ResponseGetPersons, UpdateIndividualDataSchema, UpdateLegalEntityDataSchema, UpdateApplicationAccessList, UpdatePerson,
 )
 from src.schemas.reference_schema import CountryKey
@@ -23,7 +23,7 @@ from src.service.counterparty.counterparty_service import CounterpartyService
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager as UserQaSM
 from src.utils.reference_mapping_data.app.app_mapping_data import COUNTRY_MAPPING
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
-from src.utils.tz_converter import convert_tz
+from src.utils.tz_converter import format_dt
 
 
 router = APIRouter(
@@ -231,24 +231,20 @@ async def get_counterparties(
     filter: Optional[FiltersCounterparties] = None,
     order: Optional[OrdersCounterparties] = None,
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
     
     client_state: Optional[ClientState] = None,
 ) -> ResponseGetLegalEntities:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
-        counterparties: Dict[str, List[Optional[Counterparty|int|bool]] | List[Optional[Tuple[Counterparty, bool]]]] = await CounterpartyService.get_counterparties(
+        counterparties: Dict[str, List[Row]|Optional[int]] = await CounterpartyService.get_counterparties(
             session=session,
             
             requester_user_uuid=user_data["user_uuid"],
@@ -267,80 +263,50 @@ async def get_counterparties(
             order=order,
         )
         
-        response_content = ResponseGetLegalEntities(
-            data=[],
-            count=0,
-            total_records=None,
-            total_pages=None,
-        )
-        
+        # Ответ собирается словарями прямо из строк запроса (схема ResponseGetLegalEntities) - без промежуточных Pydantic-моделей и их повторной валидации
+        tz: Optional[str] = client_state_data.get("tz")
+        data: List[Dict[str, Any]] = []
         for counterparty in counterparties["data"]:
+            if counterparty_type != "ЮЛ":
+                ...  # TODO тут логика работы с ФЛ и с комбинированным набором данных
+                continue
+            
+            item: Dict[str, Any] = {
+                "uuid": counterparty.uuid,
+                "country": COUNTRY_MAPPING.reverse[counterparty.country],
+                "identifier_type": counterparty.identifier_type,
+                "identifier_value": counterparty.identifier_value,
+                "tax_identifier": counterparty.tax_identifier,
+                "user_id": counterparty.user_id,
+                "user_uuid": counterparty.user_uuid,
+                "directory_id": counterparty.directory_id,
+                "directory_uuid": counterparty.directory_uuid,
+                "data_id": counterparty.data_id,  # FIXME это возможно не стоит возвращать
+                "can_be_updated_by_user": counterparty.can_be_updated_by_user,
+                "mt": counterparty.mt,
+                "application_access_list": counterparty.application_access_list,
+                "is_active": counterparty.is_active,
+                "updated_at": format_dt(counterparty.updated_at, tz_city=tz),
+                "created_at": format_dt(counterparty.created_at, tz_city=tz),
+            }
             if extended_output:
-                if counterparty_type == "ЮЛ":
-                    response_content.data.append(
-                        ExtendedLegalEntity(
-                            uuid=counterparty["legal_entity"].uuid,
-                            country={v: k for k, v in COUNTRY_MAPPING.items()}[counterparty["legal_entity"].country],
-                            identifier_type=counterparty["legal_entity"].identifier_type,
-                            identifier_value=counterparty["legal_entity"].identifier_value,
-                            tax_identifier=counterparty["legal_entity"].tax_identifier,
-                            
-                            name_latin=counterparty["name_latin"],
-                            name_national=counterparty["name_national"],
-                            organizational_and_legal_form_latin=counterparty["organizational_and_legal_form_latin"],
-                            organizational_and_legal_form_national=counterparty["organizational_and_legal_form_national"],
-                            data_updated_at=convert_tz(counterparty["updated_at"].strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if counterparty["updated_at"] else None,
-                            
-                            user_id=counterparty["legal_entity"].user_id,
-                            user_uuid=counterparty["legal_entity"].user_uuid,
-                            directory_id=counterparty["legal_entity"].directory_id,
-                            directory_uuid=counterparty["legal_entity"].directory_uuid,
-                            is_active=counterparty["legal_entity"].is_active,
-                            data_id=counterparty["legal_entity"].data_id,  # FIXME это возможно не стоит возвращать
-                            can_be_updated_by_user=counterparty["legal_entity"].can_be_updated_by_user,
-                            mt=counterparty["mt"],
-                            application_access_list=counterparty["legal_entity"].application_access_list,
-                            updated_at=convert_tz(counterparty["legal_entity"].updated_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if counterparty["legal_entity"].updated_at else None,
-                            created_at=convert_tz(counterparty["legal_entity"].created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if counterparty["legal_entity"].created_at else None,
-                        )
-                    )
-                elif counterparty_type == "ФЛ":
-                    ...  # TODO тут логика работы с ФЛ
-                else:
-                    ...  # TODO тут логика работы с комбинированным набором данных
-            else:
-                if counterparty_type == "ЮЛ":
-                    response_content.data.append(
-                        BaseLegalEntity(
-                            uuid=counterparty[0].uuid,
-                            country={v: k for k, v in COUNTRY_MAPPING.items()}[counterparty[0].country],
-                            identifier_type=counterparty[0].identifier_type,
-                            identifier_value=counterparty[0].identifier_value,
-                            tax_identifier=counterparty[0].tax_identifier,
-                            
-                            user_id=counterparty[0].user_id,
-                            user_uuid=counterparty[0].user_uuid,
-                            directory_id=counterparty[0].directory_id,
-                            directory_uuid=counterparty[0].directory_uuid,
-                            is_active=counterparty[0].is_active,
-                            data_id=counterparty[0].data_id,  # FIXME это возможно не стоит возвращать
-                            can_be_updated_by_user=counterparty[0].can_be_updated_by_user,
-                            mt=counterparty[1],
-                            application_access_list=counterparty[0].application_access_list,
-                            updated_at=convert_tz(counterparty[0].updated_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if counterparty[0].updated_at else None,
-                            created_at=convert_tz(counterparty[0].created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if counterparty[0].created_at else None,
-                        )
-                    )
-                elif counterparty_type == "ФЛ":
-                    ...  # TODO тут логика работы с ФЛ
-                else:
-                    ...  # TODO тут логика работы с комбинированным набором данных
-            response_content.count += 1
+                item.update({
+                    "name_latin": counterparty.name_latin,
+                    "name_national": counterparty.name_national,
+                    "organizational_and_legal_form_latin": counterparty.organizational_and_legal_form_latin,
+                    "organizational_and_legal_form_national": counterparty.organizational_and_legal_form_national,
+                    "data_updated_at": format_dt(counterparty.data_updated_at, tz_city=tz),
+                })
+            data.append(item)
         
-        response_content.total_records = counterparties["total_records"]
-        response_content.total_pages = counterparties["total_pages"]
-        
-        return response_content
+        return ORJSONResponse(
+            content={
+                "data": data,
+                "count": len(counterparties["data"]),
+                "total_records": counterparties["total_records"],
+                "total_pages": counterparties["total_pages"],
+            }
+        )
     except AssertionError as e:
         error_message = str(e)
         formatted_traceback = traceback.format_exc()
@@ -640,21 +606,17 @@ async def get_counterparties_data(
         description="(Опционально) UUID Пользователя владельца карточки Контрагента."
     ),
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
     
     client_state: Optional[ClientState] = None,
 ) -> JSONResponse:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
         counterparties_data: List[Optional[LegalEntityData|IndividualData]] = await CounterpartyService.get_counterparties_data(
@@ -684,7 +646,7 @@ async def get_counterparties_data(
                     "legal_address": counterparty_data.legal_address,
                     "postal_address": counterparty_data.postal_address,
                     "additional_address": counterparty_data.additional_address,
-                    "updated_at": convert_tz(counterparty_data.updated_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if counterparty_data.updated_at else None,
+                    "updated_at": format_dt(counterparty_data.updated_at, tz_city=client_state_data.get("tz")),
                 }
             else:
                 ...  # TODO тут логика работы с ФЛ
@@ -1003,21 +965,17 @@ async def get_persons(
     filter: Optional[FiltersPersons] = None,
     order: Optional[OrdersPersons] = None,
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
     session: AsyncSession = Depends(get_async_session),
     
     client_state: Optional[ClientState] = None,
 ) -> ResponseGetPersons:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
         response_content = ResponseGetPersons(
@@ -1058,8 +1016,8 @@ async def get_persons(
                     phone=person.phone,
                     contact=person.contact,
                     counterparty_uuid=person.counterparty_uuid,
-                    updated_at=convert_tz(person.updated_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if person.updated_at else None,
-                    created_at=convert_tz(person.created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if person.created_at else None,
+                    updated_at=format_dt(person.updated_at, tz_city=client_state_data.get("tz")),
+                    created_at=format_dt(person.created_at, tz_city=client_state_data.get("tz")),
                 )
             )
             response_content.count += 1
@@ -3,22 +3,21 @@ from typing import Any, Dict, List, Literal, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 
-from connection_module import get_async_session
+from connection_module import get_async_session, get_async_read_session
 from lifespan import limiter
-from security import check_app_auth
+from security import check_app_auth, get_request_context
 from src.query_and_statement.file_store_qas_manager import FileStoreQueryAndStatementManager
-from src.schemas.user_schema import ClientState
-from src.service.user_service import UserService
+from src.schemas.user_schema import ClientState, RequestContext
 from src.service.reference_service import ReferenceService
 from src.schemas.file_store_schema import (
-    AdminDirInfo, AdminFileInfo,
-    BaseDirInfo, BaseFileInfo,
+    AdminDirInfo,
+    BaseDirInfo,
     DirInfoFromFS, FileInfoFromFS,
     FiltersUserDirsInfo, FiltersUserFilesInfo,
     OrdersUserDirsInfo, OrdersUserFilesInfo,
-    ResponseGetUserDirsInfo, ResponseGetUserFilesInfo,
+    ResponseGetDirSize, ResponseGetStorageUsage, ResponseGetUserDirsInfo, ResponseGetUserFilesInfo,
 )
 from src.service.notification_service import NotificationService
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager as UserQaSM
@@ -90,6 +89,66 @@ async def download_file(
     finally:
         await session.rollback()
 
+@router.get(
+    "/download_directory",
+    description="""
+    Скачивание директории (вместе со всеми поддиректориями) одним ZIP-архивом.
+    Архив формируется потоково, без промежуточных файлов.
+    """,
+    dependencies=[Depends(check_app_auth)],
+)
+@limiter.limit("30/second")
+async def download_directory(
+    request: Request,
+    directory_uuid: str = Query(
+        ...,
+        description="UUID Директории, которую нужно скачать."
+    ),
+    
+    token: str = Depends(UserQaSM.get_current_user_data),
+    
+    session: AsyncSession = Depends(get_async_session),
+) -> StreamingResponse:
+    try:
+        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        
+        response: StreamingResponse = await FileStoreService.download_directory(
+            session=session,
+            
+            requester_user_uuid=user_data["user_uuid"],
+            requester_user_privilege=user_data["privilege_id"],
+            directory_uuid=directory_uuid,
+        )
+        
+        return response
+    except AssertionError as e:
+        error_message = str(e)
+        formatted_traceback = traceback.format_exc()
+        
+        response_content = {"msg": f"{error_message}\n{formatted_traceback}"}
+        return JSONResponse(content=response_content)
+    
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        else:
+            error_message = str(e)
+            formatted_traceback = traceback.format_exc()
+            
+            log_id = await ReferenceService.create_errlog(
+                endpoint="download_directory",
+                params={
+                    "directory_uuid": directory_uuid,
+                },
+                msg=f"{error_message}\n{formatted_traceback}",
+                user_uuid=user_data["user_uuid"],
+            )
+            
+            response_content = {"msg": f"ОШИБКА! #{log_id}"}
+            return JSONResponse(content=response_content)
+    finally:
+        await session.rollback()
+
 @router.put(
     "/upload",
     description="""
@@ -181,7 +240,7 @@ async def upload_file(
             
             directory_uuid=directory_uuid,
         )
-        subject = {v:k for k, v in FILE_STORE_SUBJECT_MAPPING.items()}[subject_id]
+        subject = FILE_STORE_SUBJECT_MAPPING.reverse[subject_id]
         
         request_options = {
             "<user>": {
@@ -335,31 +394,19 @@ async def get_user_files_info(
     filter: Optional[FiltersUserFilesInfo] = None,
     order: Optional[OrdersUserFilesInfo] = None,
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
     
     client_state: Optional[ClientState] = None,
 ) -> ResponseGetUserFilesInfo:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
-        response_content = ResponseGetUserFilesInfo(
-            data_from_db=[],
-            data_from_fs=[],
-            count=0,
-            total_records=None,
-            total_pages=None,
-        )
-        
         data_from_db: Dict[str, Any] = await FileStoreService.get_doc_info_from_db(
             session=session,
             
@@ -380,25 +427,26 @@ async def get_user_files_info(
             tz=client_state_data.get("tz"),
         )
         
-        # Обработка данных из БД
-        for doc_id, row in data_from_db["data"].items():
-            if user_data["privilege_id"] == PRIVILEGE_MAPPING["Admin"]:
-                response_content.data_from_db.append(AdminFileInfo(**row))
-            else:
-                response_content.data_from_db.append(BaseFileInfo(**row))
+        # Строки из БД уже собраны словарями с полями BaseFileInfo/AdminFileInfo (по правам запрашивающего) - отдаются без повторной валидации
+        data_from_fs: List[Dict[str, Any]] = []
         
         # Обработка данных из файловой системы (для админов)
+        await session.release_connection()  # Соединение аутентификации уже вернул get_request_context - к SIGNAL идем без соединений с БД
         if user_data["privilege_id"] == PRIVILEGE_MAPPING["Admin"] and with_data_from_fs is not False:
             for doc_id in data_from_db["data"]:
                 row = data_from_db["data"][doc_id]
                 fs_info = await FileStoreService.get_doc_info_from_fs(row["path"])
-                response_content.data_from_fs.append(FileInfoFromFS(**fs_info))
-        
-        response_content.count = data_from_db["count"]
-        response_content.total_records = data_from_db["total_records"]
-        response_content.total_pages = data_from_db["total_pages"]
-        
-        return response_content
+                data_from_fs.append(FileInfoFromFS(**fs_info).model_dump())
+        
+        return ORJSONResponse(
+            content={
+                "data_from_db": list(data_from_db["data"].values()),
+                "data_from_fs": data_from_fs,
+                "count": data_from_db["count"],
+                "total_records": data_from_db["total_records"],
+                "total_pages": data_from_db["total_pages"],
+            }
+        )
     except AssertionError as e:
         error_message = str(e)
         formatted_traceback = traceback.format_exc()
@@ -495,21 +543,17 @@ async def get_user_dirs_info(
     filter: Optional[FiltersUserDirsInfo] = None,
     order: Optional[OrdersUserDirsInfo] = None,
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
     session: AsyncSession = Depends(get_async_session),
     
     client_state: Optional[ClientState] = None,
 ) -> ResponseGetUserDirsInfo:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
         response_content = ResponseGetUserDirsInfo(
@@ -547,6 +591,7 @@ async def get_user_dirs_info(
                 response_content.data_from_db.append(BaseDirInfo(**row))
         
         # Обработка данных из файловой системы (для админов)
+        await session.release_connection()  # Соединение аутентификации уже вернул get_request_context - к SIGNAL идем без соединений с БД
         if user_data["privilege_id"] == PRIVILEGE_MAPPING["Admin"] and with_data_from_fs is not False:
             for dir_id in data_from_db["data"]:
                 row = data_from_db["data"][dir_id]
@@ -594,6 +639,168 @@ async def get_user_dirs_info(
     finally:
         await session.rollback()
 
+@router.get(
+    "/get_dir_size",
+    description="""
+    Получение количества и суммарного размера документов директории (вместе со всеми поддиректориями).
+    Пользователь может запросить только информацию о своих директориях.
+    
+    output: ResponseGetDirSize
+    """,
+    dependencies=[Depends(check_app_auth)],
+)
+@limiter.limit("30/second")
+async def get_dir_size(
+    request: Request,
+    directory_uuid: str = Query(
+        ...,
+        description="UUID Директории.",
+        min_length=36,
+        max_length=36
+    ),
+    
+    token: str = Depends(UserQaSM.get_current_user_data),
+    
+    session: AsyncSession = Depends(get_async_session),
+) -> ResponseGetDirSize:
+    try:
+        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        
+        dir_size: Dict[str, str|int] = await FileStoreService.get_dir_size(
+            session=session,
+            
+            requester_user_uuid=user_data["user_uuid"],
+            requester_user_privilege=user_data["privilege_id"],
+            directory_uuid=directory_uuid,
+        )
+        
+        return ResponseGetDirSize(**dir_size)
+    except AssertionError as e:
+        error_message = str(e)
+        formatted_traceback = traceback.format_exc()
+        
+        response_content = {"msg": f"{error_message}\n{formatted_traceback}"}
+        return JSONResponse(content=response_content)
+    
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        else:
+            error_message = str(e)
+            formatted_traceback = traceback.format_exc()
+            
+            log_id = await ReferenceService.create_errlog(
+                endpoint="get_dir_size",
+                params={
+                    "directory_uuid": directory_uuid,
+                },
+                msg=f"{error_message}\n{formatted_traceback}",
+                user_uuid=user_data["user_uuid"],
+            )
+            
+            response_content = {"msg": f"ОШИБКА! #{log_id}"}
+            return JSONResponse(content=response_content)
+    finally:
+        await session.rollback()
+
+@router.get(
+    "/get_storage_usage",
+    description="""
+    Получение занятого места в хранилище (только для Админа).
+    Без параметров - Пользователи, отсортированные по занятому месту (с пагинацией).
+    Для Контрагента/Заявки/Заявки на КП нужно указать UUID их директории.
+    
+    state: ClientState
+    output: ResponseGetStorageUsage
+    """,
+    dependencies=[Depends(check_app_auth)],
+)
+@limiter.limit("30/second")
+async def get_storage_usage(
+    request: Request,
+    user_uuid: Optional[str] = Query(
+        None,
+        description="(Опиционально) UUID Пользователя.",
+        min_length=36,
+        max_length=36
+    ),
+    directory_uuid: Optional[str] = Query(
+        None,
+        description="(Опиционально) UUID Директории (учитываются все поддиректории).",
+        min_length=36,
+        max_length=36
+    ),
+    
+    page: Optional[int] = Query(
+        None,
+        description="Пагинация. (По умолчанию - 1)",
+        example=1
+    ),
+    page_size: Optional[int] = Query(
+        None,
+        description="Размер страницы (По умолчанию - 50).",
+        example=50
+    ),
+    
+    context: RequestContext = Depends(get_request_context),
+    
+    session: AsyncSession = Depends(get_async_session),
+    
+    client_state: Optional[ClientState] = None,
+) -> ResponseGetStorageUsage:
+    try:
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
+        
+        if client_state is None:
+            client_state: ClientState = context.client_state
+        client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
+        
+        storage_usage: Dict[str, List[Dict[str, Any]]] = await FileStoreService.get_storage_usage(
+            session=session,
+            
+            requester_user_uuid=user_data["user_uuid"],
+            requester_user_privilege=user_data["privilege_id"],
+            user_uuid=user_uuid,
+            directory_uuid=directory_uuid,
+            
+            page=page,
+            page_size=page_size,
+            
+            tz=client_state_data.get("tz"),
+        )
+        
+        return ResponseGetStorageUsage(**storage_usage)
+    except AssertionError as e:
+        error_message = str(e)
+        formatted_traceback = traceback.format_exc()
+        
+        response_content = {"msg": f"{error_message}\n{formatted_traceback}"}
+        return JSONResponse(content=response_content)
+    
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        else:
+            error_message = str(e)
+            formatted_traceback = traceback.format_exc()
+            
+            log_id = await ReferenceService.create_errlog(
+                endpoint="get_storage_usage",
+                params={
+                    "user_uuid": user_uuid,
+                    "directory_uuid": directory_uuid,
+                    "page": page,
+                    "page_size": page_size,
+                },
+                msg=f"{error_message}\n{formatted_traceback}",
+                user_uuid=user_data["user_uuid"],
+            )
+            
+            response_content = {"msg": f"ОШИБКА! #{log_id}"}
+            return JSONResponse(content=response_content)
+    finally:
+        await session.rollback()
+
 @router.put(
     "/change_visibility",
     description="""
@@ -2,22 +2,21 @@ import datetime
 import traceback
 from typing import Any, Dict, List, Literal, Optional
 
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
-from connection_module import get_async_session
+from connection_module import get_async_session, get_async_read_session
 from lifespan import limiter
-from security import check_app_auth
-from src.schemas.user_schema import ClientState
-from src.service.user_service import UserService
+from security import check_app_auth, get_request_context
+from src.schemas.user_schema import ClientState, RequestContext
 from src.service.reference_service import ReferenceService
-from src.schemas.notification_schema import FiltersNotifications, NotificationData, OrdersNotifications, CreateNotificationDataSchema, ResponseGetNotifications
-from src.models.notification_models import Notification
+from src.schemas.notification_schema import FiltersNotifications, OrdersNotifications, CreateNotificationDataSchema, ResponseGetNotifications
 from src.service.notification_service import NotificationService
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager as UserQaSM
 from src.utils.reference_mapping_data.notification.mapping import NOTIFICATION_SUBJECT_MAPPING
-from src.utils.tz_converter import convert_tz
+from src.utils.tz_converter import format_dt
 
 
 router = APIRouter(
@@ -188,25 +187,21 @@ async def get_notifications(
     filter: Optional[FiltersNotifications] = None,
     order: Optional[OrdersNotifications] = None,
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
     
     client_state: Optional[ClientState] = None,
 ) -> ResponseGetNotifications:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
-        notification_objects: Dict[str, List[Optional[Notification]]|Optional[int]] = await NotificationService.get_notifications(
+        notification_objects: Dict[str, List[Row]|Optional[int]] = await NotificationService.get_notifications(
             session=session,
             
             requester_user_id=user_data["user_id"],
@@ -226,37 +221,36 @@ async def get_notifications(
             order=order,
         )
         
-        response_content = ResponseGetNotifications(
-            data=[],
-            count=0,
-            total_records=None,
-            total_pages=None,
-        )
-        
-        for notification_object in notification_objects["data"]:
-            notification = NotificationData(
-                uuid=notification_object.uuid,
-                for_admin=notification_object.for_admin,
-                subject={v:k for k,v in NOTIFICATION_SUBJECT_MAPPING.items()}[notification_object.subject_id] if notification_object.subject_id else None,
-                subject_uuid=notification_object.subject_uuid,
-                initiator_user_id=notification_object.initiator_user_id,
-                initiator_user_uuid=notification_object.initiator_user_uuid,
-                recipient_user_id=notification_object.recipient_user_id,
-                recipient_user_uuid=notification_object.recipient_user_uuid,
-                data=notification_object.data,
-                is_read=notification_object.is_read,
-                read_at=convert_tz(notification_object.read_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if notification_object.read_at else None,
-                is_important=notification_object.is_important,
-                time_importance_change=convert_tz(notification_object.time_importance_change.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if notification_object.time_importance_change else None,
-                created_at=convert_tz(notification_object.created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data.get("tz")) if notification_object.created_at else None,
-            )
-            response_content.data.append(notification)
+        # Ответ собирается словарями прямо из строк запроса (схема ResponseGetNotifications) - без промежуточных Pydantic-моделей и их повторной валидации
+        tz: Optional[str] = client_state_data.get("tz")
+        data: List[Dict[str, Any]] = [
+            {
+                "uuid": notification_object.uuid,
+                "for_admin": notification_object.for_admin,
+                "subject": NOTIFICATION_SUBJECT_MAPPING.name_of(notification_object.subject_id),
+                "subject_uuid": notification_object.subject_uuid,
+                "initiator_user_id": notification_object.initiator_user_id,
+                "initiator_user_uuid": notification_object.initiator_user_uuid,
+                "recipient_user_id": notification_object.recipient_user_id,
+                "recipient_user_uuid": notification_object.recipient_user_uuid,
+                "data": notification_object.data,
+                "is_read": notification_object.is_read,
+                "read_at": format_dt(notification_object.read_at, tz_city=tz),
+                "is_important": notification_object.is_important,
+                "time_importance_change": format_dt(notification_object.time_importance_change, tz_city=tz),
+                "created_at": format_dt(notification_object.created_at, tz_city=tz),
+            }
+            for notification_object in notification_objects["data"]
+        ]
         
-        response_content.count = len(response_content.data)
-        response_content.total_records = notification_objects["total_records"]
-        response_content.total_pages = notification_objects["total_pages"]
-        
-        return response_content
+        return ORJSONResponse(
+            content={
+                "data": data,
+                "count": len(data),
+                "total_records": notification_objects["total_records"],
+                "total_pages": notification_objects["total_pages"],
+            }
+        )
     except AssertionError as e:
         error_message = str(e)
         formatted_traceback = traceback.format_exc()
@@ -2,27 +2,29 @@ import traceback
 from typing import Any, Dict, List, Literal, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse
 
 from connection_module import get_async_session
 from lifespan import limiter
-from security import check_app_auth
-from src.service.user_service import UserService
-from src.schemas.user_schema import ClientState
+from security import check_app_auth, get_request_context
+from src.schemas.user_schema import ClientState, RequestContext
 from src.models.reference_models import ServiceNote
 from src.schemas.reference_schema import FiltersServiceNote, OrdersServiceNote, ResponseGetServiceNotes, ServiceNoteData
 from src.service.reference_service import ReferenceService
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager as UserQaSM
 from src.utils.reference_mapping_data.app.app_mapping_data import COUNTRY_MAPPING_RUSSIA
 from src.utils.reference_mapping_data.user.mapping import SERVICE_NOTE_SUBJECT_MAPPING
-from src.utils.tz_converter import convert_tz
+from src.utils.prepared_response import PreparedJSONResponse
+from src.utils.tz_converter import format_dt
 
 
 router = APIRouter(
     tags=["Reference"],
 )
 
+COUNTRIES_RESPONSE = PreparedJSONResponse(COUNTRY_MAPPING_RUSSIA)
+
 @router.get(
     "/check_uuid",
     description="""
@@ -230,21 +232,17 @@ async def get_service_notes(
     filter: Optional[FiltersServiceNote] = None,
     order: Optional[OrdersServiceNote] = None,
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
     session: AsyncSession = Depends(get_async_session),
     
     client_state: Optional[ClientState] = None,
 ) -> ResponseGetServiceNotes:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()
         
         service_notes_objects: Dict[str, List[Optional[ServiceNote]]|Optional[int]] = await ReferenceService.get_service_notes(
@@ -275,14 +273,14 @@ async def get_service_notes(
             service_note_object: ServiceNote = service_note_object
             service_note = ServiceNoteData(
                 id=service_note_object.id,
-                subject={v:k for k,v in SERVICE_NOTE_SUBJECT_MAPPING.items()}[service_note_object.subject_id] if service_note_object.subject_id else None,
+                subject=SERVICE_NOTE_SUBJECT_MAPPING.name_of(service_note_object.subject_id),
                 subject_uuid=service_note_object.subject_uuid,
                 creator_id=service_note_object.creator_id,
                 creator_uuid=service_note_object.creator_uuid,
                 title=service_note_object.title,
                 data=service_note_object.data,
-                updated_at=convert_tz(service_note_object.updated_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data["data"].get("tz")) if service_note_object.updated_at else None,
-                created_at=convert_tz(service_note_object.created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=client_state_data["data"].get("tz")) if service_note_object.created_at else None,
+                updated_at=format_dt(service_note_object.updated_at, tz_city=client_state_data["data"].get("tz")),
+                created_at=format_dt(service_note_object.created_at, tz_city=client_state_data["data"].get("tz")),
             )
             response_content.data.append(service_note)
         
@@ -482,15 +480,19 @@ async def delete_service_notes(
         await session.rollback()
 
 
-@router.get("/get_countries", dependencies=[Depends(check_app_auth)],)
+@router.get(
+    "/get_countries",
+    description="""
+    Справочник стран (названия на русском).
+    Ответ не зависит от Пользователя (токен не требуется): отдается с ETag и Cache-Control, при совпадающем If-None-Match - 304.
+    """,
+    dependencies=[Depends(check_app_auth)],
+)
 @limiter.limit("30/second")
 async def get_countries(
     request: Request,
-    token: str = Depends(UserQaSM.get_current_user_data),
-) -> JSONResponse:
-    return JSONResponse(
-        content=COUNTRY_MAPPING_RUSSIA
-    )
+) -> Response:
+    return COUNTRIES_RESPONSE.for_request(request)
 
 @router.get("/healthcheck", dependencies=[Depends(check_app_auth)],)
 @limiter.limit("1/second")
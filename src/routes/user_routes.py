@@ -7,9 +7,9 @@ from fastapi.responses import HTMLResponse, JSONResponse
 
 from config import ADMIN_UUID, APP_URL, JINJA2_TEMPLATES
 from connection_module import get_async_session
-from security import check_app_auth
+from security import check_app_auth, get_request_context
 from src.service.reference_service import ReferenceService
-from src.schemas.user_schema import AuthData, ClientState, ConfirmationV2Data, FiltersUsersInfo, OrdersUsersInfo, ResponseAuth, ResponseGetUsersInfo, UpdateUserContactData
+from src.schemas.user_schema import AuthData, ClientState, ConfirmationV2Data, FiltersUsersInfo, OrdersUsersInfo, RequestContext, ResponseAuth, ResponseGetUsersInfo, UpdateUserContactData
 from src.service.user_service import UserService
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager as UserQaSM
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
@@ -522,21 +522,17 @@ async def get_users_info(
     filter: Optional[FiltersUsersInfo] = None,
     order: Optional[OrdersUsersInfo] = None,
     
-    token: str = Depends(UserQaSM.get_current_user_data),
+    context: RequestContext = Depends(get_request_context),
     
     session: AsyncSession = Depends(get_async_session),
     
     client_state: Optional[ClientState] = None,
 ) -> ResponseGetUsersInfo:
     try:
-        user_data: Dict[str, str|int] = token.model_dump()   # Парсинг данных пользователя
+        user_data: Dict[str, str|int] = context.user.model_dump()   # Парсинг данных пользователя
         
         if client_state is None:
-            client_state: ClientState = await UserService.get_client_state(
-                requester_user_uuid=user_data["user_uuid"],
-                requester_user_privilege=user_data["privilege_id"],
-                user_uuid=user_data["user_uuid"],
-            )
+            client_state: ClientState = context.client_state
         client_state_data: Dict[str, Any] = client_state.model_dump()["data"]
         
         response_content: ResponseGetUsersInfo = await UserService.get_users_info(
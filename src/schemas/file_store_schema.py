@@ -164,3 +164,26 @@ class ResponseGetUserDirsInfo(BaseModel):
     count: int = Field(0, description="Количество записей по текущей фильтрации (с учетом пагинации).")
     total_records: Optional[int] = Field(None, description="Общее количество записей.")
     total_pages: Optional[int] = Field(None, description="Общее количество страниц.")
+
+class ResponseGetDirSize(BaseModel):
+    directory_uuid: str = Field(..., description="UUID директории.")
+    documents_count: int = Field(0, description="Количество неудаленных документов в директории и всех ее поддиректориях.")
+    size: int = Field(0, description="Суммарный размер документов в байтах.")
+
+class StorageUsageInfo(BaseModel):
+    documents_count: int = Field(0, description="Количество неудаленных документов.")
+    size: int = Field(0, description="Занятое место в байтах.")
+    visible_documents_count: int = Field(0, description="Количество видимых документов.")
+    visible_size: int = Field(0, description="Занятое видимыми документами место в байтах.")
+    quota: Optional[int] = Field(None, description="Квота в байтах (null - без ограничений).")
+    updated_at: Optional[str] = Field(None, description="Дата-время последнего изменения счетчиков (Формат: 'dd.mm.YYYY HH:MM:SS UTC').")
+
+class UserStorageUsageInfo(StorageUsageInfo):
+    user_uuid: str = Field(..., description="UUID Пользователя.")
+
+class DirectoryStorageUsageInfo(StorageUsageInfo):
+    directory_uuid: str = Field(..., description="UUID директории (учитываются все поддиректории).")
+
+class ResponseGetStorageUsage(BaseModel):
+    users: List[Optional[UserStorageUsageInfo]] = Field([], description="Занятое место по Пользователям.")
+    directories: List[Optional[DirectoryStorageUsageInfo]] = Field([], description="Занятое место по директориям.")
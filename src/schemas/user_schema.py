@@ -94,6 +94,10 @@ class ClientState(BaseModel):
     data: Dict = Field({}, description="Данные состояния.")
     ttl: Optional[int] = Field(None, description="Время жизни (В ответе: |TTL| -1 => нет TTL; -2 => ключ не существует).")
 
+class RequestContext(BaseModel):
+    user: UserSchema = Field(..., description="Данные пользователя, выполняющего запрос.")
+    client_state: ClientState = Field(..., description="Состояние клиента (часовой пояс и настройки).")
+
 class UpdateUserContactData(BaseModel):
     new_email: Optional[str] = Field("~", description="Новый email-адрес.")
     email_notification: str|bool = Field("~", description="Пользователь хочет получать уведомления на email-адрес? (True-да/False-нет)")
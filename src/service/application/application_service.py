@@ -1,4 +1,4 @@
-from typing import List, Literal, Optional, Tuple
+from typing import List, Literal, Tuple
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -90,24 +90,22 @@ class ApplicationService:
         if not applications_uuids:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Для удаления Заявки, нужно указать хотя бы 1 UUID!")
         
-        application_ids_with_application_data_ids_with_dir_uuid: List[Tuple[int, int, str]] = [] # type: ignore
-        for application_uuid in applications_uuids:
-            application_check_access_response_object: Optional[Tuple[int, int, str]] = await ApplicationQueryAndStatementManager.check_access(
-                session=session,
-                
-                requester_user_uuid=requester_user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                application_uuid=application_uuid,
-                for_update_or_delete_application=True,
-            )
-            
-            if application_check_access_response_object is None:
-                if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
-                    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете удалять информацию о Заявках других Пользователей или же доступ к редактирования данной Заявки ограничен!")
-                else:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Информация о Контрагенте не была найдена!")
+        application_check_access_response_objects, denied_application_uuids = await ApplicationQueryAndStatementManager.check_access_many(
+            session=session,
             
-            application_ids_with_application_data_ids_with_dir_uuid.append(application_check_access_response_object)
+            requester_user_uuid=requester_user_uuid,
+            requester_user_privilege=requester_user_privilege,
+            application_uuids=applications_uuids,
+            for_update_or_delete_application=True,
+        )
+        
+        if denied_application_uuids:
+            if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете удалять информацию о Заявках других Пользователей или же доступ к редактирования данной Заявки ограничен! UUID: {", ".join(denied_application_uuids)}')
+            else:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Информация о Заявке не была найдена! UUID: {", ".join(denied_application_uuids)}')
+        
+        application_ids_with_application_data_ids_with_dir_uuid: List[Tuple[int, int, str]] = list(application_check_access_response_objects.values())
         
         for _, _, dir_uuid in application_ids_with_application_data_ids_with_dir_uuid:
             await FileStoreService.delete_doc_or_dir(
@@ -125,7 +123,7 @@ class ApplicationService:
         await CommercialProposalQueryAndStatementManager.delete_commercial_proposals(
             session=session,
             
-            application_uuid=application_uuid,
+            application_uuids=list(application_check_access_response_objects),
         )
         
         await ApplicationQueryAndStatementManager.delete_applications(
@@ -2,6 +2,7 @@ import datetime
 from typing import Any, Dict, List, Optional, Tuple, Literal
 
 from fastapi import HTTPException, status
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from connection_module import SignalConnector
@@ -159,115 +160,118 @@ class MTApplicationService:
             user_id=user_id,
         )
         
-        new_application_dir_data: Dict[str, Any] = await FileStoreService.create_directory(
-            session=session,
-            
-            requester_user_uuid=requester_user_uuid,
-            requester_user_privilege=requester_user_privilege,
-            owner_s3_login=user_s3_login,
-            owner_user_uuid=user_uuid,
-            directory_type=DIRECTORY_TYPE_MAPPING["Директория заявки"],
-            new_directory_uuid=new_directory_uuid,
-            parent_directory_uuid=parent_directory_uuid,
-        )
-        
-        new_application_uuid_coro = await SignalConnector.generate_identifiers(target="Заявка", count=1)
+        await session.release_connection()
+        new_application_uuid_coro = await SignalConnector.generate_identifiers(target="Заявка", count=1)  # Внешний вызов (DELCREDA SIGNAL) - до начала записи в БД
         new_application_uuid = new_application_uuid_coro[0]
-        
-        new_application_with_data: Tuple[Application, MTApplicationData] = await MTApplicationQueryAndStatementManager.create_application(
-            session=session,
-            
-            name=None,  # Значение генерируется само на уровне БД
-            user_id=user_id,
-            user_uuid=user_uuid,
-            new_application_uuid=new_application_uuid,
-            counterparty_id=counterparty_id,
-            counterparty_uuid=counterparty_uuid,
-            directory_id=new_application_dir_data["id"],
-            directory_uuid=new_application_dir_data["uuid"],
-            
-            # MTApplicationData
-            order_name=order_name,
-            payment_deadline_not_earlier_than=payment_deadline_not_earlier_than,
-            payment_deadline_no_later_than=payment_deadline_no_later_than,
-            invoice_date=invoice_date,
-            
-            type=type,
-            
-            invoice_currency=invoice_currency,
-            invoice_amount=invoice_amount,
-            payment_amount=payment_amount,
-            payment_amount_in_words=payment_amount_in_words,
-            partial_payment_allowed=partial_payment_allowed,
-            invoice_number=invoice_number,
-            
-            amount_to_withdraw=amount_to_withdraw,
-            amount_to_replenish=amount_to_replenish,
-            amount_to_principal=amount_to_principal,
-            amount_credited=amount_credited,
-            is_amount_different=is_amount_different,
-            source_bank=source_bank,
-            target_bank=target_bank,
-            source_currency=source_currency,
-            target_currency=target_currency,
-            amount=amount,
-            subagent_bank=subagent_bank,
-            
-            payment_purpose_ru=payment_purpose_ru,
-            payment_purpose_en=payment_purpose_en,
-            payment_category_golomt=payment_category_golomt,
-            payment_category_td=payment_category_td,
-            goods_description_en=goods_description_en,
-            contract_date=contract_date,
+        new_directory_uuid = await FileStoreService.reserve_directory_uuid(new_directory_uuid=new_directory_uuid)
+        
+        async with session.unit_of_work():  # Директория, Заявка и Чат - одной транзакцией
+            new_application_dir_data: Dict[str, Any] = await FileStoreService.create_directory(
+                session=session,
+                
+                requester_user_uuid=requester_user_uuid,
+                requester_user_privilege=requester_user_privilege,
+                owner_s3_login=user_s3_login,
+                owner_user_uuid=user_uuid,
+                directory_type=DIRECTORY_TYPE_MAPPING["Директория заявки"],
+                new_directory_uuid=new_directory_uuid,
+                parent_directory_uuid=parent_directory_uuid,
+            )
             
-            contract_name=contract_name,
-            contract_number=contract_number,
-            vat_exempt=vat_exempt,
-            vat_percentage=vat_percentage,
-            vat_amount=vat_amount,
-            priority=priority,
-            company_name_latin=company_name_latin,
-            company_name_national=company_name_national,
-            company_legal_form=company_legal_form,
-            company_address_latin=company_address_latin,
-            company_registration_number=company_registration_number,
-            company_tax_number=company_tax_number,
-            company_internal_identifier=company_internal_identifier,
-            recipient_first_name=recipient_first_name,
-            recipient_last_name=recipient_last_name,
-            recipient_id_number=recipient_id_number,
-            recipient_phone=recipient_phone,
-            recipient_website=recipient_website,
-            transaction_confirmation_type=transaction_confirmation_type,
-            
-            recipient_bank_name_latin=recipient_bank_name_latin,
-            recipient_bank_name_national=recipient_bank_name_national,
-            recipient_bank_legal_form=recipient_bank_legal_form,
-            recipient_bank_registration_number=recipient_bank_registration_number,
-            recipient_account_or_iban=recipient_account_or_iban,
-            recipient_swift=recipient_swift,
-            recipient_bic=recipient_bic,
-            recipient_bank_code=recipient_bank_code,
-            recipient_bank_branch=recipient_bank_branch,
-            spfs=spfs,
-            cips=cips,
-            recipient_bank_address=recipient_bank_address,
-            recipient_bank_correspondent_account=recipient_bank_correspondent_account,
+            new_application_with_data: Tuple[Application, MTApplicationData] = await MTApplicationQueryAndStatementManager.create_application(
+                session=session,
+                
+                name=None,  # Значение генерируется само на уровне БД
+                user_id=user_id,
+                user_uuid=user_uuid,
+                new_application_uuid=new_application_uuid,
+                counterparty_id=counterparty_id,
+                counterparty_uuid=counterparty_uuid,
+                directory_id=new_application_dir_data["id"],
+                directory_uuid=new_application_dir_data["uuid"],
+                
+                # MTApplicationData
+                order_name=order_name,
+                payment_deadline_not_earlier_than=payment_deadline_not_earlier_than,
+                payment_deadline_no_later_than=payment_deadline_no_later_than,
+                invoice_date=invoice_date,
+                
+                type=type,
+                
+                invoice_currency=invoice_currency,
+                invoice_amount=invoice_amount,
+                payment_amount=payment_amount,
+                payment_amount_in_words=payment_amount_in_words,
+                partial_payment_allowed=partial_payment_allowed,
+                invoice_number=invoice_number,
+                
+                amount_to_withdraw=amount_to_withdraw,
+                amount_to_replenish=amount_to_replenish,
+                amount_to_principal=amount_to_principal,
+                amount_credited=amount_credited,
+                is_amount_different=is_amount_different,
+                source_bank=source_bank,
+                target_bank=target_bank,
+                source_currency=source_currency,
+                target_currency=target_currency,
+                amount=amount,
+                subagent_bank=subagent_bank,
+                
+                payment_purpose_ru=payment_purpose_ru,
+                payment_purpose_en=payment_purpose_en,
+                payment_category_golomt=payment_category_golomt,
+                payment_category_td=payment_category_td,
+                goods_description_en=goods_description_en,
+                contract_date=contract_date,
+                
+                contract_name=contract_name,
+                contract_number=contract_number,
+                vat_exempt=vat_exempt,
+                vat_percentage=vat_percentage,
+                vat_amount=vat_amount,
+                priority=priority,
+                company_name_latin=company_name_latin,
+                company_name_national=company_name_national,
+                company_legal_form=company_legal_form,
+                company_address_latin=company_address_latin,
+                company_registration_number=company_registration_number,
+                company_tax_number=company_tax_number,
+                company_internal_identifier=company_internal_identifier,
+                recipient_first_name=recipient_first_name,
+                recipient_last_name=recipient_last_name,
+                recipient_id_number=recipient_id_number,
+                recipient_phone=recipient_phone,
+                recipient_website=recipient_website,
+                transaction_confirmation_type=transaction_confirmation_type,
+                
+                recipient_bank_name_latin=recipient_bank_name_latin,
+                recipient_bank_name_national=recipient_bank_name_national,
+                recipient_bank_legal_form=recipient_bank_legal_form,
+                recipient_bank_registration_number=recipient_bank_registration_number,
+                recipient_account_or_iban=recipient_account_or_iban,
+                recipient_swift=recipient_swift,
+                recipient_bic=recipient_bic,
+                recipient_bank_code=recipient_bank_code,
+                recipient_bank_branch=recipient_bank_branch,
+                spfs=spfs,
+                cips=cips,
+                recipient_bank_address=recipient_bank_address,
+                recipient_bank_correspondent_account=recipient_bank_correspondent_account,
+                
+                sender_company_name_latin=sender_company_name_latin,
+                sender_company_name_national=sender_company_name_national,
+                sender_company_legal_form=sender_company_legal_form,
+                sender_country=sender_country,
+                
+                comment=comment,
+            )
             
-            sender_company_name_latin=sender_company_name_latin,
-            sender_company_name_national=sender_company_name_national,
-            sender_company_legal_form=sender_company_legal_form,
-            sender_country=sender_country,
-            
-            comment=comment,
-        )
-        
-        new_chat = await ChatService.create_chat(
-            session=session,
-            
-            chat_subject="Заявка",
-            subject_uuid=new_application_uuid,
-        )
+            new_chat = await ChatService.create_chat(
+                session=session,
+                
+                chat_subject="Заявка",
+                subject_uuid=new_application_uuid,
+            )
         
         return new_application_with_data, new_chat
     
@@ -290,7 +294,7 @@ class MTApplicationService:
         
         filter: Optional[FiltersApplications] = None,
         order: Optional[OrdersApplications] = None,
-    ) -> Dict[str, List[Optional[Application]]|Optional[int]]:
+    ) -> Dict[str, List[Row]|Optional[int]]:
         if requester_user_privilege == PRIVILEGE_MAPPING["Client"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостаточно прав!")
         
@@ -321,7 +325,7 @@ class MTApplicationService:
                 if counterparty_check_access_response_object is None:
                     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не являетесь владельцем данной записи о Контрагенте или её не существует!")
         
-        applications: Dict[str, List[Optional[Application]]|Optional[int]] = await MTApplicationQueryAndStatementManager.get_applications(
+        applications: Dict[str, List[Row]|Optional[int]] = await MTApplicationQueryAndStatementManager.get_applications(
             session=session,
             
             user_uuid=user_uuid,
@@ -350,7 +354,7 @@ class MTApplicationService:
         
         application_uuid_list: List[Optional[str]],
         counterparty_uuid: Optional[str],
-    ) -> List[Optional[MTApplicationData]]:
+    ) -> List[Row]:
         if requester_user_privilege == PRIVILEGE_MAPPING["Client"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостаточно прав!")
         
@@ -369,7 +373,7 @@ class MTApplicationService:
                     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не являетесь владельцем данной записи о Контрагенте или её не существует!")
             
             if application_uuid_list:
-                applications: Dict[str, List[Optional[Application]]|Optional[int]] = await MTApplicationQueryAndStatementManager.get_applications(
+                applications: Dict[str, List[Row]|Optional[int]] = await MTApplicationQueryAndStatementManager.get_applications(
                     session=session,
                     
                     user_uuid=requester_user_uuid,
@@ -380,7 +384,7 @@ class MTApplicationService:
                 if len(user_uuid) != 1 or user_uuid[0] != requester_user_uuid:
                     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете просматривать Данные Заявок других Пользователей!")
         
-        applications_data: List[Optional[MTApplicationData]] = await MTApplicationQueryAndStatementManager.get_applications_data(
+        applications_data: List[Row] = await MTApplicationQueryAndStatementManager.get_applications_data(
             session=session,
             
             application_uuid_list=application_uuid_list,
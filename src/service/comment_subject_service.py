@@ -25,7 +25,7 @@ class CommentSubjectService:
         
         data: Optional[str],
     ) -> None:
-        subject = {v: k for k, v in COMMENT_SUBJECT_MAPPING.items()}[subject_id]
+        subject = COMMENT_SUBJECT_MAPPING.reverse[subject_id]
         if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете создавать Комментарии для {"Заявки" if subject == "Заявка" else "Контрагент" if subject == "Контрагент" else "Заявки на КП"}!')
         
@@ -58,7 +58,7 @@ class CommentSubjectService:
         subject_uuid: str,
     ) -> List[Optional[CommentSubject]]:
         if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
-            subject = {v: k for k, v in COMMENT_SUBJECT_MAPPING.items()}[subject_id]
+            subject = COMMENT_SUBJECT_MAPPING.reverse[subject_id]
             
             if subject == "Заявка":
                 application_check_access_response_object: Optional[Tuple[int, int, str]] = await ApplicationQueryAndStatementManager.check_access(
@@ -103,7 +103,7 @@ class CommentSubjectService:
         
         new_data: Optional[str] = "~",
     ) -> None:
-        subject = {v: k for k, v in COMMENT_SUBJECT_MAPPING.items()}[subject_id]
+        subject = COMMENT_SUBJECT_MAPPING.reverse[subject_id]
         if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете обновлять Комментарии для {"Заявки" if subject == "Заявка" else "Контрагента" if subject == "Контрагент" else "Заявки на КП"}!')
         
@@ -138,7 +138,7 @@ class CommentSubjectService:
         subject_id: int,
         subject_uuid: str,
     ) -> None:
-        subject = {v: k for k, v in COMMENT_SUBJECT_MAPPING.items()}[subject_id]
+        subject = COMMENT_SUBJECT_MAPPING.reverse[subject_id]
         
         if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете обновлять Комментарии для {"Заявки" if subject == "Заявка" else "Контрагента"}!')
@@ -86,6 +86,7 @@ class CommercialProposalService:
             parent_directory_uuid=parent_directory_uuid,
         )
         
+        await session.release_connection()
         new_commercial_proposal_uuid_coro = await SignalConnector.generate_identifiers(target="Заявка", count=1)
         new_commercial_proposal_uuid = new_commercial_proposal_uuid_coro[0]
         
@@ -253,19 +254,17 @@ class CommercialProposalService:
         if not commercial_proposal_uuids:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Для удаления Заявок на КП, нужно указать хотя бы 1 UUID!")
         
-        commercial_proposal_id_and_dir_uuid: List[Tuple[int, str]] = []
-        for commercial_proposal_uuid in commercial_proposal_uuids:
-            commercial_proposal_check_access_response_object: Optional[Tuple[int, str]] = await CommercialProposalQueryAndStatementManager.check_access(
-                session=session,
-                requester_user_uuid=requester_user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                commercial_proposal_uuid=commercial_proposal_uuid,
-                for_update_or_delete_commercial_proposal=True,
-            )
-            if commercial_proposal_check_access_response_object is None:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете удалять Заявки на КП других Пользователей!")
-            
-            commercial_proposal_id_and_dir_uuid.append(commercial_proposal_check_access_response_object)
+        commercial_proposal_check_access_response_objects, denied_commercial_proposal_uuids = await CommercialProposalQueryAndStatementManager.check_access_many(
+            session=session,
+            requester_user_uuid=requester_user_uuid,
+            requester_user_privilege=requester_user_privilege,
+            commercial_proposal_uuids=commercial_proposal_uuids,
+            for_update_or_delete_commercial_proposal=True,
+        )
+        if denied_commercial_proposal_uuids:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете удалять Заявки на КП других Пользователей! UUID: {", ".join(denied_commercial_proposal_uuids)}')
+        
+        commercial_proposal_id_and_dir_uuid: List[Tuple[int, str]] = list(commercial_proposal_check_access_response_objects.values())
         
         for _, dir_uuid in commercial_proposal_id_and_dir_uuid:
             try:
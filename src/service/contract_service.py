@@ -56,6 +56,7 @@ class ContractService:
             user_id=owner_user_id,
         )
         
+        await session.release_connection()
         new_contract_uuid_coro = await SignalConnector.generate_identifiers(target="Договор", count=1)
         new_contract_uuid = new_contract_uuid_coro[0]
         
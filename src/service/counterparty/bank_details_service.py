@@ -22,18 +22,18 @@ class BankDetailsService:
     ) -> None:
         if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
             counterparty_uuid_tuple = tuple(set([new_bank_details.counterparty_uuid for new_bank_details in new_banks_details.new_banks_details]))
-            if len(counterparty_uuid_tuple) != 1:
+            if not counterparty_uuid_tuple or None in counterparty_uuid_tuple:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете добавлять реквизиты к карточкам Контрагента других Пользователей!")
             
-            counterparty_check_access_response_object: Optional[Tuple[int, int, int, str]] = await CounterpartyQueryAndStatementManager.check_access(
+            _, denied_counterparty_uuids = await CounterpartyQueryAndStatementManager.check_access_many(
                 session=session,
                 
                 requester_user_uuid=requester_user_uuid,
                 requester_user_privilege=requester_user_privilege,
-                counterparty_uuid=counterparty_uuid_tuple[0],
+                counterparty_uuids=list(counterparty_uuid_tuple),
             )
-            if counterparty_check_access_response_object is None:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете добавлять реквизиты к карточкам Контрагента других Пользователей!")
+            if denied_counterparty_uuids:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете добавлять реквизиты к карточкам Контрагента других Пользователей! UUID: {", ".join(denied_counterparty_uuids)}')
         
         await BankDetailsQueryAndStatementManager.create_banks_details(
             session=session,
@@ -184,18 +184,18 @@ class BankDetailsService:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете удалять записи о Реквизитах других Пользователей или же Реквизиты с данным id уже удалены!")
             
             if counterparty_uuid_tuple:
-                if len(counterparty_uuid_tuple) != 1:
+                if None in counterparty_uuid_tuple:
                     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете удалять записи о Реквизитах других Пользователей!")
                 
-                counterparty_check_access_response_object: Optional[Tuple[int, int, int, str]] = await CounterpartyQueryAndStatementManager.check_access(
+                _, denied_counterparty_uuids = await CounterpartyQueryAndStatementManager.check_access_many(
                     session=session,
                     
                     requester_user_uuid=requester_user_uuid,
                     requester_user_privilege=requester_user_privilege,
-                    counterparty_uuid=counterparty_uuid_tuple[0],
+                    counterparty_uuids=list(counterparty_uuid_tuple),
                 )
-                if counterparty_check_access_response_object is None:
-                    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете удалять записи о Реквизитах других Пользователей!")
+                if denied_counterparty_uuids:
+                    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете удалять записи о Реквизитах других Пользователей! UUID: {", ".join(denied_counterparty_uuids)}')
         
         await BankDetailsQueryAndStatementManager.delete_banks_details(
             session=session,
@@ -2,22 +2,21 @@ import datetime
 from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from fastapi import HTTPException, status
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from connection_module import SignalConnector
-from src.query_and_statement.commercial_proposal_qas_manager import CommercialProposalQueryAndStatementManager
-from src.service.application.application_service import ApplicationService
-from src.models.application.application_models import Application
-from src.service.application.mt_application_service import MTApplicationService
 from src.schemas.counterparty.counterparty_schema import CreateIndividualDataSchema, CreateLegalEntityDataSchema, FiltersCounterparties, FiltersPersons, OrdersCounterparties, OrdersPersons, CreatePersonsSchema, UpdateCounterpartySchema, UpdateIndividualDataSchema, UpdateLegalEntityDataSchema
 from src.service.chat_service import ChatService
 from src.service.file_store_service import FileStoreService
 from src.models.counterparty.counterparty_models import Counterparty, IndividualData, LegalEntityData, Person
 from src.query_and_statement.counterparty.counterparty_qas_manager import CounterpartyQueryAndStatementManager
+from src.query_and_statement.file_store_qas_manager import FileStoreQueryAndStatementManager
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
 from src.utils.reference_mapping_data.file_store.mapping import DIRECTORY_TYPE_MAPPING
 from src.utils.reference_mapping_data.app.app_mapping_data import COUNTRY_MAPPING
+from src.utils.storage_cleanup import StorageCleanupQueue
 
 
 class CounterpartyService:
@@ -85,58 +84,61 @@ class CounterpartyService:
         if not parent_directory_uuid:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="У Пользователя нет пользовательской Директории!") 
         
-        new_counterparty_dir_data: Dict[str, Any] = await FileStoreService.create_directory(
-            session=session,
-            
-            requester_user_uuid=requester_user_uuid,
-            requester_user_privilege=requester_user_privilege,
-            owner_s3_login=owner_s3_login,
-            owner_user_uuid=owner_user_uuid,
-            directory_type=DIRECTORY_TYPE_MAPPING["Директория контрагента"],
-            new_directory_uuid=new_directory_uuid,
-            parent_directory_uuid=parent_directory_uuid,
-        )
-        
-        new_application_access_list_id: int = await cls.__create_application_access_list(
-            session=session,
-        )
-        new_counter_party_with_data = None
-        if counterparty_type == "ЮЛ":
+        await session.release_connection()
+        new_uuid = None
+        if counterparty_type == "ЮЛ":  # Внешний вызов (DELCREDA SIGNAL) - до начала записи в БД
             new_uuid_coro = await SignalConnector.generate_identifiers(target="ЮЛ", count=1)
             new_uuid = new_uuid_coro[0]
-            
-            new_le_with_data: Tuple[Counterparty, LegalEntityData] = await CounterpartyQueryAndStatementManager.create_counterparty(
+        else:
+            ...  # TODO предусмотреть uuid для ФЛ
+        new_directory_uuid = await FileStoreService.reserve_directory_uuid(new_directory_uuid=new_directory_uuid)
+        
+        async with session.unit_of_work():  # Директория, лист доступа, Контрагент и Чат - одной транзакцией
+            new_counterparty_dir_data: Dict[str, Any] = await FileStoreService.create_directory(
                 session=session,
                 
-                counterparty_type=counterparty_type,
-                
-                owner_user_id=owner_user_id,
+                requester_user_uuid=requester_user_uuid,
+                requester_user_privilege=requester_user_privilege,
+                owner_s3_login=owner_s3_login,
                 owner_user_uuid=owner_user_uuid,
-                new_counterparty_uuid=new_uuid,
-                directory_id=new_counterparty_dir_data["id"],
-                directory_uuid=new_counterparty_dir_data["uuid"],
-                application_access_list_id=new_application_access_list_id,
-                
-                country=country,
-                identifier_type=identifier_type,
-                identifier_value=identifier_value,
-                tax_identifier=tax_identifier,
-                
-                # CounterpartyData
-                counterparty_data=counterparty_data,
+                directory_type=DIRECTORY_TYPE_MAPPING["Директория контрагента"],
+                new_directory_uuid=new_directory_uuid,
+                parent_directory_uuid=parent_directory_uuid,
             )
-            new_counter_party_with_data = new_le_with_data
-        else:
-            ...  # TODO предусмотреть uuid для ФЛ
-        
-        
-        
-        new_chat = await ChatService.create_chat(
-            session=session,
             
-            chat_subject="Контрагент",
-            subject_uuid=new_uuid,
-        )
+            new_application_access_list_id: int = await cls.__create_application_access_list(
+                session=session,
+            )
+            new_counter_party_with_data = None
+            if counterparty_type == "ЮЛ":
+                new_le_with_data: Tuple[Counterparty, LegalEntityData] = await CounterpartyQueryAndStatementManager.create_counterparty(
+                    session=session,
+                    
+                    counterparty_type=counterparty_type,
+                    
+                    owner_user_id=owner_user_id,
+                    owner_user_uuid=owner_user_uuid,
+                    new_counterparty_uuid=new_uuid,
+                    directory_id=new_counterparty_dir_data["id"],
+                    directory_uuid=new_counterparty_dir_data["uuid"],
+                    application_access_list_id=new_application_access_list_id,
+                    
+                    country=country,
+                    identifier_type=identifier_type,
+                    identifier_value=identifier_value,
+                    tax_identifier=tax_identifier,
+                    
+                    # CounterpartyData
+                    counterparty_data=counterparty_data,
+                )
+                new_counter_party_with_data = new_le_with_data
+            
+            new_chat = await ChatService.create_chat(
+                session=session,
+                
+                chat_subject="Контрагент",
+                subject_uuid=new_uuid,
+            )
         
         return new_counter_party_with_data, new_chat
     
@@ -168,7 +170,7 @@ class CounterpartyService:
         
         filter: Optional[FiltersCounterparties] = None,
         order: Optional[OrdersCounterparties] = None,
-    ) -> Dict[str, List[Optional[Counterparty|int|bool]] | List[Optional[Tuple[Counterparty, bool]]]]:
+    ) -> Dict[str, List[Row]|Optional[int]]:
         if page or page_size:
             if (isinstance(page, int) and page <= 0) or (isinstance(page_size, int) and page_size <= 0):
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Не корректное разделение на страницы, запрошенных данных!")
@@ -181,7 +183,7 @@ class CounterpartyService:
             if user_uuid != requester_user_uuid:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете просмотреть карточки Контрагентов других пользователей!")
         
-        counterparties: Dict[str, List[Optional[Counterparty|int|bool]] | List[Optional[Tuple[Counterparty, bool]]]] = await CounterpartyQueryAndStatementManager.get_counterparties(
+        counterparties: Dict[str, List[Row]|Optional[int]] = await CounterpartyQueryAndStatementManager.get_counterparties(
             session=session,
             
             counterparty_type=counterparty_type,
@@ -315,19 +317,17 @@ class CounterpartyService:
             if user_uuid != requester_user_uuid:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете просмотреть данные карточек Контрагента других пользователей!")
         
-        counterparty_data_ids: List[Optional[int]] = []
-        for counterparty_uuid in tuple(set(counterparty_uuid_list)):
-            counterparty_check_access_response_object: Optional[Tuple[int, int, int, str]] = await CounterpartyQueryAndStatementManager.check_access(
-                session=session,
-                
-                requester_user_uuid=user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                counterparty_uuid=counterparty_uuid,
-            )
-            if counterparty_check_access_response_object is None:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не являетесь владельцем карточки Контрагента с UUID "{counterparty_uuid}"!')
+        counterparty_check_access_response_objects, denied_counterparty_uuids = await CounterpartyQueryAndStatementManager.check_access_many(
+            session=session,
             
-            counterparty_data_ids.append(counterparty_check_access_response_object[2])
+            requester_user_uuid=user_uuid,
+            requester_user_privilege=requester_user_privilege,
+            counterparty_uuids=counterparty_uuid_list,
+        )
+        if denied_counterparty_uuids:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не являетесь владельцем карточек Контрагента с UUID: {", ".join(denied_counterparty_uuids)}!')
+        
+        counterparty_data_ids: List[Optional[int]] = [counterparty_check_access_response_object[2] for counterparty_check_access_response_object in counterparty_check_access_response_objects.values()]
         
         if requester_user_privilege != PRIVILEGE_MAPPING["Admin"] and not counterparty_data_ids:
             return []
@@ -401,92 +401,44 @@ class CounterpartyService:
         # if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
             # raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете удалять карточки Контрагента. Недостаточно прав!")
         
-        counterparty_ids_with_counterparty_type_ids_with_counterparty_data_ids_with_dir_uuid: List[Tuple[int, int, int, str]] = [] # type: ignore
-        application_uuids: List[str] = []
-        applications_access_lists_ids: List[int] = []
-        for counterparty_uuid in counterparty_uuids:
-            counterparty_check_access_response_object: Optional[Tuple[int, int, int, str]] = await CounterpartyQueryAndStatementManager.check_access(
-                session=session,
-                
-                requester_user_uuid=requester_user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                counterparty_uuid=counterparty_uuid,
-                for_update_or_delete_counterparty=True,
-            )
-            if counterparty_check_access_response_object is None:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете удалять информацию карточек Контрагента других Пользователей или же доступ к редактирования Контрагента ограничен!")
-            
-            counterparty_ids_with_counterparty_type_ids_with_counterparty_data_ids_with_dir_uuid.append(counterparty_check_access_response_object)
-            
-            application_access_list_id: Optional[int] = await CounterpartyQueryAndStatementManager.get_application_access_list_id_by_counterparty_uuid(
-                session=session,
-                counterparty_uuid=counterparty_uuid,
-            )
-            if application_access_list_id is not None:
-                applications_access_lists_ids.append(application_access_list_id)
-            
-            counterparty_applications: Dict[str, List[Optional[Application]]|Optional[int]] = await MTApplicationService.get_applications(
-                session=session,
-                
-                requester_user_uuid=requester_user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                user_uuid=requester_user_uuid if requester_user_privilege != PRIVILEGE_MAPPING["Admin"] else None,
-                counterparty_uuid=counterparty_uuid,
-            )
-            for application in counterparty_applications["data"]:
-                if application and application.uuid:
-                    application_uuids.append(application.uuid)
-        
-        for _, _, _, dir_uuid in counterparty_ids_with_counterparty_type_ids_with_counterparty_data_ids_with_dir_uuid:
-            await FileStoreService.delete_doc_or_dir(
-                session=session,
-                
-                requester_user_id=requester_user_id,
-                requester_user_uuid=requester_user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                
-                uuid=dir_uuid,
-                is_document=False,
-                for_user=True,
-            )
-        
-        await ApplicationService.delete_applications(
+        counterparty_check_access_response_objects, denied_counterparty_uuids = await CounterpartyQueryAndStatementManager.check_access_many(
             session=session,
             
-            requester_user_id=requester_user_id,
             requester_user_uuid=requester_user_uuid,
             requester_user_privilege=requester_user_privilege,
-            
-            applications_uuids=application_uuids,
+            counterparty_uuids=counterparty_uuids,
+            for_update_or_delete_counterparty=True,
         )
+        if denied_counterparty_uuids:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете удалять информацию карточек Контрагента других Пользователей или же доступ к редактирования Контрагента ограничен! UUID: {", ".join(denied_counterparty_uuids)}')
         
-        await cls.__delete_applications_access_lists(
-            session=session,
-            applications_access_lists_ids=applications_access_lists_ids,
-        )
-        await CommercialProposalQueryAndStatementManager.delete_commercial_proposals(
-            session=session,
-            
-            counterparty_uuid=counterparty_uuid,
-        )
+        counterparty_ids: List[int] = [counterparty_id for counterparty_id, _, _, _ in counterparty_check_access_response_objects.values()]  # type: ignore
         
-        await CounterpartyQueryAndStatementManager.delete_counterparties(
+        deletion_graph: Dict[str, Any] = await CounterpartyQueryAndStatementManager.get_counterparties_deletion_graph(
             session=session,
             
-            counterparty_uuids=counterparty_uuids,
-            counterparty_ids_with_counterparty_type_ids_with_counterparty_data_ids_with_dir_uuid=counterparty_ids_with_counterparty_type_ids_with_counterparty_data_ids_with_dir_uuid,
+            counterparty_ids=counterparty_ids,
         )
-    
-    @staticmethod
-    async def __delete_applications_access_lists(
-        session: AsyncSession,
         
-        applications_access_lists_ids: List[int],
-    ) -> None:
-        await CounterpartyQueryAndStatementManager.delete_applications_access_lists(
-            session=session,
-            applications_access_lists_ids=applications_access_lists_ids,
-        )
+        async with session.unit_of_work():  # Контрагенты со всеми зависимостями и директориями - одной транзакцией
+            await CounterpartyQueryAndStatementManager.delete_counterparties(
+                session=session,
+                
+                deletion_graph=deletion_graph,
+            )
+            if deletion_graph["directory_ids"]:
+                await FileStoreQueryAndStatementManager.change_deletion_status_subtree(
+                    session=session,
+                    
+                    requester_user_id=requester_user_id, requester_user_uuid=requester_user_uuid,
+                    directory_ids=deletion_graph["directory_ids"],
+                )
+            await StorageCleanupQueue.add(
+                session=session,
+                
+                paths=deletion_graph["directory_paths"],
+            )
+        StorageCleanupQueue.wake()
     
     @staticmethod
     async def create_persons(
@@ -641,7 +593,7 @@ class CounterpartyService:
             counterparty_uuid=counterparty_uuid,
         )
         
-        counterparty: List[List[Optional[Tuple[Counterparty, bool]]]] = await CounterpartyQueryAndStatementManager.get_counterparties(  
+        counterparty: Dict[str, List[Row]|Optional[int]] = await CounterpartyQueryAndStatementManager.get_counterparties(  
             session=session,
             
             counterparty_type="ЮЛ", # TODO (это нужно исправить (унифицировать)!)
@@ -650,7 +602,7 @@ class CounterpartyService:
             counterparty_id_list=[counterparty_check_access_response_object[0]],
         )
         
-        return counterparty["data"][0][0].uuid
+        return counterparty["data"][0].uuid
     
     @staticmethod
     async def delete_persons(
@@ -1,3 +1,4 @@
+import datetime
 import os
 import posixpath
 from pathlib import Path
@@ -6,16 +7,19 @@ import urllib.parse
 
 from fastapi import status
 from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, UploadFile
 
+from config import DIRECTORY_STORAGE_QUOTA, DOWNLOAD_DIRECTORY_CONCURRENCY, USER_STORAGE_QUOTA
 from connection_module import SignalConnector
 from src.query_and_statement.commercial_proposal_qas_manager import CommercialProposalQueryAndStatementManager
 from src.schemas.file_store_schema import FiltersUserDirsInfo, FiltersUserFilesInfo, OrdersUserDirsInfo, OrdersUserFilesInfo
-from src.models.file_store_models import Directory, Document
+from src.models.file_store_models import Directory
 from src.query_and_statement.file_store_qas_manager import FileStoreQueryAndStatementManager
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
-from src.utils.tz_converter import convert_tz
+from src.utils.tz_converter import format_dt
+from src.utils.zip_streamer import stream_zip
 
 
 class FileStoreService:
@@ -86,15 +90,15 @@ class FileStoreService:
                 "type": dir_info.type,
                 "visible": dir_info.visible,
                 "is_deleted": dir_info.is_deleted,
-                "deleted_at": convert_tz(dir_info.deleted_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if dir_info.deleted_at else None,
-                "created_at": convert_tz(dir_info.created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if dir_info.created_at else None,
+                "deleted_at": format_dt(dir_info.deleted_at, tz_city=tz),
+                "created_at": format_dt(dir_info.created_at, tz_city=tz),
             }
             if requester_user_privilege == PRIVILEGE_MAPPING["Admin"]:
-                result["data"][dir_info.id]["visibility_off_time"] = convert_tz(dir_info.visibility_off_time.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if dir_info.visibility_off_time else None
+                result["data"][dir_info.id]["visibility_off_time"] = format_dt(dir_info.visibility_off_time, tz_city=tz)
                 result["data"][dir_info.id]["visibility_off_user_id"] = dir_info.visibility_off_user_id
                 result["data"][dir_info.id]["visibility_off_user_uuid"] = dir_info.visibility_off_user_uuid
                 
-                result["data"][dir_info.id]["deleted_at"] = convert_tz(dir_info.deleted_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if dir_info.deleted_at else None
+                result["data"][dir_info.id]["deleted_at"] = format_dt(dir_info.deleted_at, tz_city=tz)
                 result["data"][dir_info.id]["deleters_user_id"] = dir_info.deleters_user_id
                 result["data"][dir_info.id]["deleters_user_uuid"] = dir_info.deleters_user_uuid
         result.update(
@@ -159,22 +163,23 @@ class FileStoreService:
                 ) is None:
                     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="У Вас нет доступа к Директории!")
             if file_uuids:
-                for file_uuid in file_uuids:
-                    if await FileStoreQueryAndStatementManager.check_access(
-                        session=session,
-                        
-                        requester_user_uuid=requester_user_uuid,
-                        requester_user_privilege=requester_user_privilege,
-                        file_uuid=file_uuid,
-                    ) is None:
-                        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'У Вас нет доступа к Файлу с UUID - "{file_uuid}"!')
+                _, denied_file_uuids = await FileStoreQueryAndStatementManager.check_access_many(
+                    session=session,
+                    
+                    requester_user_uuid=requester_user_uuid,
+                    requester_user_privilege=requester_user_privilege,
+                    uuids=file_uuids,
+                    is_document=True,
+                )
+                if denied_file_uuids:
+                    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'У Вас нет доступа к Файлам с UUID - {", ".join(denied_file_uuids)}!')
         
         result = {
             "data": {},
             "count": 0,
         }
         
-        doc_info_dct: Dict[str, List[Optional[Document]]|Optional[int]] = await FileStoreQueryAndStatementManager.get_doc_info(
+        doc_info_dct: Dict[str, List[Row]|Optional[int]] = await FileStoreQueryAndStatementManager.get_doc_info(
             session=session,
             
             owner_user_uuid=owner_user_uuid,
@@ -206,15 +211,15 @@ class FileStoreService:
                 "uploader_user_uuid": doc_info.uploader_user_uuid,
                 "visible": doc_info.visible,
                 "is_deleted": doc_info.is_deleted,
-                "deleted_at": convert_tz(doc_info.deleted_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if doc_info.deleted_at else None,
-                "created_at": convert_tz(doc_info.created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if doc_info.created_at else None,
+                "deleted_at": format_dt(doc_info.deleted_at, tz_city=tz),
+                "created_at": format_dt(doc_info.created_at, tz_city=tz),
             }
             if requester_user_privilege == PRIVILEGE_MAPPING["Admin"]:
-                result["data"][doc_info.id]["visibility_off_time"] = convert_tz(doc_info.visibility_off_time.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if doc_info.visibility_off_time else None
+                result["data"][doc_info.id]["visibility_off_time"] = format_dt(doc_info.visibility_off_time, tz_city=tz)
                 result["data"][doc_info.id]["visibility_off_user_id"] = doc_info.visibility_off_user_id
                 result["data"][doc_info.id]["visibility_off_user_uuid"] = doc_info.visibility_off_user_uuid
                 
-                result["data"][doc_info.id]["deleted_at"] = convert_tz(doc_info.deleted_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if doc_info.deleted_at else None
+                result["data"][doc_info.id]["deleted_at"] = format_dt(doc_info.deleted_at, tz_city=tz)
                 result["data"][doc_info.id]["deleters_user_id"] = doc_info.deleters_user_id
                 result["data"][doc_info.id]["deleters_user_uuid"] = doc_info.deleters_user_uuid
         result.update(
@@ -245,7 +250,7 @@ class FileStoreService:
         requester_user_uuid: str, requester_user_privilege: int,
         file_uuid: str,
     ) -> StreamingResponse:
-        doc_info_dct: Dict[str, List[Optional[Document]]|Optional[int]] = await FileStoreQueryAndStatementManager.get_doc_info(
+        doc_info_dct: Dict[str, List[Row]|Optional[int]] = await FileStoreQueryAndStatementManager.get_doc_info(
             session=session,
             
             file_uuids=[file_uuid],
@@ -261,6 +266,7 @@ class FileStoreService:
             if document.is_deleted is True:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Вы не можете скачать удаленный Документ!")
             
+            await session.release_connection()
             data: StreamingResponse = await SignalConnector.download_s3(
                 path=document.path,
             )
@@ -273,6 +279,89 @@ class FileStoreService:
             else:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f'Целостность данных нарушена, существует более 1 записи о файле с UUID - "{file_uuid}"!')
     
+    @staticmethod
+    async def get_dir_size(
+        session: AsyncSession,
+        
+        requester_user_uuid: str, requester_user_privilege: int,
+        directory_uuid: str,
+    ) -> Dict[str, str|int]:
+        """Количество и суммарный размер документов директории вместе со всеми поддиректориями."""
+        directory_id: Optional[int] = await FileStoreQueryAndStatementManager.check_access(
+            session=session,
+            
+            requester_user_uuid=requester_user_uuid,
+            requester_user_privilege=requester_user_privilege,
+            directory_uuid=directory_uuid,
+        )
+        if directory_id is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Директория "{directory_uuid}" либо отсутствует, либо у Вас недостаточно прав!')
+        
+        documents_count, size = await FileStoreQueryAndStatementManager.get_subtree_size(
+            session=session,
+            
+            directory_id=directory_id,
+        )
+        
+        return {
+            "directory_uuid": directory_uuid,
+            "documents_count": documents_count,
+            "size": size,
+        }
+    
+    @staticmethod
+    async def download_directory(
+        session: AsyncSession,
+        
+        requester_user_uuid: str, requester_user_privilege: int,
+        directory_uuid: str,
+    ) -> StreamingResponse:
+        """Потоковая выгрузка директории (со всеми поддиректориями) одним ZIP-архивом."""
+        dir_info_dct: Dict[str, List[Optional[Directory]]|Optional[int]] = await FileStoreQueryAndStatementManager.get_dir_info(
+            session=session,
+            
+            directory_uuids=[directory_uuid],
+        )
+        if not dir_info_dct["data"]:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Директория с UUID - "{directory_uuid}" не найдена!')
+        if len(dir_info_dct["data"]) > 1:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f'Целостность данных нарушена, существует более 1 записи о Директории с UUID - "{directory_uuid}"!')
+        
+        directory: Directory = dir_info_dct["data"][0]
+        is_admin = requester_user_privilege == PRIVILEGE_MAPPING["Admin"]
+        if not is_admin:  # Проверка если Пользователь не Админ
+            if directory.owner_user_uuid != requester_user_uuid:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете скачать Директорию другого Пользователя!")
+            if directory.visible is False:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете скачать скрытую Директорию!")
+        
+        if directory.is_deleted is True:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Вы не можете скачать удаленную Директорию!")
+        
+        documents: List[Tuple[str, str, Optional[datetime.datetime]]] = await FileStoreQueryAndStatementManager.get_dir_tree_docs(
+            session=session,
+            
+            directory_id=directory.id,
+            owner_user_uuid=None if is_admin else requester_user_uuid,
+            visible=None if is_admin else True,
+        )
+        
+        await session.release_connection()  # Архив передается после ответа обработчика - соединение к этому моменту не нужно
+        entries = [
+            (
+                posixpath.relpath(doc_path, directory.path),
+                created_at,
+                lambda doc_path=doc_path: SignalConnector.iter_s3(path=doc_path),
+            )
+            for _, doc_path, created_at in documents
+        ]
+        
+        return StreamingResponse(
+            stream_zip(entries=entries, concurrency=DOWNLOAD_DIRECTORY_CONCURRENCY),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{directory_uuid}.zip"'},
+        )
+    
     
     # TODO РЕАЛИЗОВАТЬ ЛОГИКУ ОБРАБОТКИ СЦЕНАРИЕВ СОЗДАНИЯ КАРТОЧЕК ДОГОВОРОВ. + ИНВАРИАНТЫ
     @classmethod
@@ -335,6 +424,15 @@ class FileStoreService:
             directory_uuids=[directory_uuid],
         )
         if dir_data["count"] == 1:  # Если родительская директория (для записи) найдена
+            await cls.__check_storage_quota(
+                session=session,
+                
+                directory_id=list(dir_data["data"])[0],
+                user_uuid=owner_user_uuid or requester_user_uuid,
+                file_size=file_object.size,
+            )
+            
+            await session.release_connection()  # Соединение не держится во время внешних вызовов и загрузки файла (DELCREDA SIGNAL)
             if new_file_uuid is None:
                 new_file_uuid_coro = await SignalConnector.generate_identifiers(target="Документ", count=1)
                 new_file_uuid = new_file_uuid_coro[0]
@@ -415,8 +513,101 @@ class FileStoreService:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f'Целостность данных нарушена, существует более 1 записи о Директории с UUID - "{directory_uuid}"!')
         
         return new_file_uuid
+    
+    @staticmethod
+    async def __check_storage_quota(
+        session: AsyncSession,
+        
+        directory_id: int,
+        user_uuid: str,
+        file_size: int,
+    ) -> None:
+        """Проверка квот занятого места до отправки файла в хранилище."""
+        if not USER_STORAGE_QUOTA and not DIRECTORY_STORAGE_QUOTA:
+            return
+        
+        used_by_user, used_in_directory = await FileStoreQueryAndStatementManager.get_storage_usage_for_upload(
+            session=session,
+            
+            directory_id=directory_id,
+            user_uuid=user_uuid,
+        )
+        if USER_STORAGE_QUOTA and used_by_user + file_size > USER_STORAGE_QUOTA:
+            raise HTTPException(status_code=status.HTTP_507_INSUFFICIENT_STORAGE, detail=f"Превышена квота Пользователя на хранилище! Занято {used_by_user} из {USER_STORAGE_QUOTA} байт.")
+        if DIRECTORY_STORAGE_QUOTA and used_in_directory + file_size > DIRECTORY_STORAGE_QUOTA:
+            raise HTTPException(status_code=status.HTTP_507_INSUFFICIENT_STORAGE, detail=f"Превышена квота Директории на хранилище! Занято {used_in_directory} из {DIRECTORY_STORAGE_QUOTA} байт.")
+    
+    @staticmethod
+    async def get_storage_usage(
+        session: AsyncSession,
+        
+        requester_user_uuid: str, requester_user_privilege: int,
+        
+        user_uuid: Optional[str] = None,
+        directory_uuid: Optional[str] = None,
+        
+        page: Optional[int] = None,
+        page_size: Optional[int] = None,
+        
+        tz: Optional[str] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Не достаточно прав!")
+        
+        storage_usage: Dict[str, List[Any]] = await FileStoreQueryAndStatementManager.get_storage_usage(
+            session=session,
+            
+            user_uuid=user_uuid,
+            directory_uuid=directory_uuid,
+            
+            page=page,
+            page_size=page_size,
+        )
+        
+        return {
+            "users": [
+                {
+                    "user_uuid": usage.user_uuid,
+                    "documents_count": usage.documents_count,
+                    "size": usage.size,
+                    "visible_documents_count": usage.visible_documents_count,
+                    "visible_size": usage.visible_size,
+                    "quota": USER_STORAGE_QUOTA or None,
+                    "updated_at": format_dt(usage.updated_at, tz_city=tz),
+                }
+                for usage in storage_usage["users"]
+            ],
+            "directories": [
+                {
+                    "directory_uuid": dir_uuid,
+                    "documents_count": usage.documents_count,
+                    "size": usage.size,
+                    "visible_documents_count": usage.visible_documents_count,
+                    "visible_size": usage.visible_size,
+                    "quota": DIRECTORY_STORAGE_QUOTA or None,
+                    "updated_at": format_dt(usage.updated_at, tz_city=tz),
+                }
+                for dir_uuid, usage in storage_usage["directories"]
+            ],
+        }
     # _____________________________________________________________________________________________________
     
+    @staticmethod
+    async def reserve_directory_uuid(
+        new_directory_uuid: Optional[str]=None,
+    ) -> str:
+        """UUID новой Директории в DELCREDA SIGNAL: генерирует новый или проверяет, что переданный свободен."""
+        if new_directory_uuid is None:
+            new_directory_uuid_coro = await SignalConnector.generate_identifiers(target="Директория", count=1)
+            return new_directory_uuid_coro[0]
+        
+        if await SignalConnector.check_identifier(
+            target="Директория",
+            uuid=new_directory_uuid,
+        ) is not False:  # Если uuid занят
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Директория с данным UUID уже используется!")
+        return new_directory_uuid
+    
     @staticmethod
     async def create_directory(
         session: AsyncSession,
@@ -430,7 +621,15 @@ class FileStoreService:
         
         parent_directory_uuid: Optional[str]=None,
     ) -> Dict[str, Any]:
-        """Создает директорию и возвращает uuid и id нововой директории"""
+        """
+        Создает директорию и возвращает uuid и id нововой директории.
+        Внутри session.unit_of_work() DELCREDA SIGNAL не вызывается (соединение транзакции держалось бы на время вызова):
+        new_directory_uuid резервируется заранее - reserve_directory_uuid до начала транзакции.
+        """
+        in_unit_of_work = bool(session.info.get("unit_of_work_depth"))
+        if in_unit_of_work and new_directory_uuid is None:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="UUID Директории нужно зарезервировать до начала транзакции!")
+        
         if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:  # Проверка если Пользователь не Админ
             if directory_type is None:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Вам нужно обязательно указать Тип Директории при создании!")
@@ -448,15 +647,9 @@ class FileStoreService:
             )
             
             if parent_dir_data["count"] == 1:  # Если родительская директория (для записи) найдена
-                if new_directory_uuid is None:
-                    new_directory_uuid_coro = await SignalConnector.generate_identifiers(target="Директория", count=1)
-                    new_directory_uuid = new_directory_uuid_coro[0]
-                else:
-                    if await SignalConnector.check_identifier(
-                        target="Директория",
-                        uuid=new_directory_uuid,
-                    ) is not False:  # Если uuid занят
-                        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Директория с данным UUID уже используется!")
+                if not in_unit_of_work:
+                    await session.release_connection()
+                    new_directory_uuid = await FileStoreService.reserve_directory_uuid(new_directory_uuid=new_directory_uuid)
                 new_directory_path = posixpath.normpath(posixpath.join(parent_dir_data["data"][list(parent_dir_data["data"])[0]]["path"], new_directory_uuid))
                 
                 dir_id: int = await FileStoreQueryAndStatementManager.create_dir_info(
@@ -479,15 +672,9 @@ class FileStoreService:
                     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f'Целостность данных нарушена, существует более 1 записи о папке с UUID - "{parent_directory_uuid}"!')
         
         else:
-            if new_directory_uuid is None:
-                new_directory_uuid_coro = await SignalConnector.generate_identifiers(target="Директория", count=1)
-                new_directory_uuid = new_directory_uuid_coro[0]
-            else:
-                if await SignalConnector.check_identifier(
-                    target="Директория",
-                    uuid=new_directory_uuid,
-                ) is not False:  # Если uuid занят
-                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Директория с данным UUID уже используется!")
+            if not in_unit_of_work:
+                await session.release_connection()
+                new_directory_uuid = await FileStoreService.reserve_directory_uuid(new_directory_uuid=new_directory_uuid)
             
             new_directory_path = posixpath.normpath(posixpath.join(owner_s3_login, new_directory_uuid))
             
@@ -609,6 +796,7 @@ class FileStoreService:
         if is_deleted:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'{"Файл" if is_document else "Директория"} c UUID "{uuid}" уже удален{"" if is_document else "а"}!')
         else:
+            await session.release_connection()
             path: str = object_info["data"][list(object_info["data"])[0]]["path"]
             try:
                 await SignalConnector.delete_s3(
@@ -616,10 +804,18 @@ class FileStoreService:
                 )
             except: pass  # noqa: E701, E722
             
-            await FileStoreQueryAndStatementManager.change_deletion_status(
-                session=session,
-                
-                requester_user_id=requester_user_id, requester_user_uuid=requester_user_uuid,
-                uuid=uuid,
-                is_document=is_document,
-            )
+            if is_document:
+                await FileStoreQueryAndStatementManager.change_deletion_status(
+                    session=session,
+                    
+                    requester_user_id=requester_user_id, requester_user_uuid=requester_user_uuid,
+                    uuid=uuid,
+                    is_document=is_document,
+                )
+            else:  # Директория удаляется вместе со всем поддеревом (поддиректории и документы)
+                await FileStoreQueryAndStatementManager.change_deletion_status_subtree(
+                    session=session,
+                    
+                    requester_user_id=requester_user_id, requester_user_uuid=requester_user_uuid,
+                    directory_ids=[list(object_info["data"])[0]],
+                )
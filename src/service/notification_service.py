@@ -3,6 +3,7 @@ from typing import Dict, List, Literal, Optional, Tuple
 
 from fastapi import HTTPException
 from fastapi import status
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from connection_module import SignalConnector
@@ -11,7 +12,6 @@ from src.query_and_statement.application.application_qas_manager import Applicat
 from src.models.user_models import UserContact
 from src.schemas.notification_schema import FiltersNotifications, OrdersNotifications
 from src.query_and_statement.counterparty.counterparty_qas_manager import CounterpartyQueryAndStatementManager
-from src.models.notification_models import Notification
 from src.query_and_statement.notification_qas_manager import NotificationQueryAndStatementManager
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
@@ -99,6 +99,7 @@ class NotificationService:
             if user_contact_data is None:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Контактные данные пользователя по заданному идентификатору не найдены, обратитесь к администратору!")
         
+        await session.release_connection()
         new_notification_uuid_coro = await SignalConnector.generate_identifiers(target="Уведомление", count=1)
         new_notification_uuid = new_notification_uuid_coro[0]
         
@@ -133,7 +134,7 @@ class NotificationService:
         notification_list_uuid: list[str],
         user_uuid: str,
     ) -> bool:
-        notifications: Dict[str, List[Optional[Notification]]|Optional[int]] = await NotificationQueryAndStatementManager.get_notifications(
+        notifications: Dict[str, List[Row]|Optional[int]] = await NotificationQueryAndStatementManager.get_notifications(
             session=session,
             
             for_admin=False,
@@ -171,7 +172,7 @@ class NotificationService:
         
         filter: Optional[FiltersNotifications] = None,
         order: Optional[OrdersNotifications] = None,
-    ) -> Dict[str, List[Optional[Notification]]|Optional[int]]:
+    ) -> Dict[str, List[Row]|Optional[int]]:
         if page or page_size:
             if (isinstance(page, int) and page <= 0) or (isinstance(page_size, int) and page_size <= 0):
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Не корректное разделение на страницы, запрошенных данных!")
@@ -226,7 +227,7 @@ class NotificationService:
                     if counterparty_check_access_response_object is None:
                         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете просмотреть Уведомления по данному Контрагенту!")
         
-        notifications: Dict[str, List[Optional[Notification]]|Optional[int]] = await NotificationQueryAndStatementManager.get_notifications(
+        notifications: Dict[str, List[Row]|Optional[int]] = await NotificationQueryAndStatementManager.get_notifications(
             session=session,
             
             for_admin=for_admin,
@@ -7,14 +7,13 @@ from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config import IS_PROD, TG_CHAT_ID
 from connection_module import RedisConnector, async_session_maker
 from src.schemas.reference_schema import FiltersServiceNote, OrdersServiceNote
 from src.models.reference_models import ServiceNote
 from src.query_and_statement.reference_qas_manager import ReferenceQueryAndStatementManager
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING, SERVICE_NOTE_SUBJECT_MAPPING
-from src.utils.tg_send_message import send_telegram_message
+from src.utils.errlog_queue import ErrLogQueue
 
 
 class ReferenceService:
@@ -276,17 +275,12 @@ class ReferenceService:
         
         user_uuid: str,
     ) -> int:
-        log_id: int = await ReferenceQueryAndStatementManager.create_errlog(
+        log_id: int = await ErrLogQueue.submit(  # Запись в БД и сообщение в Telegram - фоном (ErrLogQueue)
             endpoint=endpoint,
             params=params,
             msg=msg,
             user_uuid=user_uuid,
         )
-        if IS_PROD:
-            await send_telegram_message(
-                chat_id=TG_CHAT_ID,
-                message=f"ОШИБКА! #{log_id}\n\n\n{msg}\n_______________________________"
-            )
         
         return log_id
     
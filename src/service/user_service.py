@@ -7,18 +7,19 @@ from uuid import uuid4
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from security import encrypt
+from security import encrypt_many_async
 from config import ACCESS_TTL, APP_URL, SECRET_KEY
 from connection_module import RedisConnector, SignalConnector
-from src.models.counterparty.counterparty_models import Counterparty
-from src.service.counterparty.counterparty_service import CounterpartyService
+from src.query_and_statement.counterparty.counterparty_qas_manager import CounterpartyQueryAndStatementManager
+from src.query_and_statement.file_store_qas_manager import FileStoreQueryAndStatementManager
 from src.schemas.user_schema import ClientState, FiltersUsersInfo, OrdersUsersInfo, ResponseAuth, ResponseGetUsersInfo, UpdateUserContactData, UserInfo, UserSchema
 from src.models.user_models import UserAccount
 from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager
 from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
 from src.service.file_store_service import FileStoreService
-from src.utils.tz_converter import convert_tz
+from src.utils.tz_converter import format_dt
 from src.utils.sanitazer_s3_username import sanitize_s3_username
+from src.utils.storage_cleanup import StorageCleanupQueue
 from src.utils.reference_mapping_data.file_store.mapping import DIRECTORY_TYPE_MAPPING
 
 
@@ -62,6 +63,7 @@ class UserService:
             data_dump = json.dumps(user_data, ensure_ascii=False)
             await redis.set(key_token, data_dump, expire=ACCESS_TTL)
         
+        await session.release_connection()
         url = urljoin(APP_URL, "confirmation/" + key_token)
         await SignalConnector.notify_email(  # FIXME тут нужна верствка
             subject="Активация аккаунта",
@@ -113,6 +115,7 @@ class UserService:
             await redis.set(key_token, data_dump, expire=ACCESS_TTL)
             await redis.set(key_token_for_confirmation_v2, data_dump_for_confirmation_v2, expire=ACCESS_TTL)
         
+        await session.release_connection()
         url = urljoin(APP_URL, "confirmation/" + key_token)
         await SignalConnector.notify_email(  # FIXME тут нужна верствка
             subject="Сброс пароля",
@@ -141,6 +144,7 @@ class UserService:
         if len(password) < 8:
             raise HTTPException(status_code=status.HTTP_411_LENGTH_REQUIRED, detail="Длина пароля должна быть больше 7 символов!")
         
+        await session.release_connection()
         if not new_user_uuid:
             new_user_uuid_coro = await SignalConnector.generate_identifiers(target="Пользователь", count=1)
             new_user_uuid = new_user_uuid_coro[0]
@@ -165,6 +169,7 @@ class UserService:
         
         s3_login = s3_login_sanitized[:64]
         s3_password = password[:64]
+        await session.release_connection()
         await SignalConnector.create_user_s3(
             username=s3_login,
             password=s3_password,
@@ -204,7 +209,7 @@ class UserService:
             "id": new_user_id,
             "uuid": new_user_uuid,
             "token": token_info["value"],
-            "privilege": list(PRIVILEGE_MAPPING)[list(PRIVILEGE_MAPPING.values()).index(privilege)],
+            "privilege": PRIVILEGE_MAPPING.reverse[privilege],
             "user_dir": user_dir_info,
             
             "login": login,
@@ -261,20 +266,29 @@ class UserService:
         )
         
         if for_flet:
-            data = {
-                "encrypt_token": encrypt(plain_text=user_token, secret_key=SECRET_KEY),
-                "encrypt_user_id": encrypt(plain_text=str(user_data.user_id), secret_key=SECRET_KEY),
-                "encrypt_user_uuid": encrypt(plain_text=user_data.user_uuid, secret_key=SECRET_KEY),
-                "encrypt_user_dir_uuid": encrypt(plain_text=user_data.user_dir_uuid, secret_key=SECRET_KEY),
-                "encrypt_privilege_id": encrypt(plain_text=str(user_data.privilege_id), secret_key=SECRET_KEY),
-            }
+            encrypted: List[str] = await encrypt_many_async(
+                plain_texts=[
+                    user_token,
+                    str(user_data.user_id),
+                    user_data.user_uuid,
+                    user_data.user_dir_uuid,
+                    str(user_data.privilege_id),
+                ],
+                secret_key=SECRET_KEY,
+            )
+            data = dict(
+                zip(
+                    ["encrypt_token", "encrypt_user_id", "encrypt_user_uuid", "encrypt_user_dir_uuid", "encrypt_privilege_id"],
+                    encrypted,
+                )
+            )
         else:
             data = ResponseAuth(
                 token=user_token,
                 user_id=str(user_data.user_id),
                 user_uuid=user_data.user_uuid,
                 user_dir_uuid=user_data.user_dir_uuid,
-                privilege={v:k for k, v in PRIVILEGE_MAPPING.items()}[user_data.privilege_id],
+                privilege=PRIVILEGE_MAPPING.reverse[user_data.privilege_id],
             )
         
         return data
@@ -365,9 +379,7 @@ class UserService:
             if len(user_data) >= 3 and user_data[1] and user_data[2]:  # Проверка на наличие данных
                 user_account = user_data[1]
                 user_contact = user_data[2]
-                privilege_name = list(PRIVILEGE_MAPPING)[
-                    list(PRIVILEGE_MAPPING.values()).index(user_account.privilege)
-                ]
+                privilege_name = PRIVILEGE_MAPPING.reverse[user_account.privilege]
                 
                 # Создаем UserInfo и добавляем в результат
                 response_content.data.append(
@@ -388,8 +400,8 @@ class UserService:
                         telegram=user_contact.telegram,
                         telegram_notification=user_contact.telegram_notification,
                         
-                        last_auth=convert_tz(user_account.last_auth.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if user_account.last_auth else None,
-                        created_at=convert_tz(user_account.created_at.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city=tz) if user_account.created_at else None,
+                        last_auth=format_dt(user_account.last_auth, tz_city=tz),
+                        created_at=format_dt(user_account.created_at, tz_city=tz),
                     )
                 )
                 response_content.count += 1
@@ -487,6 +499,7 @@ class UserService:
             data_dump = json.dumps(change_pass_data, ensure_ascii=False)
             await redis.set(key_token, data_dump, expire=ACCESS_TTL)
         
+        await session.release_connection()
         url = urljoin(APP_URL, "confirmation/" + key_token)
         await SignalConnector.notify_email(  # FIXME тут нужна верствка
             subject="Изменение пароля",
@@ -534,107 +547,72 @@ class UserService:
         if requester_user_privilege != PRIVILEGE_MAPPING["Admin"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Вы не можете удалить пользователя, у Вас недостаточно прав!")
         
-        user_uuids: List[str] = []
-        user_s3_logins: List[str] = []
-        
+        users = await UserQueryAndStatementManager.get_users_for_deletion(
+            session=session,
+            
+            tokens=tokens,
+            uuids=uuids,
+        )
         for token in tokens:
-            user_data = await cls.get_users_info(
-                session=session,
-                
-                requester_user_uuid=requester_user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                
-                user_token=token,
-            )
-            if user_data.count == 0:
+            token_users = [user for user in users if user.token_value == token]
+            if not token_users:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Информация о пользователе с токеном - "{token}" не была найдена!')
-            if user_data.count > 1:
+            if len(token_users) > 1:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f'Коллизия! Пользователей с токеном - "{token}" было найдено более одного!')
-            
-            if PRIVILEGE_MAPPING[user_data.data[0].privilege] == PRIVILEGE_MAPPING["Admin"]:
+            if token_users[0].privilege == PRIVILEGE_MAPPING["Admin"]:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете удалить Админа! (токен - "{token}")')
-            user_uuids.append(user_data.data[0].uuid)
-            user_s3_logins.append(user_data.data[0].s3_login)
-        
         for uuid in uuids:
-            user_data = await cls.get_users_info(
-                session=session,
-                
-                requester_user_uuid=requester_user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                
-                uuid=uuid,
-            )
-            if user_data.count == 0:
+            uuid_users = [user for user in users if user.uuid == uuid]
+            if not uuid_users:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Информация о пользователе с UUID - "{uuid}" не была найдена!')
-            if user_data.count > 1:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f'Коллизия! Пользователей с UUID - "{uuid}" было найдено более одного!')
-            if PRIVILEGE_MAPPING[user_data.data[0].privilege] != PRIVILEGE_MAPPING["Admin"]:
+            if uuid_users[0].privilege == PRIVILEGE_MAPPING["Admin"]:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Вы не можете удалить Админа! (UUID - "{uuid}")')
-            user_uuids.append(user_data.data[0].uuid)
         
+        user_uuids: List[str] = list({user.uuid for user in users})
+        user_s3_logins: List[str] = list({user.s3_login for user in users if user.s3_login})  # У пользователей без хранилища s3_login - None
         
-        dir_uuids: List[str] = []
-        for user_uuid in user_uuids:
-            dirs_info: Dict[str, Any] = await FileStoreService.get_dir_info_from_db(
-                session=session,
-                
-                requester_user_uuid=requester_user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                owner_user_uuid=user_uuid
-            )
-            for dir_id in dirs_info["data"]:
-                if dirs_info["data"][dir_id]["parent"] is None:
-                    dir_uuids.append(dirs_info["data"][dir_id]["uuid"])
+        counterparty_ids: List[int] = await CounterpartyQueryAndStatementManager.get_counterparty_ids_by_user_uuids(
+            session=session,
             
-            counterparty_uuids: List[str] = []
-            counterparty_dct: Dict[str, List[Optional[Counterparty|int|bool]] | List[Optional[Tuple[Counterparty, bool]]]] = await CounterpartyService.get_counterparties(
-                session=session,
-                
-                requester_user_uuid=requester_user_uuid,
-                requester_user_privilege=requester_user_privilege,
-                user_uuid=user_uuid,
+            user_uuids=user_uuids,
+        )
+        storage_paths: List[str] = []
+        if with_documents is True:
+            storage_paths.extend(
+                await FileStoreQueryAndStatementManager.get_root_directories_paths(
+                    session=session,
+                    
+                    owner_user_uuids=user_uuids,
+                )
             )
-            for counterparty in counterparty_dct["data"]:
-                counterparty_uuids.append(counterparty.uuid)
-            
-            try:
-                await CounterpartyService.delete_counterparties(
+        
+        async with session.unit_of_work():  # Контрагенты, файловое хранилище и учетные записи - одной транзакцией
+            if counterparty_ids:
+                deletion_graph: Dict[str, Any] = await CounterpartyQueryAndStatementManager.get_counterparties_deletion_graph(
                     session=session,
                     
-                    requester_user_id=requester_user_id,
-                    requester_user_uuid=requester_user_uuid,
-                    requester_user_privilege=requester_user_privilege,
+                    counterparty_ids=counterparty_ids,
+                )
+                await CounterpartyQueryAndStatementManager.delete_counterparties(
+                    session=session,
                     
-                    counterparty_uuids=counterparty_uuids,
+                    deletion_graph=deletion_graph,
                 )
-            except: ...  # noqa: E722
-        
-        if with_documents is True:
-            for dir_uuid in dir_uuids:
-                try:
-                    await FileStoreService.delete_doc_or_dir(
-                        session=session,
-                        
-                        requester_user_id=requester_user_id,
-                        requester_user_uuid=requester_user_uuid,
-                        requester_user_privilege=requester_user_privilege,
-                        uuid=dir_uuid,
-                        is_document=False,
-                    )
-                except: ...  # noqa: E722
-        
-        await UserQueryAndStatementManager.delete_users(
-            session=session,
+                storage_paths.extend(deletion_graph["directory_paths"])
             
-            user_uuids=user_uuids,
-        )
-        
-        # TODO тут нужно удалять пользователей из S3 (нужна опция "С удалением" аккаунта-хранилища или "без удаления")
-        for s3_login in user_s3_logins:
-            await SignalConnector.remove_user_s3(
-                username=s3_login,
+            await UserQueryAndStatementManager.delete_users(
+                session=session,
+                
+                user_uuids=user_uuids,
+            )
+            # TODO нужна опция "С удалением" аккаунта-хранилища или "без удаления"
+            await StorageCleanupQueue.add(
+                session=session,
+                
+                paths=storage_paths,
+                s3_logins=user_s3_logins,
             )
+        StorageCleanupQueue.wake()
     
     @staticmethod
     async def get_client_state(
@@ -0,0 +1,26 @@
+"""Общие сводки для скриптов замеров (python -m src.utils.<имя>_benchmark)."""
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max в миллисекундах по списку длительностей в секундах."""
+    quantiles = statistics.quantiles(seconds, n=100, method="inclusive") if len(seconds) > 1 else seconds * 99
+    return {
+        "p50_ms": round(statistics.median(seconds) * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+        "max_ms": round(max(seconds) * 1000, 3),
+    }
+
+
+def time_calls(function: Callable[[], Any], repeats: int) -> List[float]:
+    """Длительности repeats вызовов function (после одного прогревочного вызова)."""
+    function()
+    seconds: List[float] = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - started_at)
+    return seconds
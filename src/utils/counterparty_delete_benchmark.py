@@ -0,0 +1,146 @@
+"""
+Замер удаления Контрагентов со всеми зависимостями (CounterpartyService.delete_counterparties): граф и удаление set-запросами
+для всей пачки против тех же запросов по одному Контрагенту (форма прежнего цикла - несколько запросов на каждого Контрагента).
+
+Запуск: python -m src.utils.counterparty_delete_benchmark [--dsn postgresql+asyncpg://...] [--counterparties 1000] [--repeats 5]
+    [--user-uuid ...] [--output counterparty_delete_benchmark.json]
+По умолчанию - БД из конфигурации (соединение без pgbouncer). Удаляются последние --counterparties Контрагентов (или Контрагенты
+пользователя --user-uuid) с Заявками, Заявками на КП, чатами и директориями; каждый прогон - в транзакции, которая откатывается.
+Хранилище (DELCREDA SIGNAL) не вызывается. Запускать на стенде с копией рабочих данных.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from connection_module import DATABASE_DSN_ASYNC, UnitOfWorkAsyncSession
+from src.query_and_statement.counterparty.counterparty_qas_manager import CounterpartyQueryAndStatementManager
+from src.query_and_statement.file_store_qas_manager import FileStoreQueryAndStatementManager
+from src.utils.benchmark_stats import latency_summary
+
+
+async def _delete(session: UnitOfWorkAsyncSession, counterparty_ids: List[int], requester_user_id: int, requester_user_uuid: str) -> None:
+    """Шаги CounterpartyService.delete_counterparties после проверки доступа."""
+    deletion_graph: Dict[str, Any] = await CounterpartyQueryAndStatementManager.get_counterparties_deletion_graph(
+        session=session,
+        
+        counterparty_ids=counterparty_ids,
+    )
+    async with session.unit_of_work():
+        await CounterpartyQueryAndStatementManager.delete_counterparties(
+            session=session,
+            
+            deletion_graph=deletion_graph,
+        )
+        if deletion_graph["directory_ids"]:
+            await FileStoreQueryAndStatementManager.change_deletion_status_subtree(
+                session=session,
+                
+                requester_user_id=requester_user_id, requester_user_uuid=requester_user_uuid,
+                directory_ids=deletion_graph["directory_ids"],
+            )
+
+
+async def _run_once(engine: AsyncEngine, counterparty_ids: List[int], per_counterparty: bool, requester: Any) -> Dict[str, float]:
+    statements = 0
+    
+    def count_statement(*args: Any) -> None:
+        nonlocal statements
+        statements += 1
+    
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = UnitOfWorkAsyncSession(bind=connection, expire_on_commit=False, autoflush=False)  # commit сессии не фиксирует внешнюю транзакцию
+        event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+        started_at = time.perf_counter()
+        try:
+            for batch in ([[counterparty_id] for counterparty_id in counterparty_ids] if per_counterparty else [counterparty_ids]):
+                await _delete(session=session, counterparty_ids=batch, requester_user_id=requester.user_id, requester_user_uuid=requester.user_uuid)
+            seconds = time.perf_counter() - started_at
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+            await session.close()
+            await transaction.rollback()
+    
+    return {"seconds": seconds, "statements": statements}
+
+
+async def run_benchmark(engine: AsyncEngine, counterparties: int, repeats: int, user_uuid: Optional[str] = None) -> Dict[str, Any]:
+    async with engine.connect() as connection:
+        response = await connection.execute(
+            text(
+                """
+                SELECT id, user_id, user_uuid FROM counterparty
+                WHERE CAST(:user_uuid AS varchar) IS NULL OR user_uuid = CAST(:user_uuid AS varchar)
+                ORDER BY id DESC LIMIT :limit;
+                """
+            ),
+            {"user_uuid": user_uuid, "limit": counterparties},
+        )
+        rows = response.all()
+        if not rows:
+            raise SystemExit("Нет Контрагентов для удаления")
+        graph_sizes = (await connection.execute(
+            text(
+                """
+                SELECT
+                    (SELECT count(*) FROM application WHERE counterparty_id = ANY(:ids)) AS applications,
+                    (SELECT count(*) FROM directory_closure WHERE ancestor_id IN (SELECT directory_id FROM counterparty WHERE id = ANY(:ids))) AS directories;
+                """
+            ),
+            {"ids": [row.id for row in rows]},
+        )).one()
+    counterparty_ids = [row.id for row in rows]
+    report: Dict[str, Any] = {
+        "counterparties": len(counterparty_ids),
+        "applications": graph_sizes.applications,
+        "counterparty_directories_with_subtrees": graph_sizes.directories,
+        "repeats": repeats,
+        "modes": {},
+    }
+    for mode, per_counterparty in (("set_based", False), ("per_counterparty", True)):
+        await _run_once(engine=engine, counterparty_ids=counterparty_ids, per_counterparty=per_counterparty, requester=rows[0])  # Прогрев кеша страниц
+        runs = [
+            await _run_once(engine=engine, counterparty_ids=counterparty_ids, per_counterparty=per_counterparty, requester=rows[0])
+            for _ in range(repeats)
+        ]
+        report["modes"][mode] = {
+            "statements": runs[0]["statements"],
+            "total": latency_summary([run["seconds"] for run in runs]),
+        }
+    
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Удаление Контрагентов со всеми зависимостями: set-запросы против запросов по одному Контрагенту")
+    parser.add_argument("--dsn", default=DATABASE_DSN_ASYNC, help="URL SQLAlchemy (asyncpg) стенда; по умолчанию - БД из конфигурации")
+    parser.add_argument("--counterparties", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--user-uuid", default=None, help="Удалять только Контрагентов этого пользователя")
+    parser.add_argument("--output", default=None, help="Путь JSON-отчета")
+    args = parser.parse_args()
+    
+    async def run() -> Dict[str, Any]:
+        engine = create_async_engine(args.dsn)
+        try:
+            return await run_benchmark(engine=engine, counterparties=args.counterparties, repeats=args.repeats, user_uuid=args.user_uuid)
+        finally:
+            await engine.dispose()
+    
+    report = asyncio.run(run())
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    
+    print(f'{report["counterparties"]} Контрагентов, {report["applications"]} Заявок, {report["counterparty_directories_with_subtrees"]} директорий')
+    for mode, result in report["modes"].items():
+        print(f'{mode:<18} запросов {result["statements"]:>7}, p50 {result["total"]["p50_ms"]:>10.1f} ms, max {result["total"]["max_ms"]:>10.1f} ms')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from prometheus_client import Counter, Gauge, Histogram
+
+from config import CPU_EXECUTOR_KIND, CPU_EXECUTOR_TIMEOUT, CPU_EXECUTOR_WORKERS
+
+
+T = TypeVar("T")
+
+CPU_EXECUTOR_QUEUE_DEPTH = Gauge("cpu_executor_queue_depth", "Задачи в CPU-пуле (ожидающие и выполняющиеся)")
+CPU_EXECUTOR_LATENCY_SECONDS = Histogram("cpu_executor_latency_seconds", "Время от постановки задачи в CPU-пул до получения результата")
+CPU_EXECUTOR_TIMEOUTS = Counter("cpu_executor_timeouts_total", "Задачи CPU-пула, результат которых не был получен за таймаут")
+
+
+class CPUExecutor:
+    """
+    Общий ограниченный пул для CPU-bound операций (шифрование, хеширование паролей), чтобы они не блокировали event loop.
+    CPU_EXECUTOR_KIND - "process" (по умолчанию: PBKDF2 из cryptography держит GIL, поэтому пул потоков event loop не разгружает)
+    или "thread" (для функций, отпускающих GIL). Размер - CPU_EXECUTOR_WORKERS, таймаут ожидания - CPU_EXECUTOR_TIMEOUT.
+    В режиме "process" функция и аргументы должны сериализоваться pickle (функции уровня модуля).
+    Процессы пула запускаются через forkserver: пул создается, когда event loop, пулы соединений с БД и потоки уже работают,
+    а fork такого процесса копирует их состояние (соединения, захваченные блокировки) в дочерние процессы.
+    """
+    __executor: Optional[Executor] = None
+    
+    @classmethod
+    def __get_executor(cls) -> Executor:
+        if cls.__executor is None:
+            if CPU_EXECUTOR_KIND == "thread":
+                cls.__executor = ThreadPoolExecutor(max_workers=max(CPU_EXECUTOR_WORKERS, 1), thread_name_prefix="cpu_executor")
+            else:
+                cls.__executor = ProcessPoolExecutor(
+                    max_workers=max(CPU_EXECUTOR_WORKERS, 1),
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+        return cls.__executor
+    
+    @classmethod
+    async def run(cls, func: Callable[..., T], *args: Any, timeout: Optional[float] = None) -> T:
+        """
+        Выполняет func(*args) в пуле. Если результат не получен за timeout (по умолчанию CPU_EXECUTOR_TIMEOUT, 0 - без ограничения),
+        еще не начатая задача снимается с очереди, а запрос получает 503.
+        """
+        submitted_at = time.perf_counter()
+        
+        def __on_done(_: Future) -> None:
+            CPU_EXECUTOR_QUEUE_DEPTH.dec()
+            CPU_EXECUTOR_LATENCY_SECONDS.observe(time.perf_counter() - submitted_at)
+        
+        CPU_EXECUTOR_QUEUE_DEPTH.inc()
+        concurrent_future = cls.__get_executor().submit(func, *args)
+        concurrent_future.add_done_callback(__on_done)
+        future = asyncio.wrap_future(concurrent_future)
+        
+        timeout = timeout if timeout is not None else CPU_EXECUTOR_TIMEOUT
+        done, _ = await asyncio.wait({future}, timeout=timeout or None)
+        if not done:
+            CPU_EXECUTOR_TIMEOUTS.inc()
+            concurrent_future.cancel()  # Снимается только задача, которая еще не начала выполняться
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Сервер перегружен, повторите запрос позже!")
+        
+        return future.result()
+    
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls.__executor is not None:
+            cls.__executor.shutdown(wait=False, cancel_futures=True)
+            cls.__executor = None
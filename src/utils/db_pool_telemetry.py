@@ -0,0 +1,89 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from config import DB_POOL_SHED_WAIT
+
+
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Соединения, выданные из пула", ["pool"])
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Соединения сверх pool_size (отрицательное значение - еще не открытые соединения основного размера)", ["pool"])
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds", "Время получения соединения из пула (ожидание свободного соединения и открытие нового)", ["pool"],
+    buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 70),
+)
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Запросы, не дождавшиеся соединения из пула", ["pool"])
+DB_POOL_CONNECTION_AGE_SECONDS = Histogram(
+    "db_pool_connection_age_seconds", "Возраст соединения при выдаче из пула", ["pool"],
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200),
+)
+DB_SESSION_HOLD_SECONDS = Histogram(
+    "db_session_hold_seconds", "Время удержания соединения с БД обработчиком (от выдачи из пула до возврата)", ["pool", "endpoint"],
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60, 180),
+)
+
+# scope текущего HTTP-запроса: маршрут (scope["route"]) появляется в нем после сопоставления - к возврату соединения он уже известен
+db_request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("db_request_scope", default=None)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул асинхронного движка с метриками (выдано соединений, overflow, ожидание, возраст соединений, удержание по эндпоинтам).
+    Имя пула в метриках - pool_logging_name движка.
+    При DB_POOL_SHED_WAIT > 0 ожидание соединения ограничено этим временем (pool_timeout движка), после чего запрос
+    сразу получает 503, а не ждет освобождения пула в тишине.
+    """
+    
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics_name = self._orig_logging_name or "default"
+        DB_POOL_CHECKED_OUT.labels(pool=self.metrics_name).set_function(self.checkedout)
+        DB_POOL_OVERFLOW.labels(pool=self.metrics_name).set_function(self.overflow)
+    
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(pool=self.metrics_name).inc()
+            if DB_POOL_SHED_WAIT:
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Сервер перегружен, повторите запрос позже!")
+            raise
+        finally:
+            DB_POOL_WAIT_SECONDS.labels(pool=self.metrics_name).observe(time.perf_counter() - started_at)
+        
+        record.info["checked_out_at"] = time.monotonic()
+        if record.dbapi_connection is not None:
+            DB_POOL_CONNECTION_AGE_SECONDS.labels(pool=self.metrics_name).observe(time.time() - record.starttime)
+        return record
+    
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        checked_out_at = record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            DB_SESSION_HOLD_SECONDS.labels(pool=self.metrics_name, endpoint=_endpoint_label()).observe(time.monotonic() - checked_out_at)
+        super()._do_return_conn(record)
+
+
+class SessionHoldTimeMiddleware:
+    """ASGI-middleware: делает scope запроса доступным пулу соединений (метка endpoint в db_session_hold_seconds)."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            db_request_scope.set(scope)
+        await self.app(scope, receive, send)
+
+
+def _endpoint_label() -> str:
+    scope = db_request_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+from config import (
+    IS_PROD, TG_CHAT_ID,
+    ERRLOG_QUEUE_SIZE, ERRLOG_BATCH_SIZE, ERRLOG_FLUSH_INTERVAL,
+    ERRLOG_ALERT_WINDOW, ERRLOG_ALERT_MAX_PER_MINUTE,
+)
+from src.query_and_statement.reference_qas_manager import ReferenceQueryAndStatementManager
+from src.utils.tg_send_message import send_telegram_message
+
+
+ERRLOG_QUEUE_DEPTH = Gauge("errlog_queue_depth", "Записи журнала ошибок, ожидающие записи в БД")
+ERRLOG_DROPPED = Counter("errlog_dropped_total", "Записи журнала ошибок, не попавшие в БД", ["reason"])
+ERRLOG_ALERTS = Counter("errlog_alerts_total", "Сообщения об ошибках в Telegram (sent/failed; deferred - отложены общим лимитом)", ["result"])
+
+TRACEBACK_FRAME = re.compile(r'File "([^"]+)", line (\d+), in (\S+)')
+
+ERRLOG_ID_EPOCH_MS = 1_735_689_600_000  # 2025-01-01 00:00:00 UTC - отсчет миллисекунд в id: 41 бит хватает до 2094 года (от 1970 - только до 2039)
+
+
+class ErrLogQueue:
+    """
+    Неблокирующий журнал ошибок: запись ставится в ограниченную очередь (ERRLOG_QUEUE_SIZE) и сразу получает id,
+    фоновый воркер пишет записи в БД пачками (до ERRLOG_BATCH_SIZE за ERRLOG_FLUSH_INTERVAL секунд).
+    Сообщения в Telegram (IS_PROD) группируются по отпечатку трассировки: одинаковые ошибки - не чаще раза за ERRLOG_ALERT_WINDOW
+    секунд (повторы сводятся в одно сообщение), всего - не более ERRLOG_ALERT_MAX_PER_MINUTE в минуту.
+    Старые записи удаляет PartitionMaintenance: целыми партициями журнала, а до перевода errlog на партиционирование - пачками строк.
+    """
+    __queue: Optional[asyncio.Queue] = None
+    __tasks: List[asyncio.Task] = []
+    
+    __node = (os.getpid() ^ random.getrandbits(10)) & 0x3FF  # Часть id, различающая воркеры
+    __sequence = 0
+    __last_ms = 0
+    
+    __pending_alerts: Dict[str, Dict[str, Any]] = {}  # отпечаток -> первая/последняя запись и число повторов
+    __last_alert_at: Dict[str, float] = {}
+    __sent_at: Deque[float] = deque()
+    
+    @classmethod
+    def start(cls) -> None:
+        cls.__queue = asyncio.Queue(maxsize=ERRLOG_QUEUE_SIZE)
+        ERRLOG_QUEUE_DEPTH.set_function(cls.__queue.qsize)
+        cls.__tasks = [asyncio.create_task(cls.__writer(cls.__queue))]
+        if IS_PROD:
+            cls.__tasks.append(asyncio.create_task(cls.__alerter()))
+    
+    @classmethod
+    async def stop(cls, timeout: float = 10) -> None:
+        """Дожидается записи накопленных ошибок (не дольше timeout секунд) и останавливает фоновые задачи."""
+        if cls.__queue is None:
+            return
+        try:
+            await asyncio.wait_for(cls.__queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        for task in cls.__tasks:
+            task.cancel()
+        await asyncio.gather(*cls.__tasks, return_exceptions=True)
+        if IS_PROD:
+            await cls.__send_alerts(force=True)
+        cls.__queue, cls.__tasks = None, []
+    
+    @classmethod
+    async def submit(
+        cls,
+        
+        endpoint: str,
+        params: Optional[Dict],
+        msg: Optional[str],
+        user_uuid: str,
+    ) -> int:
+        record = {
+            "id": cls.__next_id(),
+            "endpoint": endpoint,
+            "params": params,
+            "msg": msg,
+            "user_uuid": user_uuid,
+        }
+        if cls.__queue is None:  # Воркер не запущен (вне приложения) - пишем сразу
+            await ReferenceQueryAndStatementManager.create_errlogs(records=[record])
+            cls.__register_alert(record)
+            if IS_PROD:
+                await cls.__send_alerts(force=True)
+            return record["id"]
+        
+        try:
+            cls.__queue.put_nowait(record)
+        except asyncio.QueueFull:
+            ERRLOG_DROPPED.labels(reason="queue_full").inc()
+            logging.error(f'Очередь журнала ошибок переполнена, запись #{record["id"]} ({endpoint}) не сохранена в БД:\n{msg}')
+        return record["id"]
+    
+    @classmethod
+    def __next_id(cls) -> int:
+        """
+        id записи до вставки (ответ с номером ошибки не ждет БД): миллисекунды от ERRLOG_ID_EPOCH_MS (41 бит), номер воркера (10 бит)
+        и счетчик в миллисекунде (12 бит) - растут со временем, умещаются в BIGINT и не пересекаются между воркерами
+        (и с последовательностью errlog_id_seq).
+        """
+        now_ms = int(time.time() * 1000) - ERRLOG_ID_EPOCH_MS
+        if now_ms <= cls.__last_ms:
+            cls.__sequence = (cls.__sequence + 1) & 0xFFF
+            if cls.__sequence == 0:  # Счетчик миллисекунды исчерпан - занимаем следующую
+                cls.__last_ms += 1
+        else:
+            cls.__last_ms, cls.__sequence = now_ms, 0
+        return (cls.__last_ms << 22) | (cls.__node << 12) | cls.__sequence
+    
+    @classmethod
+    async def __writer(cls, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            deadline = time.monotonic() + ERRLOG_FLUSH_INTERVAL
+            while len(batch) < ERRLOG_BATCH_SIZE:
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=max(deadline - time.monotonic(), 0)))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await ReferenceQueryAndStatementManager.create_errlogs(records=batch)
+            except Exception as e:
+                logging.warning(f"Пачка из {len(batch)} записей журнала ошибок не записана ({e}) - записи пишутся по одной")
+                await cls.__write_one_by_one(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+            
+            for record in batch:
+                cls.__register_alert(record)
+    
+    @staticmethod
+    async def __write_one_by_one(batch: List[Dict[str, Any]]) -> None:
+        """Запасной путь после ошибки вставки пачки: теряются только записи, которые не вставляются сами по себе."""
+        for record in batch:
+            try:
+                await ReferenceQueryAndStatementManager.create_errlogs(records=[record])
+            except Exception as e:
+                ERRLOG_DROPPED.labels(reason="db_error").inc()
+                logging.error(f'Не удалось записать запись журнала ошибок #{record["id"]} ({record["endpoint"]}): {e}\n{record["msg"]}')
+    
+    @staticmethod
+    def __fingerprint(record: Dict[str, Any]) -> str:
+        """Отпечаток ошибки: эндпоинт, кадры трассировки и тип исключения (без текста сообщения, в котором бывают данные запроса)."""
+        msg: str = record["msg"] or ""
+        lines = [line for line in msg.strip().splitlines() if line.strip()]
+        exception_type = lines[-1].split(":")[0] if lines else ""
+        frames = TRACEBACK_FRAME.findall(msg)
+        return hashlib.sha1(repr((record["endpoint"], frames, exception_type)).encode()).hexdigest()
+    
+    @classmethod
+    def __register_alert(cls, record: Dict[str, Any]) -> None:
+        if not IS_PROD:
+            return
+        fingerprint = cls.__fingerprint(record)
+        alert = cls.__pending_alerts.get(fingerprint)
+        if alert is None:
+            cls.__pending_alerts[fingerprint] = {"first": record, "last_id": record["id"], "count": 1}
+        else:
+            alert["last_id"] = record["id"]
+            alert["count"] += 1
+    
+    @classmethod
+    async def __alerter(cls) -> None:
+        while True:
+            await asyncio.sleep(1)
+            await cls.__send_alerts()
+    
+    @classmethod
+    async def __send_alerts(cls, force: bool = False) -> None:
+        now = time.monotonic()
+        while cls.__sent_at and now - cls.__sent_at[0] > 60:
+            cls.__sent_at.popleft()
+        
+        for fingerprint in list(cls.__pending_alerts):
+            if not force:
+                if now - cls.__last_alert_at.get(fingerprint, -ERRLOG_ALERT_WINDOW) < ERRLOG_ALERT_WINDOW:
+                    continue  # Повторы копятся до конца окна
+                if len(cls.__sent_at) >= ERRLOG_ALERT_MAX_PER_MINUTE:
+                    ERRLOG_ALERTS.labels(result="deferred").inc()
+                    break
+            
+            alert = cls.__pending_alerts.pop(fingerprint)
+            first = alert["first"]
+            header = f'ОШИБКА! #{first["id"]}'
+            if alert["count"] > 1:
+                header += f' (и еще {alert["count"] - 1} таких же, последняя #{alert["last_id"]})'
+            
+            cls.__last_alert_at[fingerprint] = now
+            cls.__sent_at.append(now)
+            try:
+                sent = await send_telegram_message(
+                    chat_id=TG_CHAT_ID,
+                    message=f"{header}\n\n\n{first['msg']}\n_______________________________"
+                )
+                ERRLOG_ALERTS.labels(result="sent" if sent else "failed").inc()
+            except Exception:
+                ERRLOG_ALERTS.labels(result="failed").inc()
+        
+        for fingerprint, alerted_at in list(cls.__last_alert_at.items()):  # Окна, в которых не было повторов, больше не нужны
+            if now - alerted_at >= ERRLOG_ALERT_WINDOW and fingerprint not in cls.__pending_alerts:
+                del cls.__last_alert_at[fingerprint]
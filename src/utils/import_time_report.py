@@ -0,0 +1,65 @@
+"""
+Отчет о времени импорта модулей при старте воркера (разбор вывода python -X importtime) - для артефакта CI.
+
+Запуск: python -m src.utils.import_time_report [--module app] [--top 30] [--output import_time_report.json]
+Режим ленивой загрузки роутеров сравнивается запуском с LAZY_ROUTERS=1.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+
+def collect_import_times(module: str = "app") -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f'Импорт модуля "{module}" завершился ошибкой:\n{completed.stderr[-3000:]}')
+    
+    modules: List[Dict[str, Any]] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    
+    total_us = next((item["cumulative_us"] for item in modules if item["module"] == module and item["depth"] == 0), None)
+    
+    return {
+        "module": module,
+        "total_us": total_us,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,  # Пиковая память процесса импорта (Linux - в КБ)
+        "modules": sorted(modules, key=lambda item: item["cumulative_us"], reverse=True),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Отчет о времени импорта модулей (python -X importtime)")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--output", default=None, help="Путь JSON-отчета (артефакт CI)")
+    args = parser.parse_args()
+    
+    report = collect_import_times(module=args.module)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    
+    print(f'{report["module"]}: {(report["total_us"] or 0) / 1000:.1f} ms, max RSS {report["max_rss_kb"] / 1024:.1f} MB')
+    print(f'{"cumulative, ms":>15} {"self, ms":>10}  module')
+    for item in report["modules"][:args.top]:
+        print(f'{item["cumulative_us"] / 1000:>15.1f} {item["self_us"] / 1000:>10.1f}  {"  " * item["depth"]}{item["module"]}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Замер сборки индексов, которые prepare_indexes достраивает на существующих таблицах (directory_uuid у counterparty, application,
+commercial_proposal и directory_id у document): CREATE INDEX против CREATE INDEX CONCURRENTLY при идущей записи в таблицу
+и поиск субъекта директории (запрос get_subject_info_by_directory_uuid) до и после сборки.
+
+Запуск: python -m src.utils.index_build_benchmark [--dsn postgresql+psycopg2://...] [--rows 5000000] [--read-samples 200] [--output index_build_benchmark.json] [--keep]
+По умолчанию - БД из конфигурации (соединение без pgbouncer). Копии таблиц (по моделям, без внешних ключей) создаются в схеме
+index_build_benchmark и удаляются после замера. Запускать на стенде, не на рабочей БД.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import Index, MetaData, Table, create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from connection_module import sync_engine_without_bouncer
+from src.models.application.application_models import Application
+from src.models.commercial_proposal_models import CommercialProposal
+from src.models.counterparty.counterparty_models import Counterparty
+from src.models.file_store_models import Document
+from src.utils.benchmark_stats import latency_summary
+
+
+SCHEMA = "index_build_benchmark"
+FILL_BATCH = 1_000_000
+DIRECTORIES = 100_000  # Директорий, по которым распределены документы
+
+# Индексы, которые строит prepare_indexes на существующих таблицах, и значения колонок строки номер {g}
+TABLES: Dict[str, Dict[str, Any]] = {
+    Counterparty.__tablename__: {
+        "model": Counterparty,
+        "index": "idx_counterparty_directory_uuid",
+        "values": {
+            "uuid": "md5('counterparty-' || {g})::uuid::text",
+            "type": "1",
+            "country": "1",
+            "identifier_type": "'ИНН'",
+            "identifier_value": "CAST({g} AS text)",
+            "tax_identifier": "CAST({g} AS text)",
+            "user_id": "1",
+            "user_uuid": "'user-0'",
+            "directory_id": "{g}",
+            "directory_uuid": "md5('counterparty-directory-' || {g})::uuid::text",
+        },
+    },
+    Application.__tablename__: {
+        "model": Application,
+        "index": "idx_application_directory_uuid",
+        "values": {
+            "uuid": "md5('application-' || {g})::uuid::text",
+            "name": "'A-' || {g}",
+            "user_id": "1",
+            "user_uuid": "'user-0'",
+            "counterparty_id": "{g}",
+            "counterparty_uuid": "md5('counterparty-' || {g})::uuid::text",
+            "directory_id": "{g}",
+            "directory_uuid": "md5('application-directory-' || {g})::uuid::text",
+            "data_id": "{g}",
+        },
+    },
+    CommercialProposal.__tablename__: {
+        "model": CommercialProposal,
+        "index": "idx_commercial_proposal_directory_uuid",
+        "values": {
+            "uuid": "md5('commercial_proposal-' || {g})::uuid::text",
+            "appliaction_name": "'CP-' || {g}",
+            "type": "1",
+            "user_id": "1",
+            "user_uuid": "'user-0'",
+            "directory_id": "{g}",
+            "directory_uuid": "md5('commercial_proposal-directory-' || {g})::uuid::text",
+            "status": "1",
+            "can_be_updated_by_user": "true",
+        },
+    },
+    Document.__tablename__: {
+        "model": Document,
+        "index": "idx_document_directory_id",
+        "values": {
+            "uuid": "md5('document-' || {g})::uuid::text",
+            "name": "'file-' || {g}",
+            "directory_id": f"{{g}} % {DIRECTORIES}",
+            "directory_uuid": f"md5('document-directory-' || ({{g}} % {DIRECTORIES}))::uuid::text",
+            "path": "'filestore/' || {g}",
+            "uploader_user_id": "1",
+            "uploader_user_uuid": "'user-0'",
+            "visible": "true",
+        },
+    },
+}
+
+SUBJECT_QUERY = f"""
+    (SELECT 1, uuid FROM {SCHEMA}.counterparty WHERE directory_uuid = :directory_uuid
+    UNION ALL
+    SELECT 2, uuid FROM {SCHEMA}.commercial_proposal WHERE directory_uuid = :directory_uuid
+    UNION ALL
+    SELECT 3, uuid FROM {SCHEMA}.application WHERE directory_uuid = :directory_uuid)
+    LIMIT 1
+"""
+
+
+def _benchmark_index(name: str) -> Index:
+    table: Table = TABLES[name]["model"].__table__.to_metadata(MetaData(), schema=SCHEMA)
+    return next(index for index in table.indexes if index.name == TABLES[name]["index"])
+
+
+def _create_and_fill(engine: Engine, name: str, rows: int) -> None:
+    """Копия таблицы с остальными индексами модели; замеряемый индекс не создается."""
+    table: Table = TABLES[name]["model"].__table__.to_metadata(MetaData(), schema=SCHEMA)
+    values = TABLES[name]["values"]
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA};"))
+        connection.execute(CreateTable(table, include_foreign_key_constraints=[]))
+        for index in table.indexes:
+            if index.name != TABLES[name]["index"]:
+                connection.execute(CreateIndex(index))
+    
+    for first in range(1, rows + 1, FILL_BATCH):
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"""
+                    INSERT INTO {SCHEMA}.{name} ({", ".join(values)})
+                    SELECT {", ".join(expression.format(g="g") for expression in values.values())}
+                    FROM generate_series(CAST(:first AS bigint), CAST(:last AS bigint)) AS g;
+                    """
+                ),
+                {"first": first, "last": min(first + FILL_BATCH - 1, rows)},
+            )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"VACUUM ANALYZE {SCHEMA}.{name};"))
+
+
+def _build_under_writes(engine: Engine, name: str, row_numbers: Iterator[int], concurrently: bool) -> Dict[str, Any]:
+    """Строит индекс, пока другой поток вставляет строки по одной; время сборки и задержки вставок за это время."""
+    index = _benchmark_index(name)
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    if concurrently:
+        ddl = ddl.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)
+    
+    values = TABLES[name]["values"]
+    insert_stmt = text(
+        f"INSERT INTO {SCHEMA}.{name} ({', '.join(values)}) VALUES ({', '.join(expression.format(g=':g') for expression in values.values())});"
+    )
+    stop = threading.Event()
+    insert_seconds: List[float] = []
+    
+    def writer() -> None:
+        while not stop.is_set():
+            started_at = time.perf_counter()
+            with engine.begin() as connection:
+                connection.execute(insert_stmt, {"g": next(row_numbers)})
+            insert_seconds.append(time.perf_counter() - started_at)
+    
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(1)  # Задержки вставок без сборки индекса попадают в замер как базовые
+    started_at = time.perf_counter()
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(ddl))
+    finally:
+        build_seconds = time.perf_counter() - started_at
+        time.sleep(1)
+        stop.set()
+        thread.join()
+    
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"DROP INDEX {SCHEMA}.{index.name};"))
+    
+    return {"build_seconds": round(build_seconds, 2), "inserts": len(insert_seconds), "insert": latency_summary(insert_seconds)}
+
+
+def _subject_lookup(engine: Engine, rows: int, samples: int) -> Dict[str, float]:
+    seconds: List[float] = []
+    with engine.connect() as connection:
+        for _ in range(samples):
+            kind = random.choice(["counterparty", "application", "commercial_proposal"])
+            directory_uuid = str(uuid.UUID(hashlib.md5(f"{kind}-directory-{random.randint(1, rows)}".encode()).hexdigest()))  # = md5(...)::uuid::text
+            params = {"directory_uuid": directory_uuid}
+            started_at = time.perf_counter()
+            connection.execute(text(SUBJECT_QUERY), params).first()
+            seconds.append(time.perf_counter() - started_at)
+    return latency_summary(seconds)
+
+
+def run_benchmark(engine: Engine, rows: int, read_samples: int, keep: bool = False) -> Dict[str, Any]:
+    random.seed(30)
+    report: Dict[str, Any] = {"rows": rows, "read_samples": read_samples, "tables": {}}
+    try:
+        for name in TABLES:
+            _create_and_fill(engine=engine, name=name, rows=rows)
+        report["subject_lookup_without_indexes"] = _subject_lookup(engine=engine, rows=rows, samples=read_samples)
+        
+        row_numbers = itertools.count(rows + 1)  # Номера строк, вставляемых во время сборки - без конфликтов уникальных ключей
+        for name in TABLES:
+            report["tables"][name] = {
+                "create_index": _build_under_writes(engine=engine, name=name, row_numbers=row_numbers, concurrently=False),
+                "create_index_concurrently": _build_under_writes(engine=engine, name=name, row_numbers=row_numbers, concurrently=True),
+            }
+        
+        with engine.begin() as connection:
+            for name in TABLES:
+                connection.execute(CreateIndex(_benchmark_index(name)))
+        report["subject_lookup_with_indexes"] = _subject_lookup(engine=engine, rows=rows, samples=read_samples)
+    finally:
+        if not keep:
+            with engine.begin() as connection:
+                connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;"))
+    
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CREATE INDEX против CREATE INDEX CONCURRENTLY при записи и поиск субъекта директории")
+    parser.add_argument("--dsn", default=None, help="URL SQLAlchemy (sync) стенда; по умолчанию - БД из конфигурации")
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Строк в каждой таблице")
+    parser.add_argument("--read-samples", type=int, default=200)
+    parser.add_argument("--output", default=None, help="Путь JSON-отчета")
+    parser.add_argument("--keep", action="store_true", help="Не удалять схему замера")
+    args = parser.parse_args()
+    
+    engine: Engine = create_engine(args.dsn) if args.dsn else sync_engine_without_bouncer
+    report = run_benchmark(engine=engine, rows=args.rows, read_samples=args.read_samples, keep=args.keep)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    
+    print(f'{report["rows"]} строк в таблице, p50 / p99 вставки во время сборки, ms')
+    for name, modes in report["tables"].items():
+        for mode, result in modes.items():
+            print(
+                f'{name:>20} {mode:<26} сборка {result["build_seconds"]:>8.2f} s, вставок {result["inserts"]:>6}, '
+                f'{result["insert"]["p50_ms"]:>9.3f} / {result["insert"]["p99_ms"]:>9.3f} (max {result["insert"]["max_ms"]:.1f})'
+            )
+    for key in ("subject_lookup_without_indexes", "subject_lookup_with_indexes"):
+        print(f'{key:<32} p50 {report[key]["p50_ms"]:.3f} ms, p99 {report[key]["p99_ms"]:.3f} ms')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Замер сборки ответа списочных эндпоинтов /get_counterparties (extended_output), /get_notifications и /get_user_files_info (Админ)
+на странице page_size=1000: прежний путь (Pydantic-модель на каждую строку, повторная валидация response_model в FastAPI, JSONResponse)
+против текущего (словари прямо из строк, ORJSONResponse).
+
+Запуск: python -m src.utils.list_endpoints_benchmark [--page-size 1000] [--repeats 20] [--tz Moscow] [--output list_endpoints_benchmark.json]
+БД не нужна: методы сервисов подменяются синтетическими строками, текущий путь - настоящие функции эндпоинтов (без лимитера).
+Для каждого эндпоинта проверяется, что разобранные тела ответов обоих путей совпадают; пиковая память - по tracemalloc.
+"""
+import argparse
+import asyncio
+import datetime
+import inspect
+import json
+import random
+import time
+import tracemalloc
+import types
+from typing import Any, Awaitable, Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from pydantic.fields import FieldInfo
+
+from src.routes.counterparty import counterparty_routes
+from src.routes import file_store_routes, notification_routes
+from src.schemas.counterparty.counterparty_schema import ExtendedLegalEntity, ResponseGetLegalEntities
+from src.schemas.file_store_schema import AdminFileInfo, ResponseGetUserFilesInfo
+from src.schemas.notification_schema import NotificationData, ResponseGetNotifications
+from src.schemas.user_schema import ClientState, RequestContext, UserSchema
+from src.service.counterparty.counterparty_service import CounterpartyService
+from src.service.file_store_service import FileStoreService
+from src.service.notification_service import NotificationService
+from src.utils.benchmark_stats import latency_summary
+from src.utils.reference_mapping_data.app.app_mapping_data import COUNTRY_MAPPING
+from src.utils.reference_mapping_data.notification.mapping import NOTIFICATION_SUBJECT_MAPPING
+from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING
+from src.utils.tz_converter import format_dt
+
+
+STARTED = datetime.datetime(2025, 1, 1)
+
+
+class _FakeSession:
+    async def release_connection(self) -> None:
+        pass
+    
+    async def rollback(self) -> None:
+        pass
+
+
+def _dt() -> datetime.datetime:
+    return STARTED + datetime.timedelta(seconds=random.randrange(10 ** 7))
+
+
+def _counterparty_rows(page_size: int) -> List[Any]:
+    return [
+        types.SimpleNamespace(
+            uuid=f"{i:036d}", country=random.choice(list(COUNTRY_MAPPING.values())), identifier_type="ИНН", identifier_value="7700000000",
+            tax_identifier="7700000000", user_id=i, user_uuid="u" * 36, directory_id=i, directory_uuid="d" * 36, data_id=i,
+            can_be_updated_by_user=True, mt=True, application_access_list=i, is_active=True, updated_at=_dt(), created_at=_dt(),
+            name_latin="ACME", name_national="АКМЕ", organizational_and_legal_form_latin="LLC", organizational_and_legal_form_national="ООО",
+            data_updated_at=_dt(),
+        )
+        for i in range(page_size)
+    ]
+
+
+def _notification_rows(page_size: int) -> List[Any]:
+    return [
+        types.SimpleNamespace(
+            uuid=f"{i:036d}", for_admin=False, subject_id=random.choice(list(NOTIFICATION_SUBJECT_MAPPING.values())), subject_uuid="s" * 36,
+            initiator_user_id=1, initiator_user_uuid="i" * 36, recipient_user_id=2, recipient_user_uuid="r" * 36,
+            data="Текст уведомления " * 5, is_read=False, read_at=None, is_important=True, time_importance_change=_dt(), created_at=_dt(),
+        )
+        for i in range(page_size)
+    ]
+
+
+def _file_rows(page_size: int, tz: str) -> Dict[int, Dict[str, Any]]:
+    """Словари, которые FileStoreService.get_doc_info_from_db собирает для Админа (поля AdminFileInfo)."""
+    return {
+        i: {
+            "uuid": f"{i:036d}", "name": "file.pdf", "extansion": "pdf", "type": 1, "directory_id": 1, "directory_uuid": "d" * 36,
+            "path": "filestore/a/b", "owner_user_id": 1, "owner_user_uuid": "o" * 36, "uploader_user_id": 1, "uploader_user_uuid": "o" * 36,
+            "visible": True, "is_deleted": False, "deleted_at": None, "created_at": format_dt(_dt(), tz),
+            "visibility_off_time": None, "visibility_off_user_id": None, "visibility_off_user_uuid": None,
+            "deleters_user_id": None, "deleters_user_uuid": None,
+        }
+        for i in range(page_size)
+    }
+
+
+def _route(router: Any, path: str) -> Any:
+    return next(route for route in router.routes if route.path == path)
+
+
+async def _call_endpoint(router: Any, path: str, context: RequestContext, **params: Any) -> bytes:
+    """Функция эндпоинта без лимитера; параметры Query - значения по умолчанию, если не переданы."""
+    endpoint = inspect.unwrap(_route(router, path).endpoint)
+    kwargs: Dict[str, Any] = {}
+    for name, parameter in inspect.signature(endpoint).parameters.items():
+        kwargs[name] = parameter.default.default if isinstance(parameter.default, FieldInfo) else parameter.default
+    kwargs.update(request=None, context=context, session=_FakeSession(), client_state=None, **params)
+    response = await endpoint(**kwargs)
+    return response.body
+
+
+async def _old_response(router: Any, path: str, response_content: Any) -> bytes:
+    content = await serialize_response(field=_route(router, path).response_field, response_content=response_content, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def _measure(build: Callable[[], Awaitable[bytes]], repeats: int) -> Dict[str, Any]:
+    await build()
+    seconds: List[float] = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        await build()
+        seconds.append(time.perf_counter() - started_at)
+    tracemalloc.start()
+    await build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"latency": latency_summary(seconds), "peak_kib": round(peak / 1024)}
+
+
+async def run_benchmark(page_size: int, repeats: int, tz: str) -> Dict[str, Any]:
+    random.seed(42)
+    context = RequestContext(
+        user=UserSchema(user_id=1, user_uuid="a" * 36, user_dir_uuid="d" * 36, privilege_id=PRIVILEGE_MAPPING["Admin"]),
+        client_state=ClientState(data={"tz": tz}),
+    )
+    counterparties, notifications, files = _counterparty_rows(page_size), _notification_rows(page_size), _file_rows(page_size, tz)
+    
+    async def get_counterparties(**kwargs: Any) -> Dict[str, Any]:
+        return {"data": counterparties, "total_records": page_size, "total_pages": 1}
+    
+    async def get_notifications(**kwargs: Any) -> Dict[str, Any]:
+        return {"data": notifications, "total_records": page_size, "total_pages": 1}
+    
+    async def get_doc_info_from_db(**kwargs: Any) -> Dict[str, Any]:
+        return {"data": files, "count": page_size, "total_records": page_size, "total_pages": 1}
+    
+    async def old_counterparties() -> bytes:
+        response_content = ResponseGetLegalEntities(data=[], count=0, total_records=page_size, total_pages=1)
+        for row in counterparties:
+            response_content.data.append(
+                ExtendedLegalEntity(
+                    uuid=row.uuid, country=COUNTRY_MAPPING.reverse[row.country], identifier_type=row.identifier_type,
+                    identifier_value=row.identifier_value, tax_identifier=row.tax_identifier, user_id=row.user_id, user_uuid=row.user_uuid,
+                    directory_id=row.directory_id, directory_uuid=row.directory_uuid, data_id=row.data_id,
+                    can_be_updated_by_user=row.can_be_updated_by_user, mt=row.mt, application_access_list=row.application_access_list,
+                    is_active=row.is_active, updated_at=format_dt(row.updated_at, tz), created_at=format_dt(row.created_at, tz),
+                    name_latin=row.name_latin, name_national=row.name_national,
+                    organizational_and_legal_form_latin=row.organizational_and_legal_form_latin,
+                    organizational_and_legal_form_national=row.organizational_and_legal_form_national,
+                    data_updated_at=format_dt(row.data_updated_at, tz),
+                )
+            )
+            response_content.count += 1
+        return await _old_response(counterparty_routes.router, "/get_counterparties", response_content)
+    
+    async def old_notifications() -> bytes:
+        response_content = ResponseGetNotifications(data=[], count=0, total_records=page_size, total_pages=1)
+        for row in notifications:
+            response_content.data.append(
+                NotificationData(
+                    uuid=row.uuid, for_admin=row.for_admin, subject=NOTIFICATION_SUBJECT_MAPPING.name_of(row.subject_id),
+                    subject_uuid=row.subject_uuid, initiator_user_id=row.initiator_user_id, initiator_user_uuid=row.initiator_user_uuid,
+                    recipient_user_id=row.recipient_user_id, recipient_user_uuid=row.recipient_user_uuid, data=row.data, is_read=row.is_read,
+                    read_at=format_dt(row.read_at, tz), is_important=row.is_important,
+                    time_importance_change=format_dt(row.time_importance_change, tz), created_at=format_dt(row.created_at, tz),
+                )
+            )
+        response_content.count = len(response_content.data)
+        return await _old_response(notification_routes.router, "/get_notifications", response_content)
+    
+    async def old_files() -> bytes:
+        response_content = ResponseGetUserFilesInfo(data_from_db=[], data_from_fs=[], count=page_size, total_records=page_size, total_pages=1)
+        for row in files.values():
+            response_content.data_from_db.append(AdminFileInfo(**row))
+        return await _old_response(file_store_routes.router, "/get_user_files_info", response_content)
+    
+    endpoints: Dict[str, Dict[str, Callable[[], Awaitable[bytes]]]] = {
+        "/get_counterparties": {
+            "old": old_counterparties,
+            "new": lambda: _call_endpoint(counterparty_routes.router, "/get_counterparties", context, extended_output=True, page_size=page_size),
+        },
+        "/get_notifications": {
+            "old": old_notifications,
+            "new": lambda: _call_endpoint(notification_routes.router, "/get_notifications", context, page_size=page_size),
+        },
+        "/get_user_files_info": {
+            "old": old_files,
+            "new": lambda: _call_endpoint(file_store_routes.router, "/get_user_files_info", context, with_data_from_fs=False, page_size=page_size),
+        },
+    }
+    
+    originals = (CounterpartyService.get_counterparties, NotificationService.get_notifications, FileStoreService.get_doc_info_from_db)
+    CounterpartyService.get_counterparties = staticmethod(get_counterparties)
+    NotificationService.get_notifications = staticmethod(get_notifications)
+    FileStoreService.get_doc_info_from_db = staticmethod(get_doc_info_from_db)
+    report: Dict[str, Any] = {"page_size": page_size, "repeats": repeats, "tz": tz, "endpoints": {}}
+    try:
+        for path, paths in endpoints.items():
+            identical = json.loads(await paths["old"]()) == json.loads(await paths["new"]())
+            report["endpoints"][path] = {
+                "identical_output": identical,
+                "old": await _measure(paths["old"], repeats=repeats),
+                "new": await _measure(paths["new"], repeats=repeats),
+            }
+    finally:
+        CounterpartyService.get_counterparties, NotificationService.get_notifications, FileStoreService.get_doc_info_from_db = (
+            staticmethod(originals[0]), staticmethod(originals[1]), staticmethod(originals[2])
+        )
+    
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сборка ответа списочных эндпоинтов: Pydantic + response_model против словарей + orjson")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--tz", default="Moscow", help="tz_city клиента")
+    parser.add_argument("--output", default=None, help="Путь JSON-отчета")
+    args = parser.parse_args()
+    
+    report = asyncio.run(run_benchmark(page_size=args.page_size, repeats=args.repeats, tz=args.tz))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    
+    print(f'page_size={report["page_size"]}, tz={report["tz"]}, p50 из {report["repeats"]} прогонов / пиковая память')
+    for path, result in report["endpoints"].items():
+        print(
+            f'{path:<22} {result["old"]["latency"]["p50_ms"]:>8.1f} ms / {result["old"]["peak_kib"]:>6} KiB -> '
+            f'{result["new"]["latency"]["p50_ms"]:>8.1f} ms / {result["new"]["peak_kib"]:>6} KiB, ответы совпадают: {result["identical_output"]}'
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Замер шифрования ответа /auth_v2 для Flet (5 значений на вход): прежняя схема (соль и PBKDF2 на каждое значение + Fernet)
+против конверта AES-GCM с ключом, выведенным из SECRET_KEY один раз на процесс (security.encrypt / encrypt_many_async).
+
+Запуск: python -m src.utils.login_encryption_benchmark [--legacy-logins 20] [--logins 20000] [--concurrency 100]
+    [--output login_encryption_benchmark.json]
+БД и Redis не нужны. Режим cpu_pool идет через CPUExecutor (CPU_EXECUTOR_KIND, CPU_EXECUTOR_WORKERS) - как в эндпоинте;
+его пропускная способность включает передачу задач между процессами.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from security import decrypt, encrypt, encrypt_many_async, warm_up_encryption_key
+from src.utils.benchmark_stats import latency_summary, time_calls
+from src.utils.cpu_executor import CPUExecutor
+
+
+SECRET_KEY = "login-encryption-benchmark"
+LOGIN_VALUES = ["t" * 64, "12345", "u" * 36, "d" * 36, "2"]  # token, user_id, user_uuid, user_dir_uuid, privilege_id
+
+
+def legacy_encrypt(plain_text: str, secret_key: str) -> str:
+    """encrypt до перехода на конверт: новая соль и 100 000 итераций PBKDF2 на каждое значение."""
+    salt = os.urandom(16)
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000)
+    f = Fernet(base64.urlsafe_b64encode(kdf.derive(secret_key.encode("utf-8"))))
+    return base64.urlsafe_b64encode(
+        salt + f.encrypt(plain_text.encode("utf-8"))
+    ).decode()
+
+
+def _sequential(login: Callable[[], Any], logins: int) -> Dict[str, Any]:
+    seconds = time_calls(login, repeats=logins)
+    return {"logins": logins, "logins_per_second": round(logins / sum(seconds), 1), "login": latency_summary(seconds)}
+
+
+async def _cpu_pool(logins: int, concurrency: int) -> Dict[str, Any]:
+    seconds: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def login() -> None:
+        async with semaphore:
+            started_at = time.perf_counter()
+            await encrypt_many_async(plain_texts=LOGIN_VALUES, secret_key=SECRET_KEY)
+            seconds.append(time.perf_counter() - started_at)
+    
+    await login()  # Запуск процессов пула и вывод ключа
+    seconds.clear()
+    started_at = time.perf_counter()
+    await asyncio.gather(*[login() for _ in range(logins)])
+    elapsed = time.perf_counter() - started_at
+    return {"logins": logins, "concurrency": concurrency, "logins_per_second": round(logins / elapsed, 1), "login": latency_summary(seconds)}
+
+
+def run_benchmark(legacy_logins: int, logins: int, concurrency: int) -> Dict[str, Any]:
+    legacy_token = legacy_encrypt(LOGIN_VALUES[0], SECRET_KEY)
+    envelope_token = encrypt(LOGIN_VALUES[0], SECRET_KEY)
+    assert decrypt(legacy_token, SECRET_KEY) == decrypt(envelope_token, SECRET_KEY) == LOGIN_VALUES[0]  # Старые токены по-прежнему читаются
+    
+    report: Dict[str, Any] = {"values_per_login": len(LOGIN_VALUES), "modes": {}}
+    report["modes"]["legacy_pbkdf2_per_value"] = _sequential(lambda: [legacy_encrypt(value, SECRET_KEY) for value in LOGIN_VALUES], legacy_logins)
+    report["modes"]["envelope_inline"] = _sequential(lambda: [encrypt(value, SECRET_KEY) for value in LOGIN_VALUES], logins)
+    
+    async def cpu_pool() -> Dict[str, Any]:
+        await warm_up_encryption_key(secret_key=SECRET_KEY)
+        try:
+            return await _cpu_pool(logins=logins, concurrency=concurrency)
+        finally:
+            CPUExecutor.shutdown()
+    
+    report["modes"]["envelope_cpu_pool"] = asyncio.run(cpu_pool())
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Шифрование ответа входа: PBKDF2 на каждое значение против конверта AES-GCM")
+    parser.add_argument("--legacy-logins", type=int, default=20, help="Входов по прежней схеме (~0,2 с каждый)")
+    parser.add_argument("--logins", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=100, help="Одновременных входов в режиме cpu_pool")
+    parser.add_argument("--output", default=None, help="Путь JSON-отчета")
+    args = parser.parse_args()
+    
+    report = run_benchmark(legacy_logins=args.legacy_logins, logins=args.logins, concurrency=args.concurrency)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    
+    print(f'{report["values_per_login"]} значений на вход')
+    for mode, result in report["modes"].items():
+        print(f'{mode:<26} {result["logins_per_second"]:>10.1f} входов/с, p50 {result["login"]["p50_ms"]:>9.3f} ms, p99 {result["login"]["p99_ms"]:>9.3f} ms')
+
+
+if __name__ == "__main__":
+    main()
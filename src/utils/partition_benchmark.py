@@ -0,0 +1,287 @@
+"""
+Замер вставки и чтения свежих записей message, notification и errlog на десятках миллионов строк:
+обычная таблица против помесячных партиций. Обе таблицы строятся по моделям (те же колонки, ключи и индексы, без внешних ключей),
+у notification в обоих вариантах есть реестр notification_uuid с триггером - как в рабочей схеме.
+
+Запуск: python -m src.utils.partition_benchmark [--dsn postgresql+psycopg2://...] [--rows 20000000] [--months 24]
+    [--insert-samples 1000] [--read-samples 50] [--table notification] [--output partition_benchmark.json] [--keep]
+По умолчанию - БД из конфигурации (соединение без pgbouncer). Таблицы создаются в схемах partition_benchmark_plain
+и partition_benchmark_partitioned и удаляются после замера. Запускать на стенде с ресурсами рабочей БД, не на ней самой.
+"""
+import argparse
+import datetime
+import json
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import MetaData, Table, create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from connection_module import sync_engine_without_bouncer
+from src.models.chat_models import Message
+from src.models.notification_models import Notification, NotificationUUID
+from src.models.reference_models import ErrLog
+from src.utils.benchmark_stats import latency_summary
+from src.utils.partition_maintenance import _month_start
+
+
+VARIANTS: List[Tuple[str, bool]] = [  # схема, партиционирована ли таблица
+    ("partition_benchmark_plain", False),
+    ("partition_benchmark_partitioned", True),
+]
+FILL_BATCH = 1_000_000
+USERS = 10_000
+CHATS = 100_000
+
+# Значения колонок строки номер {g}: g - столбец generate_series при заполнении или параметр :g при одиночной вставке
+ROW_VALUES: Dict[str, Dict[str, str]] = {
+    Message.__tablename__: {
+        "user_id": "1",
+        "user_uuid": f"'user-' || ({{g}} % {USERS})",
+        "user_privilege_id": "1",
+        "chat_id": f"{{g}} % {CHATS}",
+        "data": "'message ' || {g}",
+    },
+    Notification.__tablename__: {
+        "uuid": "md5(CAST({g} AS text))::uuid::text",
+        "for_admin": "false",
+        "initiator_user_id": "1",
+        "initiator_user_uuid": "'user-0'",
+        "recipient_user_id": f"{{g}} % {USERS}",
+        "recipient_user_uuid": f"'user-' || ({{g}} % {USERS})",
+        "data": "'notification ' || {g}",
+        "is_read": "false",
+        "is_important": "false",
+    },
+    ErrLog.__tablename__: {
+        "endpoint": "'/benchmark'",
+        "msg": "'error ' || {g}",
+        "user_uuid": f"'user-' || ({{g}} % {USERS})",
+    },
+}
+
+# Чтения, которые выполняет приложение: имя замера, запрос ({table} - таблица варианта), параметры
+READS: Dict[str, List[Tuple[str, str, Any]]] = {
+    Message.__tablename__: [
+        (
+            "chat_last_page",
+            "SELECT * FROM {table} WHERE chat_id = :chat_id ORDER BY created_at DESC LIMIT 50",
+            lambda rows: {"chat_id": random.randrange(CHATS)},
+        ),
+    ],
+    Notification.__tablename__: [
+        (
+            "recipient_last_week",
+            "SELECT * FROM {table} WHERE recipient_user_uuid = :user_uuid AND created_at >= now() - interval '7 days' "
+            "ORDER BY created_at DESC LIMIT 50",
+            lambda rows: {"user_uuid": f"user-{random.randrange(USERS)}"},
+        ),
+        (
+            "by_uuid",
+            "SELECT * FROM {table} WHERE uuid = md5(CAST(:g AS text))::uuid::text",
+            lambda rows: {"g": random.randint(1, rows)},
+        ),
+    ],
+    ErrLog.__tablename__: [
+        (
+            "last_day",
+            "SELECT * FROM {table} WHERE created_at >= now() - interval '1 day' ORDER BY created_at DESC LIMIT 100",
+            lambda rows: {},
+        ),
+    ],
+}
+MODELS = {model.__tablename__: model for model in (Message, Notification, ErrLog)}
+
+
+def _create_table(engine: Engine, name: str, schema: str, partitioned: bool, start: datetime.datetime, end: datetime.datetime) -> None:
+    metadata = MetaData()
+    table: Table = MODELS[name].__table__.to_metadata(metadata, schema=schema)
+    if not partitioned:
+        table.dialect_options["postgresql"]["partition_by"] = None
+    
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema};"))
+        connection.execute(CreateTable(table, include_foreign_key_constraints=[]))
+        for index in table.indexes:
+            connection.execute(CreateIndex(index))
+        
+        if partitioned:
+            lower_bound = start
+            while lower_bound < end:
+                upper_bound = _month_start(lower_bound, months_ahead=1)
+                connection.execute(
+                    text(
+                        f"CREATE TABLE {schema}.{name}_p{lower_bound:%Y_%m} PARTITION OF {schema}.{name} "
+                        f"FOR VALUES FROM ('{lower_bound.isoformat()}') TO ('{upper_bound.isoformat()}');"
+                    )
+                )
+                lower_bound = upper_bound
+        
+        if name == Notification.__tablename__:
+            connection.execute(CreateTable(NotificationUUID.__table__.to_metadata(metadata, schema=schema)))
+
+
+def _fill_table(engine: Engine, name: str, schema: str, rows: int, start: datetime.datetime, end: datetime.datetime) -> float:
+    """Строки 1..rows равномерно по времени от start до end - в порядке вставки, как в рабочей таблице."""
+    columns = ROW_VALUES[name]
+    values = ", ".join(expression.format(g="g") for expression in columns.values())
+    step_seconds = (end - start).total_seconds() / rows
+    
+    started_at = time.perf_counter()
+    for first in range(1, rows + 1, FILL_BATCH):
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"""
+                    INSERT INTO {schema}.{name} ({", ".join(columns)}, created_at)
+                    SELECT {values}, CAST(:start AS timestamptz) + g * make_interval(secs => :step_seconds)
+                    FROM generate_series(CAST(:first AS bigint), CAST(:last AS bigint)) AS g;
+                    """
+                ),
+                {"start": start, "step_seconds": step_seconds, "first": first, "last": min(first + FILL_BATCH - 1, rows)},
+            )
+    
+    with engine.begin() as connection:
+        if name == Notification.__tablename__:
+            connection.execute(text(f"INSERT INTO {schema}.notification_uuid (uuid) SELECT uuid FROM {schema}.notification;"))
+            connection.execute(
+                text(
+                    f"""
+                    CREATE FUNCTION {schema}.register_notification_uuid()
+                    RETURNS trigger AS $$
+                    BEGIN
+                        INSERT INTO {schema}.notification_uuid (uuid) VALUES (NEW.uuid);
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql;
+                    """
+                )
+            )
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER notification_uuid_registry AFTER INSERT ON {schema}.notification "
+                    f"FOR EACH ROW EXECUTE FUNCTION {schema}.register_notification_uuid();"
+                )
+            )
+    fill_seconds = time.perf_counter() - started_at
+    
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"VACUUM ANALYZE {schema}.{name};"))
+    return fill_seconds
+
+
+def _measure_table(engine: Engine, name: str, schema: str, rows: int, insert_samples: int, read_samples: int) -> Dict[str, Any]:
+    columns = ROW_VALUES[name]
+    values = ", ".join(expression.format(g=":g") for expression in columns.values())
+    insert_stmt = text(f"INSERT INTO {schema}.{name} ({', '.join(columns)}) VALUES ({values});")  # created_at - по умолчанию, текущее время
+    
+    insert_seconds: List[float] = []
+    for g in range(rows + 1, rows + 1 + insert_samples):
+        started_at = time.perf_counter()
+        with engine.begin() as connection:
+            connection.execute(insert_stmt, {"g": g})
+        insert_seconds.append(time.perf_counter() - started_at)
+    
+    reads: Dict[str, Dict[str, float]] = {}
+    with engine.connect() as connection:
+        for read_name, query, make_params in READS[name]:
+            stmt = text(query.format(table=f"{schema}.{name}"))
+            connection.execute(stmt, make_params(rows)).fetchall()  # Прогрев плана и кеша
+            read_seconds: List[float] = []
+            for _ in range(read_samples):
+                params = make_params(rows)
+                started_at = time.perf_counter()
+                connection.execute(stmt, params).fetchall()
+                read_seconds.append(time.perf_counter() - started_at)
+            reads[read_name] = latency_summary(read_seconds)
+        
+        size = connection.execute(
+            text(
+                """
+                SELECT pg_total_relation_size(to_regclass(:table))
+                    + coalesce((SELECT sum(pg_total_relation_size(inhrelid)) FROM pg_inherits WHERE inhparent = to_regclass(:table)), 0);
+                """
+            ),
+            {"table": f"{schema}.{name}"},
+        ).scalar()
+    
+    return {"size_mb": round(size / 1024 / 1024, 1), "insert": latency_summary(insert_seconds), "reads": reads}
+
+
+def run_benchmark(
+    engine: Engine,
+    
+    tables: List[str],
+    rows: int,
+    months: int,
+    insert_samples: int,
+    read_samples: int,
+    keep: bool = False,
+) -> Dict[str, Any]:
+    random.seed(49)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    start, end = _month_start(now, months_ahead=-months + 1), now
+    
+    report: Dict[str, Any] = {"rows": rows, "months": months, "insert_samples": insert_samples, "read_samples": read_samples, "tables": {}}
+    try:
+        for name in tables:
+            report["tables"][name] = {}
+            for schema, partitioned in VARIANTS:
+                _create_table(engine=engine, name=name, schema=schema, partitioned=partitioned, start=start, end=_month_start(now, months_ahead=2))
+                fill_seconds = _fill_table(engine=engine, name=name, schema=schema, rows=rows, start=start, end=end)
+                result = _measure_table(
+                    engine=engine,
+                    name=name,
+                    schema=schema,
+                    rows=rows,
+                    insert_samples=insert_samples,
+                    read_samples=read_samples,
+                )
+                report["tables"][name]["partitioned" if partitioned else "plain"] = {"fill_seconds": round(fill_seconds, 1), **result}
+    finally:
+        if not keep:
+            with engine.begin() as connection:
+                for schema, _ in VARIANTS:
+                    connection.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE;"))
+    
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Вставка и чтение свежих записей: обычная таблица против помесячных партиций")
+    parser.add_argument("--dsn", default=None, help="URL SQLAlchemy (sync) стенда; по умолчанию - БД из конфигурации")
+    parser.add_argument("--rows", type=int, default=20_000_000, help="Строк в каждой таблице")
+    parser.add_argument("--months", type=int, default=24, help="За сколько месяцев распределены строки")
+    parser.add_argument("--insert-samples", type=int, default=1000)
+    parser.add_argument("--read-samples", type=int, default=50)
+    parser.add_argument("--table", action="append", choices=sorted(MODELS), default=None, help="По умолчанию - все три таблицы")
+    parser.add_argument("--output", default=None, help="Путь JSON-отчета")
+    parser.add_argument("--keep", action="store_true", help="Не удалять схемы замера")
+    args = parser.parse_args()
+    
+    engine: Engine = create_engine(args.dsn) if args.dsn else sync_engine_without_bouncer
+    report = run_benchmark(
+        engine=engine,
+        tables=args.table or sorted(MODELS),
+        rows=args.rows,
+        months=args.months,
+        insert_samples=args.insert_samples,
+        read_samples=args.read_samples,
+        keep=args.keep,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    
+    print(f'{report["rows"]} строк за {report["months"]} мес., p50 / p99, ms')
+    for name, variants in report["tables"].items():
+        for variant, result in variants.items():
+            print(f'{name:>13} {variant:>11}: заполнение {result["fill_seconds"]} s, {result["size_mb"]} MB')
+            for measure, latency in [("insert", result["insert"]), *result["reads"].items()]:
+                print(f'{"":>27}{measure:<20} {latency["p50_ms"]:>9.3f} / {latency["p99_ms"]:>9.3f}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import asyncio
+import datetime
+import logging
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config import ERRLOG_RETENTION_DAYS, MESSAGE_ARCHIVE_AFTER_DAYS, NOTIFICATION_ARCHIVE_AFTER_DAYS, PARTITION_PREMAKE_MONTHS
+from connection_module import async_engine
+from src.models.chat_models import Message
+from src.models.notification_models import Notification
+from src.models.reference_models import ErrLog
+
+
+PARTITION_MAINTENANCE_LOCK_ID = 740_100_049  # Ключ pg_advisory_xact_lock обслуживания партиций (и удаления строк из непартиционированных таблиц)
+ARCHIVE_SCHEMA = "archive"
+
+PARTITION_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+def _month_start(moment: datetime.datetime, months_ahead: int = 0) -> datetime.datetime:
+    month_index = moment.year * 12 + moment.month - 1 + months_ahead
+    return datetime.datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class PartitionMaintenance:
+    """
+    Помесячные партиции таблиц, которые только растут (postgresql_partition_by по created_at): при старте воркера и раз в сутки
+    создаются партиции на текущий и PARTITION_PREMAKE_MONTHS следующих месяцев, а партиции, целиком вышедшие за срок хранения,
+    удаляются (errlog) или отсоединяются в схему archive (message, notification) - данные остаются доступны для выгрузки.
+    Пока errlog не переведен на партиционирование (PARTITION_CONVERT_EXISTING), устаревшие строки удаляются из него пачками.
+    Обслуживание выполняет один воркер (advisory-блокировка транзакции); DROP/DETACH не ждут блокировку таблицы дольше lock_timeout.
+    Соединения - из пула async_engine (через pgbouncer): advisory-блокировка транзакции и SET LOCAL работают в transaction mode.
+    """
+    TABLES: List[Tuple[str, int, bool]] = [  # таблица, срок хранения в днях (0 - бессрочно), удалять ли партиции (иначе - в archive)
+        (Message.__tablename__, MESSAGE_ARCHIVE_AFTER_DAYS, False),
+        (Notification.__tablename__, NOTIFICATION_ARCHIVE_AFTER_DAYS, False),
+        (ErrLog.__tablename__, ERRLOG_RETENTION_DAYS, True),
+    ]
+    INTERVAL = 24 * 3600
+    DELETE_BATCH_SIZE = 10_000
+    
+    __task: Optional[asyncio.Task] = None
+    
+    @classmethod
+    async def start(cls) -> None:
+        """Первый проход - до приема запросов: без партиции текущего месяца вставка в таблицу невозможна."""
+        await cls.run(wait=True)
+        if cls.__task is None:
+            cls.__task = asyncio.create_task(cls.__loop())
+    
+    @classmethod
+    async def stop(cls) -> None:
+        if cls.__task is not None:
+            cls.__task.cancel()
+            await asyncio.gather(cls.__task, return_exceptions=True)
+            cls.__task = None
+    
+    @classmethod
+    async def run(cls, wait: bool = False) -> None:
+        """Один проход обслуживания. wait=False - если его уже выполняет другой воркер, проход пропускается."""
+        async with async_engine.begin() as connection:
+            if wait:
+                await connection.execute(select(func.pg_advisory_xact_lock(PARTITION_MAINTENANCE_LOCK_ID)))
+            elif not (await connection.execute(select(func.pg_try_advisory_xact_lock(PARTITION_MAINTENANCE_LOCK_ID)))).scalar():
+                return
+            await connection.execute(text("SET LOCAL TimeZone = 'UTC';"))  # Границы партиций в pg_get_expr - в UTC
+            await connection.execute(text("SET LOCAL lock_timeout = '5s';"))
+            
+            now = datetime.datetime.now(datetime.timezone.utc)
+            for table, retention_days, drop in cls.TABLES:
+                partitions = await cls.__get_partitions(connection=connection, table=table)
+                if partitions is None:  # Таблица еще не переведена на партиционирование (PARTITION_CONVERT_EXISTING) - см. delete_expired_rows
+                    continue
+                await cls.__create_partitions(connection=connection, table=table, partitions=partitions, now=now)
+                if retention_days:
+                    await cls.__remove_expired_partitions(
+                        connection=connection,
+                        table=table,
+                        partitions=partitions,
+                        expired_before=now - datetime.timedelta(days=retention_days),
+                        drop=drop,
+                    )
+    
+    @classmethod
+    async def delete_expired_rows(cls) -> int:
+        """
+        Срок хранения для таблиц, которые еще не переведены на партиционирование и партиции которых удаляются (errlog):
+        строки старше срока удаляются пачками по DELETE_BATCH_SIZE, каждая пачка - в своей транзакции (без долгих блокировок).
+        Если обслуживание выполняет другой воркер, удаление прекращается до следующего прохода. Возвращает число удаленных строк.
+        """
+        deleted = 0
+        for table, retention_days, drop in cls.TABLES:
+            if not drop or not retention_days:
+                continue
+            while True:
+                async with async_engine.begin() as connection:
+                    if not (await connection.execute(select(func.pg_try_advisory_xact_lock(PARTITION_MAINTENANCE_LOCK_ID)))).scalar():
+                        return deleted
+                    if await cls.__get_partitions(connection=connection, table=table) is not None:  # Партиции удаляет run
+                        break
+                    
+                    response = await connection.execute(
+                        text(
+                            f"DELETE FROM {table} WHERE id IN "
+                            f"(SELECT id FROM {table} WHERE created_at < :expired_before LIMIT :batch_size);"
+                        ),
+                        {
+                            "expired_before": datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=retention_days),
+                            "batch_size": cls.DELETE_BATCH_SIZE,
+                        },
+                    )
+                deleted += response.rowcount
+                if response.rowcount < cls.DELETE_BATCH_SIZE:
+                    break
+        return deleted
+    
+    @classmethod
+    async def __loop(cls) -> None:
+        """Удаление строк не задерживает старт воркера - первое выполняется уже в фоне."""
+        while True:
+            try:
+                await cls.delete_expired_rows()
+            except Exception as e:
+                logging.warning(f"Не удалось удалить устаревшие строки: {e}")
+            await asyncio.sleep(cls.INTERVAL)
+            try:
+                await cls.run()
+            except Exception as e:
+                logging.warning(f"Не удалось обслужить партиции таблиц: {e}")
+    
+    @staticmethod
+    async def __get_partitions(connection: AsyncConnection, table: str) -> Optional[List[Tuple[str, Optional[datetime.datetime]]]]:
+        """Партиции таблицы и их верхние границы (None - граница не дата). None вместо списка - таблица не партиционирована."""
+        relkind = (await connection.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table);"), {"table": table})).scalar()
+        if relkind != "p":
+            return None
+        
+        rows = (
+            await connection.execute(
+                text(
+                    """
+                    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = to_regclass(:table);
+                    """
+                ),
+                {"table": table},
+            )
+        ).all()
+        
+        partitions: List[Tuple[str, Optional[datetime.datetime]]] = []
+        for name, bound in rows:
+            match = PARTITION_UPPER_BOUND.search(bound or "")
+            partitions.append((name, datetime.datetime.fromisoformat(match.group(1)) if match else None))
+        return partitions
+    
+    @staticmethod
+    async def __create_partitions(
+        connection: AsyncConnection,
+        
+        table: str,
+        partitions: List[Tuple[str, Optional[datetime.datetime]]],
+        now: datetime.datetime,
+    ) -> None:
+        """Создает помесячные партиции от конца последней существующей (или от текущего месяца) до горизонта PARTITION_PREMAKE_MONTHS."""
+        lower_bound = max((upper_bound for _, upper_bound in partitions if upper_bound is not None), default=_month_start(now))
+        horizon = _month_start(now, months_ahead=PARTITION_PREMAKE_MONTHS + 1)
+        while lower_bound < horizon:
+            upper_bound = _month_start(lower_bound, months_ahead=1)
+            partition = f"{table}_p{lower_bound:%Y_%m}"
+            await connection.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{lower_bound.isoformat()}') TO ('{upper_bound.isoformat()}');"
+                )
+            )
+            logging.info(f"Создана партиция {partition}")
+            lower_bound = upper_bound
+    
+    @staticmethod
+    async def __remove_expired_partitions(
+        connection: AsyncConnection,
+        
+        table: str,
+        partitions: List[Tuple[str, Optional[datetime.datetime]]],
+        expired_before: datetime.datetime,
+        drop: bool,
+    ) -> None:
+        for partition, upper_bound in partitions:
+            if upper_bound is None or upper_bound > expired_before:
+                continue
+            try:
+                async with connection.begin_nested():  # Не получили блокировку - остальное обслуживание не откатывается
+                    if drop:
+                        await connection.execute(text(f"DROP TABLE {partition};"))
+                    else:
+                        await connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition};"))
+                        await connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA};"))
+                        await connection.execute(text(f"ALTER TABLE {partition} SET SCHEMA {ARCHIVE_SCHEMA};"))
+            except DBAPIError as e:
+                logging.warning(f"Не удалось {'удалить' if drop else 'отсоединить'} партицию {partition}: {e}")
+                continue
+            logging.info(f"Партиция {partition} {'удалена' if drop else f'перенесена в схему {ARCHIVE_SCHEMA}'}")
@@ -0,0 +1,52 @@
+import gzip
+import hashlib
+import json
+from typing import Any, Dict
+
+from fastapi import Request, Response, status
+
+from config import REFERENCE_CACHE_MAX_AGE
+
+
+class PreparedJSONResponse:
+    """
+    Ответ с неизменным содержимым (справочники из кода): JSON сериализуется и сжимается gzip один раз - при импорте модуля роутера.
+    Запрос получает готовые байты со строгим ETag и Cache-Control, а при совпадающем If-None-Match - 304 без тела.
+    У сжатого и несжатого представлений разные ETag (разные байты), повторная проверка подходит для любого из них.
+    """
+    
+    def __init__(self, content: Any, gzip_min_size: int = 500) -> None:
+        self.body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0) if len(self.body) >= gzip_min_size else None
+        self.gzip_etag = f'"{digest}-gzip"'
+    
+    def for_request(self, request: Request) -> Response:
+        use_gzip = self.gzip_body is not None and _accepts_gzip(request.headers.get("accept-encoding", ""))
+        etag = self.gzip_etag if use_gzip else self.etag
+        headers: Dict[str, str] = {
+            "ETag": etag,
+            "Cache-Control": f"private, max-age={REFERENCE_CACHE_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}  # Для GET сравнение ETag слабое (RFC 9110)
+            if "*" in tags or self.etag in tags or self.gzip_etag in tags:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type="application/json", headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.partition(";")
+        if name.strip() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
@@ -1,9 +1,118 @@
-from typing import Any, List, Tuple
+import datetime
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import text, Table
+from sqlalchemy import func, literal, select, text, union_all, Table
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.schema import CreateIndex, CreateTable
 
-from connection_module import sync_session_maker
+from config import BUILD_MISSING_INDEXES, PARTITION_CONVERT_EXISTING
+from connection_module import Base, sync_engine_without_bouncer, sync_session_maker
+from src.models.application.application_models import ApplicationStatus, ApplicationType
+from src.models.application.mt_models import MTApplicationType
+from src.models.chat_models import ChatSubject
+from src.models.commercial_proposal_models import CommercialProposalStatus, CommercialProposalType
+from src.models.counterparty.counterparty_models import CounterpartyType
+from src.models.file_store_models import DirectoryType
+from src.models.notification_models import NotificationSubject
+from src.models.reference_models import Country, Currency, SchemaVersion, ServiceNoteSubject
+from src.models.user_models import UserPrivilege
+from src.utils.reference_mapping_data.app.app_mapping_data import COUNTRY_MAPPING, CURRENCY_MAPPING
+from src.utils.reference_mapping_data.application.application.mt_mapping import MT_APPLICATION_TYPE_MAPPING
+from src.utils.reference_mapping_data.application.mapping import APPLICATION_STATUS_MAPPING, APPLICATION_TYPE_MAPPING
+from src.utils.reference_mapping_data.chat.mapping import CHAT_SUBJECT_MAPPING
+from src.utils.reference_mapping_data.commercial_proposal.mapping import COMMERCIAL_PROPOSAL_STATUS_MAPPING, COMMERCIAL_PROPOSAL_TYPE_MAPPING
+from src.utils.reference_mapping_data.counterparty.mapping import COUNTERPARTY_TYPE_MAPPING
+from src.utils.reference_mapping_data.file_store.mapping import DIRECTORY_TYPE_MAPPING
+from src.utils.reference_mapping_data.notification.mapping import NOTIFICATION_SUBJECT_MAPPING
+from src.utils.reference_mapping_data.registry import ReferenceMap
+from src.utils.reference_mapping_data.user.mapping import PRIVILEGE_MAPPING, SERVICE_NOTE_SUBJECT_MAPPING
+
+
+SCHEMA_PREPARATION_VERSION = 2  # Увеличить при изменении логики подготовки БД, не отраженной в моделях (функции, заполнение новых таблиц)
+SCHEMA_PREPARATION_LOCK_ID = 740_100_037  # Ключ pg_advisory_lock подготовки БД
+
+# Справочные отображения и колонки таблиц, из которых они обновляются (имя -> id)
+REFERENCE_MAP_SOURCES: List[Tuple[ReferenceMap, Any, Any]] = [
+    (PRIVILEGE_MAPPING, UserPrivilege.name, UserPrivilege.id),
+    (DIRECTORY_TYPE_MAPPING, DirectoryType.name, DirectoryType.id),
+    (COUNTRY_MAPPING, Country.name_en_snake, Country.id),
+    (CURRENCY_MAPPING, Currency.letter_code, Currency.id),
+    (CHAT_SUBJECT_MAPPING, ChatSubject.name, ChatSubject.id),
+    (NOTIFICATION_SUBJECT_MAPPING, NotificationSubject.name, NotificationSubject.id),
+    (COUNTERPARTY_TYPE_MAPPING, CounterpartyType.name, CounterpartyType.id),
+    (APPLICATION_TYPE_MAPPING, ApplicationType.name, ApplicationType.id),
+    (APPLICATION_STATUS_MAPPING, ApplicationStatus.name, ApplicationStatus.id),
+    (MT_APPLICATION_TYPE_MAPPING, MTApplicationType.name, MTApplicationType.id),
+    (COMMERCIAL_PROPOSAL_TYPE_MAPPING, CommercialProposalType.name, CommercialProposalType.id),
+    (COMMERCIAL_PROPOSAL_STATUS_MAPPING, CommercialProposalStatus.name, CommercialProposalStatus.id),
+    (SERVICE_NOTE_SUBJECT_MAPPING, ServiceNoteSubject.name, ServiceNoteSubject.id),
+]
+
+
+def compute_schema_version(references: List[Tuple[Table, List[Tuple[Any]]]]) -> str:
+    """
+    Отпечаток схемы (DDL всех моделей и индексов) и справочников. Метки времени в справочниках не учитываются.
+    Включение PARTITION_CONVERT_EXISTING или BUILD_MISSING_INDEXES меняет отпечаток - отложенная работа выполнится при следующем старте.
+    """
+    dialect = postgresql.dialect()
+    digest = hashlib.sha256(f"{SCHEMA_PREPARATION_VERSION}:{int(PARTITION_CONVERT_EXISTING)}:{int(BUILD_MISSING_INDEXES)}".encode())
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    for table, reference_data in references:
+        digest.update(table.__tablename__.encode())
+        for row in reference_data:
+            digest.update(repr(tuple(None if isinstance(value, datetime.datetime) else value for value in row)).encode())
+    
+    return digest.hexdigest()
+
+
+def get_schema_version() -> Optional[str]:
+    """Версия, с которой БД была подготовлена в последний раз (одним запросом). None - БД еще не готовилась."""
+    with sync_engine_without_bouncer.connect() as connection:
+        try:
+            return connection.execute(text("SELECT version FROM schema_version WHERE id = 1;")).scalar()
+        except ProgrammingError:  # Таблицы еще нет
+            return None
+
+
+def set_schema_version(version: str) -> None:
+    with sync_session_maker() as session:
+        stmt = (
+            insert(SchemaVersion)
+            .values(id=1, version=version)
+            .on_conflict_do_update(
+                index_elements=[SchemaVersion.id],
+                set_={"version": version, "applied_at": func.timezone('UTC', func.current_timestamp())},
+            )
+        )
+        session.execute(stmt)
+        session.commit()
+
+
+@contextmanager
+def schema_preparation_lock() -> Iterator[None]:
+    """
+    Сессионная advisory-блокировка (соединение без pgbouncer): подготовку БД выполняет только один воркер, остальные ждут.
+    Ожидание - опросом pg_try_advisory_lock: ждущий воркер не держит открытый снимок, которого дожидался бы CREATE INDEX CONCURRENTLY.
+    """
+    with sync_engine_without_bouncer.connect() as connection:
+        while not connection.execute(text("SELECT pg_try_advisory_lock(:lock_id);"), {"lock_id": SCHEMA_PREPARATION_LOCK_ID}).scalar():
+            connection.commit()
+            time.sleep(1)
+        connection.commit()
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:lock_id);"), {"lock_id": SCHEMA_PREPARATION_LOCK_ID})
+            connection.commit()
 
 
 def prepare_reference(table: Table, reference_data: List[Tuple[Any]], first_iteration: bool):
@@ -45,3 +154,255 @@ def prepare_reference(table: Table, reference_data: List[Tuple[Any]], first_iter
                 )
             )
             session.commit()
+
+
+def refresh_reference_maps() -> None:
+    """
+    Синхронизирует справочные отображения (REFERENCE_MAP_SOURCES) с таблицами справочников одним запросом:
+    строки, добавленные в БД после сборки приложения, становятся доступны без перезапуска кода.
+    Расхождения с отображениями из кода пишутся в журнал и не применяются.
+    """
+    stmt = union_all(
+        *[
+            select(literal(idx).label("source"), key_column.label("name"), id_column.label("id"))
+            for idx, (_, key_column, id_column) in enumerate(REFERENCE_MAP_SOURCES)
+        ]
+    )
+    with sync_session_maker() as session:
+        rows = session.execute(stmt).all()
+    
+    rows_by_source: Dict[int, Dict[str, int]] = {}
+    for source, name, id in rows:
+        rows_by_source.setdefault(source, {})[name] = id
+    
+    for idx, (reference_map, key_column, _) in enumerate(REFERENCE_MAP_SOURCES):
+        for discrepancy in reference_map.refresh(rows_by_source.get(idx, {})):
+            logging.warning(f"Справочник {key_column.class_.__tablename__}: {discrepancy}")
+
+
+def prepare_indexes(tables: List[Table]):
+    """
+    Создает индексы, добавленные в модели уже существующих таблиц (create_all создает индексы только вместе с новой таблицей).
+    Сборка - CREATE INDEX CONCURRENTLY вне транзакции (запись в таблицу не блокируется) и только при BUILD_MISSING_INDEXES=1,
+    иначе недостающие индексы перечисляются в логе. Невалидный остаток прерванной сборки удаляется и строится заново.
+    """
+    dialect = postgresql.dialect()
+    missing_indexes: List[str] = []
+    with sync_engine_without_bouncer.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for table in tables:
+            for index in table.__table__.indexes:
+                is_valid = connection.execute(
+                    text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name);"), {"name": index.name}
+                ).scalar()
+                if is_valid:
+                    continue
+                if not BUILD_MISSING_INDEXES:
+                    missing_indexes.append(index.name)
+                    continue
+                
+                if is_valid is False:
+                    connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}";'))
+                started_at = time.perf_counter()
+                connection.execute(text(str(CreateIndex(index).compile(dialect=dialect)).replace(" INDEX ", " INDEX CONCURRENTLY ", 1)))
+                logging.info(f"Индекс {index.name} построен за {time.perf_counter() - started_at:.1f} с")
+    
+    if missing_indexes:
+        logging.warning(f"Нет индексов {', '.join(missing_indexes)}: они будут построены (CONCURRENTLY) при старте с BUILD_MISSING_INDEXES=1")
+
+
+def prepare_partitioned_tables(tables: List[Table]):
+    """
+    Переводит на партиционирование уже существующие обычные таблицы моделей с postgresql_partition_by (create_all их не меняет).
+    Старая таблица целиком становится партицией <имя>_legacy (от MINVALUE до начала месяца после последней записи),
+    значения id продолжают прежнюю последовательность. Вызывается до create_all; каждая таблица - одной транзакцией.
+    Партиции следующих месяцев создает PartitionMaintenance.
+    Перевод переписывает рабочие таблицы, поэтому выполняется только при PARTITION_CONVERT_EXISTING=1 (иначе таблица остается обычной).
+    """
+    for table in tables:
+        name = table.__tablename__
+        legacy = f"{name}_legacy"
+        with sync_engine_without_bouncer.begin() as connection:
+            relkind = connection.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name);"), {"name": name}).scalar()
+            if relkind != "r":  # Таблицы еще нет (ее создаст create_all) или она уже партиционирована
+                continue
+            if not PARTITION_CONVERT_EXISTING:
+                logging.warning(f"Таблица {name} не партиционирована: перевод выполнится при старте с PARTITION_CONVERT_EXISTING=1")
+                continue
+            
+            # Первичный ключ партиции должен совпадать с ключом партиционированной таблицы - (id, created_at)
+            primary_key = connection.execute(
+                text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name) AND contype = 'p';"), {"name": name}
+            ).scalar()
+            connection.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{primary_key}", ADD PRIMARY KEY (id, created_at);'))
+            
+            # Имена индексов и последовательности освобождаются для новой таблицы
+            index_names = connection.execute(
+                text("SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE i.indrelid = to_regclass(:name);"),
+                {"name": name},
+            ).scalars().all()
+            for index_name in index_names:
+                connection.execute(text(f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_legacy";'))
+            sequence_name = connection.execute(text("SELECT pg_get_serial_sequence(:name, 'id');"), {"name": name}).scalar()
+            connection.execute(text(f"DROP TRIGGER IF EXISTS notification_uuid_registry ON {name};"))  # Триггер реестра uuid prepare_notification_uuid_registry создаст на новой таблице (и ее партициях)
+            connection.execute(text(f"ALTER TABLE {name} RENAME TO {legacy};"))
+            connection.execute(text(f"ALTER SEQUENCE {sequence_name} RENAME TO {legacy}_id_seq;"))
+            
+            table.__table__.create(bind=connection)
+            
+            connection.execute(text(f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), last_value, is_called) FROM {legacy}_id_seq;"))
+            connection.execute(text(f"ALTER TABLE {legacy} ALTER COLUMN id DROP DEFAULT;"))
+            connection.execute(text(f"DROP SEQUENCE {legacy}_id_seq;"))
+            
+            upper_bound = connection.execute(
+                text(
+                    f"""
+                    SELECT greatest(
+                        date_trunc('month', now() AT TIME ZONE 'UTC'),
+                        date_trunc('month', max(created_at) AT TIME ZONE 'UTC')
+                    ) + interval '1 month'
+                    FROM {legacy};
+                    """
+                )
+            ).scalar()
+            connection.execute(
+                text(f"ALTER TABLE {name} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{upper_bound.isoformat()}+00:00');")
+            )
+            logging.info(f"Таблица {name} переведена на партиционирование, прежние записи - в партиции {legacy} (до {upper_bound:%Y-%m-%d})")
+
+
+def prepare_notification_uuid_registry():
+    """
+    Триггер, который ведет реестр notification_uuid: вставка уведомления с уже занятым uuid падает на первичном ключе реестра
+    (в любой партиции). Реестр заполняется uuid уже существующих уведомлений, если он еще пуст.
+    Триггер создается до заполнения в той же транзакции - вставки других воркеров ждут ее завершения.
+    """
+    with sync_engine_without_bouncer.begin() as connection:
+        connection.execute(
+            text(
+                """
+                CREATE OR REPLACE FUNCTION register_notification_uuid()
+                RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                        DELETE FROM notification_uuid WHERE uuid = OLD.uuid;
+                    END IF;
+                    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                        INSERT INTO notification_uuid (uuid) VALUES (NEW.uuid);
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+                """
+            )
+        )
+        connection.execute(text("DROP TRIGGER IF EXISTS notification_uuid_registry ON notification;"))
+        connection.execute(
+            text(
+                """
+                CREATE TRIGGER notification_uuid_registry
+                AFTER INSERT OR DELETE OR UPDATE OF uuid ON notification
+                FOR EACH ROW EXECUTE FUNCTION register_notification_uuid();
+                """
+            )
+        )
+        connection.execute(
+            text(
+                """
+                INSERT INTO notification_uuid (uuid)
+                SELECT uuid FROM notification
+                WHERE NOT EXISTS (SELECT 1 FROM notification_uuid)
+                ON CONFLICT DO NOTHING;
+                """
+            )
+        )
+
+
+def prepare_directory_closure():
+    """Заполняет таблицу замыкания директорий для записей, созданных до ее появления (или добавленных минуя create_dir_info)."""
+    with sync_session_maker() as session:
+        has_missing_rows = session.execute(
+            text(
+                """
+                SELECT EXISTS (
+                    SELECT 1
+                    FROM directory d
+                    LEFT JOIN directory_closure c ON c.ancestor_id = d.id AND c.descendant_id = d.id
+                    WHERE c.ancestor_id IS NULL
+                );
+                """
+            )
+        ).scalar()
+        if not has_missing_rows:
+            return
+        
+        session.execute(
+            text(
+                """
+                INSERT INTO directory_closure (ancestor_id, descendant_id, depth)
+                WITH RECURSIVE tree AS (
+                    SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+                    FROM directory
+                    UNION ALL
+                    SELECT tree.ancestor_id, d.id, tree.depth + 1
+                    FROM tree
+                    JOIN directory d ON d.parent = tree.descendant_id
+                )
+                SELECT ancestor_id, descendant_id, depth FROM tree
+                ON CONFLICT DO NOTHING;
+                """
+            )
+        )
+        session.commit()
+
+
+def prepare_storage_usage():
+    """Первичный расчет счетчиков занятого места по уже существующим документам (если счетчики еще не заполнялись)."""
+    with sync_session_maker() as session:
+        is_empty = session.execute(
+            text(
+                """
+                SELECT NOT EXISTS (SELECT 1 FROM directory_usage)
+                    AND NOT EXISTS (SELECT 1 FROM user_storage_usage)
+                    AND EXISTS (SELECT 1 FROM document WHERE is_deleted IS NOT TRUE);
+                """
+            )
+        ).scalar()
+        if not is_empty:
+            return
+        
+        session.execute(
+            text(
+                """
+                INSERT INTO directory_usage (directory_id, documents_count, size, visible_documents_count, visible_size)
+                SELECT
+                    c.ancestor_id,
+                    count(d.id),
+                    coalesce(sum(d.size), 0),
+                    count(d.id) FILTER (WHERE d.visible IS TRUE),
+                    coalesce(sum(d.size) FILTER (WHERE d.visible IS TRUE), 0)
+                FROM document d
+                JOIN directory_closure c ON c.descendant_id = d.directory_id
+                WHERE d.is_deleted IS NOT TRUE
+                GROUP BY c.ancestor_id
+                ON CONFLICT DO NOTHING;
+                """
+            )
+        )
+        session.execute(
+            text(
+                """
+                INSERT INTO user_storage_usage (user_uuid, documents_count, size, visible_documents_count, visible_size)
+                SELECT
+                    coalesce(d.owner_user_uuid, d.uploader_user_uuid),
+                    count(d.id),
+                    coalesce(sum(d.size), 0),
+                    count(d.id) FILTER (WHERE d.visible IS TRUE),
+                    coalesce(sum(d.size) FILTER (WHERE d.visible IS TRUE), 0)
+                FROM document d
+                WHERE d.is_deleted IS NOT TRUE
+                GROUP BY coalesce(d.owner_user_uuid, d.uploader_user_uuid)
+                ON CONFLICT DO NOTHING;
+                """
+            )
+        )
+        session.commit()
@@ -1,7 +1,9 @@
 from typing import Dict, List
 
+from src.utils.reference_mapping_data.registry import ReferenceMap
+
 # ______________________________________________________________________
-COUNTRY_MAPPING: Dict[str, int] = {
+COUNTRY_MAPPING: ReferenceMap = ReferenceMap({
     "Australia": 1,
     "Austria": 2,
     "Azerbaijan": 3,
@@ -250,7 +252,7 @@ COUNTRY_MAPPING: Dict[str, int] = {
     "South_Korea": 246,
     "Jamaica": 247,
     "Japan": 248,
-}
+})
 
 COUNTRY_FOR_KEYS: List[int] = list(range(1, 249))
 
@@ -507,7 +509,7 @@ COUNTRY_MAPPING_RUSSIA: Dict[str, str] = {
 # ______________________________________________________________________
 
 # ______________________________________________________________________
-CURRENCY_MAPPING: Dict[str, int] = {
+CURRENCY_MAPPING: ReferenceMap = ReferenceMap({
     "AUD": 1,
     "EUR": 2,
     "AZN": 3,
@@ -676,59 +678,59 @@ CURRENCY_MAPPING: Dict[str, int] = {
     "JMD": 166,
     "JPY": 167,
     "BYN": 168,
-}
+})
 
 CURRENCY_FOR_KEYS: List[int] = list(range(1, 169))
 # ______________________________________________________________________
 
 # ______________________________________________________________________
-ORGANIZATIONAL_LEGAL_FORM_MAPPING: Dict[str, int] = {
+ORGANIZATIONAL_LEGAL_FORM_MAPPING: ReferenceMap = ReferenceMap({
     "Общество с ограниченной ответственностью": 1,
     "Акционерное общество": 2,
     "Индивидуальный предприниматель": 3,
     "Частное лицо": 4,
-}
+})
 
 ORGANIZATIONAL_LEGAL_FORM_FOR_KEYS: List[int] = list(range(1, 5))
 # ______________________________________________________________________
 
 # ______________________________________________________________________
-BANK_DETAIL_TYPE_MAPPING: Dict[str, int] = {
+BANK_DETAIL_TYPE_MAPPING: ReferenceMap = ReferenceMap({
     "Отправитель": 1,
     "Получатель": 2,
     "Корреспондент": 3,
-}
+})
 
 BANK_DETAIL_TYPE_FOR_KEYS: List[int] = list(range(1, 4))
 # ______________________________________________________________________
 
 # ______________________________________________________________________
-APPLICATION_STATUS_MT_MAPPING: Dict[str, int] = {
+APPLICATION_STATUS_MT_MAPPING: ReferenceMap = ReferenceMap({
     "Запрошен": 1,
     "Создан заказ": 2,
     "Заказ подтвержден": 3,
     "Выполнен": 4,
     "Отмена": 5,
-}
+})
 
 APPLICATION_STATUS_MT_FOR_KEYS: List[int] = list(range(1, 7))
 # ______________________________________________________________________
 
 # ______________________________________________________________________
-ROLE_UNDER_CONTRACT_MAPPING: Dict[str, int] = {
+ROLE_UNDER_CONTRACT_MAPPING: ReferenceMap = ReferenceMap({
     "Подписант": 1,
     "Администратор контракта": 2,
     "Финансовый специалист": 3,
-}
+})
 
 ROLE_UNDER_CONTRACT_FOR_KEYS: List[int] = list(range(1, 4))
 # ______________________________________________________________________
 
 # ______________________________________________________________________
-BASIC_ACTION_SIGNATORY_MAPPING: Dict[str, int] = {
+BASIC_ACTION_SIGNATORY_MAPPING: ReferenceMap = ReferenceMap({
     "Устав": 1,
     "Доверенность": 2,
-}
+})
 
 BASIC_ACTION_SIGNATORY_FOR_KEYS: List[int] = list(range(1, 3))
 # ______________________________________________________________________
@@ -1,8 +1,10 @@
 # ______________________________________________________________________
-from typing import Dict, List
+from typing import List
 
+from src.utils.reference_mapping_data.registry import ReferenceMap
 
-MT_APPLICATION_TYPE_MAPPING: Dict[str, int] = {
+
+MT_APPLICATION_TYPE_MAPPING: ReferenceMap = ReferenceMap({
     "ПР1.1": 1,
     "ПР1.2": 2,
     "ПР1.3": 3,
@@ -12,7 +14,7 @@ MT_APPLICATION_TYPE_MAPPING: Dict[str, int] = {
     "ПР2.2": 7,
     "ПР3.1": 8,
     "ПР3.2": 9,
-}
+})
 
 MT_APPLICATION_TYPE_FOR_KEYS: List[int] = list(range(1, 10))
 # ______________________________________________________________________
@@ -1,8 +1,10 @@
-from typing import Dict, List
+from typing import List
+
+from src.utils.reference_mapping_data.registry import ReferenceMap
 
 
 # ______________________________________________________________________
-APPLICATION_STATUS_MAPPING: Dict[str, int] = {  # TODO нужно проговорить все виды статусов с Юрием(что еще добавить, что убрать?)
+APPLICATION_STATUS_MAPPING: ReferenceMap = ReferenceMap({  # TODO нужно проговорить все виды статусов с Юрием(что еще добавить, что убрать?)
     "Запрошен": 1,
     "В работе": 2,
     "Отклонено": 3,
@@ -10,15 +12,15 @@ APPLICATION_STATUS_MAPPING: Dict[str, int] = {  # TODO нужно прогово
     "В очереди": 5,
     "Завершен успешно": 6,
     "Завершен неуспешно": 7,
-}
+})
 
 APPLICATION_STATUS_FOR_KEYS: List[int] = list(range(1, 8))
 # ______________________________________________________________________
 
 # ______________________________________________________________________
-APPLICATION_TYPE_MAPPING: Dict[str, int] = {  # TODO ДОРАБОТАТЬ С ЧЕЛОВЕКОМ ОТ Starting pgAdmin 4...
+APPLICATION_TYPE_MAPPING: ReferenceMap = ReferenceMap({  # TODO ДОРАБОТАТЬ С ЧЕЛОВЕКОМ ОТ Starting pgAdmin 4...
     "MT": 1,
-}
+})
 
 APPLICATION_TYPE_FOR_KEYS: List[int] = list(range(1, 2))  # TODO ДОРАБОТАТЬ С ЧЕЛОВЕКОМ ОТ БИЗНЕСА
 # ______________________________________________________________________
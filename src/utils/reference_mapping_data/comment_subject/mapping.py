@@ -1,8 +1,8 @@
-from typing import Dict
+from src.utils.reference_mapping_data.registry import ReferenceMap
 
 
-COMMENT_SUBJECT_MAPPING: Dict[str, int] = {
+COMMENT_SUBJECT_MAPPING: ReferenceMap = ReferenceMap({
     "Заявка": 1,
     "Контрагент": 2,
     "Заявка на КП": 3,
-}
+})
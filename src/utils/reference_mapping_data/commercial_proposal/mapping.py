@@ -1,14 +1,14 @@
-from typing import Dict
+from src.utils.reference_mapping_data.registry import ReferenceMap
 
 
-COMMERCIAL_PROPOSAL_TYPE_MAPPING: Dict[str, int] = {
+COMMERCIAL_PROPOSAL_TYPE_MAPPING: ReferenceMap = ReferenceMap({
     "MT": 1,
     # TODO
-}
+})
 # (, Согласовано, Отклонено, Закрыто администратором(не дает Пользователю делать update)) - Админ
-COMMERCIAL_PROPOSAL_STATUS_MAPPING: Dict[str, int] = {
+COMMERCIAL_PROPOSAL_STATUS_MAPPING: ReferenceMap = ReferenceMap({
     "На рассмотрении сторон": 1,
     "Согласовано": 2,
     "Отклонено": 3,
     "Закрыто администратором": 4,
-}
+})
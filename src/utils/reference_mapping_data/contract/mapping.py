@@ -1,7 +1,7 @@
-from typing import Dict
+from src.utils.reference_mapping_data.registry import ReferenceMap
 
 
-CONTRACT_TYPE_MAPPING: Dict[str, int] = {
+CONTRACT_TYPE_MAPPING: ReferenceMap = ReferenceMap({
     "MT": 1,
     # TODO
-}
+})
@@ -1,12 +1,14 @@
-from typing import Dict, Literal
+from typing import Literal
+
+from src.utils.reference_mapping_data.registry import ReferenceMap
 
 
 PersonGender: type = Literal["m", "w"]
 
-COUNTERPARTY_TYPE_MAPPING: Dict[str, int] = {
+COUNTERPARTY_TYPE_MAPPING: ReferenceMap = ReferenceMap({
     "ЮЛ": 1,
     "ФЛ": 2,
-}
+})
 
 # ______________________________________________________________________
 # BANK_PAYMENT_DETAILS_TYPE_MAPPING: Dict[str, int] = {
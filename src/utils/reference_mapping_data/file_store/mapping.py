@@ -1,20 +1,22 @@
-from typing import Dict, List
+from typing import List
+
+from src.utils.reference_mapping_data.registry import ReferenceMap
 
 
 # ______________________________________________________________________
-DIRECTORY_TYPE_MAPPING: Dict[str, int] = {
+DIRECTORY_TYPE_MAPPING: ReferenceMap = ReferenceMap({
     "Пользовательская директория": 1,
     "Директория контрагента": 2,  # FIXME надо поменять в БД
     "Директория заявки": 3,
     "Директория заявки на КП": 4,
     "Директория карточки договора": 5,
-}
+})
 
 DIRECTORY_TYPE_FOR_KEYS:  List[int] = list(range(1, 4))
 # ______________________________________________________________________
 
-FILE_STORE_SUBJECT_MAPPING: Dict[str, int] = {
+FILE_STORE_SUBJECT_MAPPING: ReferenceMap = ReferenceMap({
     "Заявка": 1,
     "Контрагент": 2,  # FIXME надо поменять в БД
     "Заявка на КП": 3,  # FIXME надо поменять в БД
-}
+})
@@ -1,9 +1,9 @@
-from typing import Dict
+from src.utils.reference_mapping_data.registry import ReferenceMap
 
 
-NOTIFICATION_SUBJECT_MAPPING: Dict[str, int] = {
+NOTIFICATION_SUBJECT_MAPPING: ReferenceMap = ReferenceMap({
     "Заявка": 1,
     "Контрагент": 2,
     "Заявка на КП": 3,
     "Прочее": 4,
-}
+})
@@ -0,0 +1,65 @@
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NoReturn, Optional
+
+
+class ReferenceMap(dict):
+    """
+    Неизменяемое отображение справочника "имя -> id" с заранее построенным обратным отображением "id -> имя".
+    Строится один раз при импорте модуля справочника - обратный поиск (.reverse / .name_of) выполняется за O(1),
+    без перестроения словаря на каждый запрос. Остается dict-ом (Literal[tuple(...)], in, [] работают как раньше).
+    Изменить содержимое можно только через refresh (синхронизация с таблицей справочника в БД).
+    """
+    __slots__ = ("__reverse",)
+    
+    def __init__(self, forward: Mapping[str, int]) -> None:
+        super().__init__(forward)
+        self.__rebuild_reverse()
+    
+    @property
+    def reverse(self) -> Mapping[int, str]:
+        return self.__reverse
+    
+    def name_of(self, id: Optional[int]) -> Optional[str]:
+        """Имя по id. None - для пустого id (необязательные поля)."""
+        return self.__reverse[id] if id is not None else None
+    
+    def refresh(self, rows: Mapping[str, int]) -> List[str]:
+        """
+        Дополняет отображение строками таблицы справочника ("имя -> id").
+        Значения, уже известные коду, не переопределяются (на них ссылаются схемы и бизнес-логика):
+        расхождения имени или id с БД возвращаются списком описаний для журнала.
+        """
+        merged: Dict[str, int] = dict(self)
+        discrepancies: List[str] = []
+        for name, id in rows.items():
+            if name in merged:
+                if merged[name] != id:
+                    discrepancies.append(f'"{name}": в коде id={merged[name]}, в БД id={id}')
+            elif id in self.__reverse:
+                discrepancies.append(f'id={id}: в коде "{self.__reverse[id]}", в БД "{name}"')
+            else:
+                merged[name] = id
+        
+        if len(merged) != len(self):
+            dict.update(self, merged)
+            self.__rebuild_reverse()
+        
+        return discrepancies
+    
+    def __rebuild_reverse(self) -> None:
+        self.__reverse = MappingProxyType({id: name for name, id in self.items()})
+    
+    def __readonly(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError("Справочное отображение доступно только для чтения (используйте refresh)")
+    
+    __setitem__ = __delitem__ = __ior__ = __readonly
+    clear = pop = popitem = setdefault = update = __readonly
+    
+    def __reduce__(self):
+        return (ReferenceMap, (dict(self),))
+    
+    def __copy__(self) -> "ReferenceMap":
+        return self
+    
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ReferenceMap":
+        return self
@@ -1,16 +1,16 @@
-from typing import Dict
+from src.utils.reference_mapping_data.registry import ReferenceMap
 
 
-PRIVILEGE_MAPPING: Dict[str, int] = {
+PRIVILEGE_MAPPING: ReferenceMap = ReferenceMap({
     "Admin": 1,
     "Сounterparty": 2,
     "Client": 3,
-}
+})
 
-SERVICE_NOTE_SUBJECT_MAPPING: Dict[str, int] = {
+SERVICE_NOTE_SUBJECT_MAPPING: ReferenceMap = ReferenceMap({
     "Заявка": 1,
     "Контрагент": 2,
     "Документ": 3,
     "Пользователь": 4,
     "Заявка на КП": 5,
-}
+})
@@ -0,0 +1,201 @@
+"""
+Замер получения пользователя и состояния клиента в эндпоинтах списков (in-process, БД и Redis - заглушки с задержкой сети):
+прежний путь (отдельная сессия для get_current_user_data + новый пул Redis на каждое чтение состояния) против get_request_context
+(запрос в сессии эндпоинта + конвейер на общем пуле) и get_request_context с client_state из тела запроса (без Redis).
+
+Запуск: python -m src.utils.request_context_benchmark [--requests 2000] [--concurrency 50] [--db-rtt-ms 0.5] [--redis-rtt-ms 0.3]
+    [--output request_context_benchmark.json]
+Задержки заглушек - время на одну сетевую операцию (запрос к БД, выдача соединения пулом, команда или конвейер Redis,
+подключение нового пула Redis). Код security.py и UserQueryAndStatementManager выполняется настоящий.
+"""
+import argparse
+import asyncio
+import json
+import time
+import types
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from connection_module import RedisConnector
+from security import get_request_context
+from src.query_and_statement import user_qas_manager
+from src.query_and_statement.user_qas_manager import UserQueryAndStatementManager
+from src.schemas.user_schema import ClientState
+from src.utils.benchmark_stats import latency_summary
+
+
+TOKEN = "request-context-benchmark"
+CLIENT_STATE_JSON = json.dumps({"tz": "Moscow"}).encode()
+
+
+class _Network:
+    """Задержки заглушек и счетчики обращений."""
+    def __init__(self, db_rtt: float, redis_rtt: float) -> None:
+        self.db_rtt, self.redis_rtt = db_rtt, redis_rtt
+        self.calls: Dict[str, int] = {}
+    
+    async def db(self, operation: str) -> None:
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        await asyncio.sleep(self.db_rtt)
+    
+    async def redis(self, operation: str) -> None:
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        await asyncio.sleep(self.redis_rtt)
+
+
+class _FakeResult:
+    def one_or_none(self) -> Any:
+        token = types.SimpleNamespace(is_active=True)
+        user = types.SimpleNamespace(is_active=True, id=1, uuid="user-uuid")
+        return (token, user, 1, "user-dir-uuid")
+
+
+class _FakeSession:
+    def __init__(self, network: _Network) -> None:
+        self.network = network
+    
+    async def __aenter__(self) -> "_FakeSession":
+        await self.network.db("db_checkout")
+        return self
+    
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+    
+    async def execute(self, *args: Any, **kwargs: Any) -> _FakeResult:
+        await self.network.db("db_query")
+        return _FakeResult()
+    
+    async def release_connection(self) -> None:
+        pass
+
+
+class _FakePipeline:
+    def __init__(self, network: _Network) -> None:
+        self.network = network
+    
+    def get(self, key: str) -> None:
+        pass
+    
+    def ttl(self, key: str) -> None:
+        pass
+    
+    async def execute(self) -> List[Any]:
+        await self.network.redis("redis_pipeline")
+        return [CLIENT_STATE_JSON, -1]
+
+
+class _FakeRedis:
+    def __init__(self, network: _Network) -> None:
+        self.network = network
+    
+    def pipeline(self) -> _FakePipeline:
+        return _FakePipeline(self.network)
+    
+    def close(self) -> None:
+        pass
+    
+    async def wait_closed(self) -> None:
+        await self.network.redis("redis_pool_close")
+
+
+async def _old_path(network: _Network) -> ClientState:
+    """Как до RequestContext: get_current_user_data в своей сессии, затем новый пул Redis на чтение состояния."""
+    user_data = await UserQueryAndStatementManager.get_current_user_data(token=TOKEN)
+    await network.redis("redis_pool_connect")
+    redis = _FakeRedis(network)
+    try:
+        pipe = redis.pipeline()
+        pipe.get(user_data.user_uuid)
+        pipe.ttl(user_data.user_uuid)
+        data, ttl = await pipe.execute()
+    finally:
+        redis.close()
+        await redis.wait_closed()
+    return ClientState(data=json.loads(data.decode()) if data else {}, ttl=ttl)
+
+
+async def _request_context(network: _Network, client_state: Optional[ClientState]) -> ClientState:
+    session = _FakeSession(network)
+    async with session:  # Сессия эндпоинта (get_async_session) - выдается пулом один раз на запрос
+        context = await get_request_context(
+            request=types.SimpleNamespace(state=types.SimpleNamespace()),
+            token=TOKEN,
+            _=None,
+            session=session,
+            client_state=client_state,
+        )
+    return context.client_state
+
+
+async def _measure(network: _Network, call: Callable[[], Awaitable[Any]], requests: int, concurrency: int) -> Dict[str, Any]:
+    seconds: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def request() -> None:
+        async with semaphore:
+            started_at = time.perf_counter()
+            await call()
+            seconds.append(time.perf_counter() - started_at)
+    
+    await request()  # Прогрев
+    seconds.clear()
+    network.calls.clear()
+    started_at = time.perf_counter()
+    await asyncio.gather(*[request() for _ in range(requests)])
+    elapsed = time.perf_counter() - started_at
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "request": latency_summary(seconds),
+        "calls_per_request": {operation: count / requests for operation, count in sorted(network.calls.items())},
+    }
+
+
+async def run_benchmark(requests: int, concurrency: int, db_rtt_ms: float, redis_rtt_ms: float) -> Dict[str, Any]:
+    network = _Network(db_rtt=db_rtt_ms / 1000, redis_rtt=redis_rtt_ms / 1000)
+    session_maker, get_shared_redis_pool = user_qas_manager.async_session_maker, RedisConnector.get_shared_redis_pool
+    
+    async def shared_redis_pool() -> _FakeRedis:
+        return _FakeRedis(network)
+    
+    user_qas_manager.async_session_maker = lambda: _FakeSession(network)
+    RedisConnector.get_shared_redis_pool = shared_redis_pool
+    try:
+        body_client_state = ClientState(data={"tz": "Moscow"})
+        modes: Dict[str, Callable[[], Awaitable[Any]]] = {
+            "old_separate_session_and_pool": lambda: _old_path(network),
+            "request_context": lambda: _request_context(network, client_state=None),
+            "request_context_body_client_state": lambda: _request_context(network, client_state=body_client_state),
+        }
+        report: Dict[str, Any] = {
+            "requests": requests, "concurrency": concurrency, "db_rtt_ms": db_rtt_ms, "redis_rtt_ms": redis_rtt_ms, "modes": {},
+        }
+        for mode, call in modes.items():
+            assert (await call()).data == {"tz": "Moscow"}
+            report["modes"][mode] = await _measure(network=network, call=call, requests=requests, concurrency=concurrency)
+    finally:
+        user_qas_manager.async_session_maker, RedisConnector.get_shared_redis_pool = session_maker, get_shared_redis_pool
+    
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пользователь и состояние клиента: прежний путь против get_request_context")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--db-rtt-ms", type=float, default=0.5, help="Задержка одной операции с БД (запрос, выдача соединения)")
+    parser.add_argument("--redis-rtt-ms", type=float, default=0.3, help="Задержка одной операции с Redis (конвейер, подключение, закрытие)")
+    parser.add_argument("--output", default=None, help="Путь JSON-отчета")
+    args = parser.parse_args()
+    
+    report = asyncio.run(run_benchmark(requests=args.requests, concurrency=args.concurrency, db_rtt_ms=args.db_rtt_ms, redis_rtt_ms=args.redis_rtt_ms))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    
+    print(f'{report["requests"]} запросов, {report["concurrency"]} одновременно, БД {report["db_rtt_ms"]} ms, Redis {report["redis_rtt_ms"]} ms на операцию')
+    for mode, result in report["modes"].items():
+        calls = ", ".join(f"{operation} {count:g}" for operation, count in result["calls_per_request"].items())
+        print(f'{mode:<34} {result["requests_per_second"]:>9.1f} запр/с, p50 {result["request"]["p50_ms"]:>7.3f} ms, p99 {result["request"]["p99_ms"]:>7.3f} ms ({calls})')
+
+
+if __name__ == "__main__":
+    main()
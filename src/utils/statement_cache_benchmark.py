@@ -0,0 +1,154 @@
+"""
+Замер времени планирования запросов списков с выключенным и включенным кешем подготовленных выражений asyncpg
+(DB_STATEMENT_CACHE_SIZE / DB_DIRECT_READS): pg_stat_statements total_plan_time и total_exec_time по запросам
+CounterpartyQueryAndStatementManager.get_counterparties и NotificationQueryAndStatementManager.get_notifications.
+
+Запуск: python -m src.utils.statement_cache_benchmark [--dsn postgresql+asyncpg://...] [--iterations 2000] [--concurrency 4]
+    [--cache-size 500] [--pgbouncer] [--output statement_cache_benchmark.json]
+По умолчанию - БД из конфигурации (соединение без pgbouncer). --pgbouncer - DSN указывает на pgbouncer >= 1.21 с max_prepared_statements:
+имена выражений делаются уникальными, как у async_engine. Нужны расширение pg_stat_statements и pg_stat_statements.track_planning = on;
+перед каждым режимом вызывается pg_stat_statements_reset() (сбрасывает статистику всей БД) - запускать на стенде.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from connection_module import DATABASE_DSN_ASYNC, UnitOfWorkAsyncSession
+from src.query_and_statement.counterparty.counterparty_qas_manager import CounterpartyQueryAndStatementManager
+from src.query_and_statement.notification_qas_manager import NotificationQueryAndStatementManager
+from src.utils.benchmark_stats import latency_summary
+
+
+PAGE_SIZE = 50
+PAGES = 20
+
+STATEMENTS_QUERY = """
+    SELECT coalesce(sum(calls), 0) AS calls, coalesce(sum(plans), 0) AS plans,
+        coalesce(sum(total_plan_time), 0) AS total_plan_time, coalesce(sum(total_exec_time), 0) AS total_exec_time
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+        AND query ~* '\\m(counterparty|notification)\\M' AND query !~* 'pg_stat_statements';
+"""
+
+
+def _engine(dsn: str, cache_size: int, pgbouncer: bool, pool_size: int) -> AsyncEngine:
+    return create_async_engine(
+        dsn,
+        
+        pool_size=pool_size,
+        connect_args={
+            "prepared_statement_cache_size": cache_size,
+            "prepared_statement_name_func": (lambda: f"__asyncpg_{uuid4()}__") if pgbouncer and cache_size else None,
+        },
+    )
+
+
+async def _list_queries(session: UnitOfWorkAsyncSession) -> None:
+    """Запросы списков с разными страницами - одинаковый текст SQL, разные параметры (как в эндпоинтах)."""
+    page = random.randint(1, PAGES)
+    await CounterpartyQueryAndStatementManager.get_counterparties(
+        session=session,
+        
+        counterparty_type="ЮЛ",
+        user_uuid=None,
+        extended_output=True,
+        page=page,
+        page_size=PAGE_SIZE,
+    )
+    await NotificationQueryAndStatementManager.get_notifications(
+        session=session,
+        
+        for_admin=random.choice([True, False]),
+        page=page,
+        page_size=PAGE_SIZE,
+    )
+
+
+async def _run_mode(engine: AsyncEngine, iterations: int, concurrency: int) -> Dict[str, Any]:
+    session_maker = async_sessionmaker(engine, class_=UnitOfWorkAsyncSession, expire_on_commit=False, autoflush=False)
+    seconds: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def iteration() -> None:
+        async with semaphore:
+            async with session_maker() as session:
+                started_at = time.perf_counter()
+                await _list_queries(session)
+                seconds.append(time.perf_counter() - started_at)
+    
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT pg_stat_statements_reset();"))
+        await connection.commit()
+    
+    started_at = time.perf_counter()
+    await asyncio.gather(*[iteration() for _ in range(iterations)])
+    elapsed = time.perf_counter() - started_at
+    
+    async with engine.connect() as connection:
+        statements = (await connection.execute(text(STATEMENTS_QUERY))).one()
+    
+    return {
+        "iterations_per_second": round(iterations / elapsed, 1),
+        "iteration": latency_summary(seconds),
+        "calls": int(statements.calls),
+        "plans": int(statements.plans),
+        "total_plan_time_ms": round(float(statements.total_plan_time), 1),
+        "total_exec_time_ms": round(float(statements.total_exec_time), 1),
+        "plan_time_per_call_ms": round(float(statements.total_plan_time) / max(int(statements.calls), 1), 4),
+    }
+
+
+async def run_benchmark(dsn: str, iterations: int, concurrency: int, cache_size: int, pgbouncer: bool) -> Dict[str, Any]:
+    random.seed(44)
+    report: Dict[str, Any] = {"iterations": iterations, "concurrency": concurrency, "pgbouncer": pgbouncer, "modes": {}}
+    for mode, size in (("cache_off", 0), ("cache_on", cache_size)):
+        engine = _engine(dsn=dsn, cache_size=size, pgbouncer=pgbouncer, pool_size=concurrency)
+        try:
+            async with engine.connect() as connection:
+                track_planning = (await connection.execute(text("SELECT current_setting('pg_stat_statements.track_planning', true);"))).scalar()
+            if track_planning != "on":
+                raise SystemExit("Нужны pg_stat_statements и pg_stat_statements.track_planning = on (иначе total_plan_time = 0)")
+            
+            await _run_mode(engine=engine, iterations=min(iterations, 50), concurrency=concurrency)  # Прогрев кеша страниц и соединений пула
+            report["modes"][mode] = {"statement_cache_size": size, **await _run_mode(engine=engine, iterations=iterations, concurrency=concurrency)}
+        finally:
+            await engine.dispose()
+    
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время планирования запросов списков: кеш подготовленных выражений asyncpg выключен и включен")
+    parser.add_argument("--dsn", default=DATABASE_DSN_ASYNC, help="URL SQLAlchemy (asyncpg) стенда; по умолчанию - БД из конфигурации без pgbouncer")
+    parser.add_argument("--iterations", type=int, default=2000, help="Итераций (запрос Контрагентов + запрос Уведомлений) на режим")
+    parser.add_argument("--concurrency", type=int, default=4, help="Одновременных итераций (и размер пула)")
+    parser.add_argument("--cache-size", type=int, default=500, help="prepared_statement_cache_size во включенном режиме")
+    parser.add_argument("--pgbouncer", action="store_true", help="DSN указывает на pgbouncer >= 1.21 (уникальные имена выражений)")
+    parser.add_argument("--output", default=None, help="Путь JSON-отчета")
+    args = parser.parse_args()
+    
+    report = asyncio.run(
+        run_benchmark(dsn=args.dsn, iterations=args.iterations, concurrency=args.concurrency, cache_size=args.cache_size, pgbouncer=args.pgbouncer)
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    
+    print(f'{report["iterations"]} итераций, {report["concurrency"]} одновременно' + (" (через pgbouncer)" if report["pgbouncer"] else ""))
+    for mode, result in report["modes"].items():
+        print(
+            f'{mode:<10} вызовов {result["calls"]:>7}, планирований {result["plans"]:>7}, plan {result["total_plan_time_ms"]:>9.1f} ms '
+            f'({result["plan_time_per_call_ms"]:.4f} ms/вызов), exec {result["total_exec_time_ms"]:>9.1f} ms, '
+            f'итерация p50 {result["iteration"]["p50_ms"]:.2f} ms'
+        )
+
+
+if __name__ == "__main__":
+    main()
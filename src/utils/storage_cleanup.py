@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from connection_module import SignalConnector
+from src.query_and_statement.file_store_qas_manager import FileStoreQueryAndStatementManager
+
+
+class StorageCleanupQueue:
+    """
+    Фоновое удаление объектов и пользователей хранилища (DELCREDA SIGNAL) через таблицу задач storage_cleanup_task (outbox).
+    Задачи записываются в транзакции удаления из БД (add), поэтому не теряются при рестарте или падении процесса.
+    Опрашивающая задача забирает готовые задачи (с арендой на LEASE_SECONDS) в ограниченную очередь,
+    воркеры (не более concurrency одновременно) вызывают SIGNAL; неудачная попытка пишется в журнал и повторяется с нарастающей задержкой.
+    """
+    POLL_INTERVAL_SECONDS = 30
+    LEASE_SECONDS = 600  # Задача не выполнена за это время (процесс упал) - ее заберет другой воркер
+    MAX_RETRY_DELAY_SECONDS = 6 * 60 * 60
+    
+    __queue: Optional[asyncio.Queue] = None
+    __wake_event: Optional[asyncio.Event] = None
+    __poller: Optional[asyncio.Task] = None
+    __workers: List[asyncio.Task] = []
+    
+    @classmethod
+    def start(cls, concurrency: int) -> None:
+        concurrency = max(concurrency, 1)
+        cls.__queue = asyncio.Queue(maxsize=concurrency)
+        cls.__wake_event = asyncio.Event()
+        cls.__poller = asyncio.create_task(cls.__poll(cls.__queue, cls.__wake_event))
+        cls.__workers = [asyncio.create_task(cls.__worker(cls.__queue)) for _ in range(concurrency)]
+    
+    @classmethod
+    async def stop(cls, timeout: float = 10) -> None:
+        """Останавливает опрос, дожидается выполнения взятых задач (не дольше timeout секунд) и возвращает невыполненные в таблицу."""
+        if cls.__queue is None:
+            return
+        cls.__poller.cancel()
+        await asyncio.gather(cls.__poller, return_exceptions=True)
+        try:
+            await asyncio.wait_for(cls.__queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        for worker in cls.__workers:
+            worker.cancel()
+        await asyncio.gather(*cls.__workers, return_exceptions=True)
+        
+        unstarted_task_ids: List[int] = []
+        while not cls.__queue.empty():
+            unstarted_task_ids.append(cls.__queue.get_nowait().id)
+        if unstarted_task_ids:
+            try:
+                await FileStoreQueryAndStatementManager.postpone_storage_cleanup_tasks(task_ids=unstarted_task_ids, delay_seconds=0)
+            except Exception as e:
+                logging.warning(f"Задачи удаления из хранилища {unstarted_task_ids} не возвращены в очередь (будут взяты после окончания аренды): {e}")
+        cls.__queue, cls.__wake_event, cls.__poller, cls.__workers = None, None, None, []
+    
+    @staticmethod
+    async def add(
+        session: AsyncSession,
+        
+        paths: Iterable[str] = (),
+        s3_logins: Iterable[str] = (),
+    ) -> None:
+        """
+        Вызывать внутри unit_of_work удаления из БД: задачи фиксируются вместе с ним. После выхода из unit_of_work - wake().
+        paths - пути объектов в том виде, в котором они хранятся в БД (с префиксом "filestore/").
+        """
+        await FileStoreQueryAndStatementManager.add_storage_cleanup_tasks(
+            session=session,
+            
+            tasks=[("path", path) for path in paths] + [("s3_user", s3_login) for s3_login in s3_logins],
+        )
+    
+    @classmethod
+    def wake(cls) -> None:
+        """Забрать новые задачи сразу, не дожидаясь очередного опроса."""
+        if cls.__wake_event is not None:
+            cls.__wake_event.set()
+    
+    @classmethod
+    def qsize(cls) -> int:
+        return cls.__queue.qsize() if cls.__queue is not None else 0
+    
+    @classmethod
+    async def __poll(cls, queue: asyncio.Queue, wake_event: asyncio.Event) -> None:
+        while True:
+            wake_event.clear()
+            try:
+                tasks = await FileStoreQueryAndStatementManager.claim_storage_cleanup_tasks(
+                    limit=queue.maxsize,
+                    lease_seconds=cls.LEASE_SECONDS,
+                )
+            except Exception as e:
+                logging.warning(f"Не удалось получить задачи удаления из хранилища: {e}")
+                tasks = []
+            for task in tasks:
+                await queue.put(task)  # Очередь заполнена - ждем освобождения воркера
+            if len(tasks) == queue.maxsize:
+                continue
+            try:
+                await asyncio.wait_for(wake_event.wait(), timeout=cls.POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    
+    @classmethod
+    async def __worker(cls, queue: asyncio.Queue) -> None:
+        while True:
+            task = await queue.get()
+            try:
+                await cls.__run(task)
+            finally:
+                queue.task_done()
+    
+    @classmethod
+    async def __run(cls, task: Row) -> None:
+        try:
+            if task.kind == "path":
+                await SignalConnector.delete_s3(
+                    path=task.target.replace("filestore/", ""),
+                )
+            else:
+                await SignalConnector.remove_user_s3(
+                    username=task.target,
+                )
+        except Exception as e:
+            delay_seconds = min(cls.POLL_INTERVAL_SECONDS * 2 ** min(task.attempts, 10), cls.MAX_RETRY_DELAY_SECONDS)
+            logging.warning(f"Удаление из хранилища ({task.kind} {task.target}), попытка {task.attempts + 1}, не выполнено, повтор через {delay_seconds} с: {e}")
+            try:
+                await FileStoreQueryAndStatementManager.postpone_storage_cleanup_tasks(task_ids=[task.id], delay_seconds=delay_seconds, error=str(e))
+            except Exception as db_error:
+                logging.warning(f"Не удалось отложить задачу удаления из хранилища #{task.id} (повтор после окончания аренды): {db_error}")
+            return
+        
+        try:
+            await FileStoreQueryAndStatementManager.complete_storage_cleanup_task(task_id=task.id)
+        except Exception as e:
+            logging.warning(f"Задача удаления из хранилища #{task.id} выполнена, но не удалена из таблицы (будет повторена): {e}")
@@ -1,7 +1,7 @@
 import datetime
+from functools import lru_cache
 from typing import Optional
-
-import pytz
+from zoneinfo import ZoneInfo
 
 
 TIMEZONES = {
@@ -60,21 +60,38 @@ def __get_timezone(key: Optional[str]) -> str:
     
     return TIMEZONES[None]
 
+@lru_cache(maxsize=None)
+def get_zone(tz_city: Optional[str] = None) -> Optional[ZoneInfo]:
+    """Часовой пояс клиента (кешируется на процесс). None - UTC (в т.ч. для неизвестного tz_city)."""
+    tz: str = __get_timezone(tz_city)
+    return ZoneInfo(tz) if tz != TIMEZONES[None] else None
+
+def __format(value: datetime.datetime, zone: Optional[ZoneInfo]) -> str:
+    if zone is None:
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc)
+        return f"{value.day:02d}.{value.month:02d}.{value.year:04d} {value.hour:02d}:{value.minute:02d}:{value.second:02d} UTC"
+    
+    # Время в БД хранится в UTC без указания пояса
+    value = (value.replace(tzinfo=datetime.timezone.utc) if value.tzinfo is None else value).astimezone(zone)
+    return f"{value.day:02d}.{value.month:02d}.{value.year:04d} {value.hour:02d}:{value.minute:02d}:{value.second:02d} {value.tzname()}"
+
+def format_dt(
+    value: Optional[datetime.datetime],
+    tz_city: Optional[str] = None,
+) -> Optional[str]:
+    """Форматирует время из БД (UTC) в строку "%d.%m.%Y %H:%M:%S %Z" в часовом поясе клиента. None -> None."""
+    return __format(value, get_zone(tz_city)) if value is not None else None
+
 def convert_tz(
     utc_time_str: str,
     tz_city: Optional[str] = None,
 ) -> str:
-    tz: str = __get_timezone(tz_city)
+    """Перевод уже отформатированной строки ("%d.%m.%Y %H:%M:%S UTC"). Для datetime из БД - format_dt (без разбора строки)."""
     if tz_city is None:
         return utc_time_str
     try:
         dt_utc = datetime.datetime.strptime(utc_time_str, "%d.%m.%Y %H:%M:%S UTC")
-        utc_timezone = pytz.timezone('UTC')
-        dt_utc = utc_timezone.localize(dt_utc)
-        
-        target_tz = pytz.timezone(tz)
-        dt_target = dt_utc.astimezone(target_tz)
-        
-        return dt_target.strftime("%d.%m.%Y %H:%M:%S %Z")
+        return __format(dt_utc, get_zone(tz_city))
     except Exception as e:
         return f"Ошибка: {e}"
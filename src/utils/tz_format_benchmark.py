@@ -0,0 +1,92 @@
+"""
+Замер форматирования времени в списочных ответах: 10 000 строк по 4 метки времени в часовом поясе клиента.
+Прежний путь (strftime -> strptime в convert_tz -> pytz.localize/astimezone -> strftime) против format_dt
+(datetime из строки БД, закешированный zoneinfo-пояс, форматирование без разбора строки).
+
+Запуск: python -m src.utils.tz_format_benchmark [--rows 10000] [--repeats 5] [--tz None --tz Moscow] [--output tz_format_benchmark.json]
+БД не нужна. Прежний путь замеряется, только если установлен pytz (из requirements он убран); результаты обоих путей сравниваются.
+"""
+import argparse
+import datetime
+import json
+import random
+from typing import Any, Dict, List, Optional
+
+from src.utils.benchmark_stats import latency_summary, time_calls
+from src.utils.tz_converter import TIMEZONES, TIMEZONES_RU_ALIAS, format_dt
+
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+
+COLUMNS = 4  # created_at, updated_at, ... - меток времени в строке списка
+
+
+def legacy_convert_tz(utc_time_str: str, tz_city: Optional[str] = None) -> str:
+    """convert_tz до format_dt: строка разбирается обратно, пояса pytz ищутся на каждое значение."""
+    if tz_city is None:
+        return utc_time_str
+    if tz_city in TIMEZONES:
+        tz = TIMEZONES[tz_city]
+    elif tz_city in TIMEZONES_RU_ALIAS:
+        tz = TIMEZONES[TIMEZONES_RU_ALIAS[tz_city]]
+    else:
+        tz = TIMEZONES[None]
+    try:
+        dt_utc = datetime.datetime.strptime(utc_time_str, "%d.%m.%Y %H:%M:%S UTC")
+        dt_utc = pytz.timezone('UTC').localize(dt_utc)
+        return dt_utc.astimezone(pytz.timezone(tz)).strftime("%d.%m.%Y %H:%M:%S %Z")
+    except Exception as e:
+        return f"Ошибка: {e}"
+
+
+def _rows(rows: int) -> List[List[datetime.datetime]]:
+    random.seed(40)
+    started = datetime.datetime(2020, 1, 1)
+    return [[started + datetime.timedelta(seconds=random.randint(0, 7 * 365 * 86400)) for _ in range(COLUMNS)] for _ in range(rows)]
+
+
+def run_benchmark(rows: int, repeats: int, tz_cities: List[Optional[str]]) -> Dict[str, Any]:
+    data = _rows(rows)
+    report: Dict[str, Any] = {"rows": rows, "columns": COLUMNS, "repeats": repeats, "pytz": pytz is not None, "tz": {}}
+    for tz_city in tz_cities:
+        def new() -> List[List[Optional[str]]]:
+            return [[format_dt(value, tz_city) for value in row] for row in data]
+        
+        def legacy() -> List[List[str]]:
+            return [[legacy_convert_tz(value.strftime("%d.%m.%Y %H:%M:%S UTC"), tz_city) for value in row] for row in data]
+        
+        result: Dict[str, Any] = {"format_dt": latency_summary(time_calls(new, repeats=repeats))}
+        if pytz is not None:
+            result["legacy"] = latency_summary(time_calls(legacy, repeats=repeats))
+            result["identical_output"] = new() == legacy()
+        report["tz"][str(tz_city)] = result
+    
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Форматирование меток времени: strftime/strptime/pytz против format_dt")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tz", action="append", default=None, help="tz_city клиента (можно несколько); None - UTC")
+    parser.add_argument("--output", default=None, help="Путь JSON-отчета")
+    args = parser.parse_args()
+    
+    tz_cities = [None if tz == "None" else tz for tz in (args.tz or ["None", "Moscow"])]
+    report = run_benchmark(rows=args.rows, repeats=args.repeats, tz_cities=tz_cities)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    
+    print(f'{report["rows"]} строк x {report["columns"]} меток, p50 из {report["repeats"]} прогонов' + ("" if report["pytz"] else " (pytz не установлен - только format_dt)"))
+    for tz_city, result in report["tz"].items():
+        legacy = f'{result["legacy"]["p50_ms"]:>9.1f} ms -> ' if "legacy" in result else ""
+        identical = f', результаты совпадают: {result["identical_output"]}' if "identical_output" in result else ""
+        print(f'tz={tz_city:<14} {legacy}{result["format_dt"]["p50_ms"]:>9.1f} ms{identical}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import asyncio
+import datetime
+import zipfile
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Iterable, List, Optional, Tuple
+
+
+class _ZipOutput:
+    """Буфер-приемник для ZipFile. Не поддерживает seek/tell, поэтому ZipFile пишет архив в потоковом режиме (с data descriptor)."""
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def __produce(
+    open_stream: Callable[[], AsyncIterator[bytes]],
+    queue: asyncio.Queue,
+) -> None:
+    try:
+        async for chunk in open_stream():
+            await queue.put(chunk)
+    except Exception as e:
+        await queue.put(e)
+        return
+    await queue.put(None)
+
+
+async def stream_zip(
+    entries: Iterable[Tuple[str, Optional[datetime.datetime], Callable[[], AsyncIterator[bytes]]]],
+    concurrency: int = 4,
+    prefetch_chunks: int = 4,
+) -> AsyncIterator[bytes]:
+    """
+    Формирует ZIP-архив "на лету" без временных файлов.
+    entries - (имя файла в архиве, дата-время файла, функция открывающая поток байт файла).
+    Одновременно скачивается не более concurrency файлов, при этом в архив они пишутся строго по порядку.
+    Для каждого файла в памяти держится не более prefetch_chunks чанков.
+    """
+    entries_iter = iter(entries)
+    window: Deque[Tuple[str, Optional[datetime.datetime], asyncio.Queue, asyncio.Task]] = deque()
+    
+    def __fill_window() -> None:
+        while len(window) < max(concurrency, 1):
+            entry = next(entries_iter, None)
+            if entry is None:
+                return
+            arcname, date_time, open_stream = entry
+            queue = asyncio.Queue(maxsize=max(prefetch_chunks, 1))
+            task = asyncio.create_task(__produce(open_stream, queue))
+            window.append((arcname, date_time, queue, task))
+    
+    output = _ZipOutput()
+    try:
+        with zipfile.ZipFile(output, mode="w", compression=zipfile.ZIP_STORED) as zf:
+            __fill_window()
+            while window:
+                arcname, date_time, queue, _ = window[0]
+                
+                zip_info = zipfile.ZipInfo(
+                    filename=arcname,
+                    date_time=(date_time or datetime.datetime.now(tz=datetime.timezone.utc)).timetuple()[:6],
+                )
+                zip_info.compress_type = zipfile.ZIP_STORED
+                with zf.open(zip_info, mode="w", force_zip64=True) as zip_entry:
+                    while True:
+                        chunk = await queue.get()
+                        if chunk is None:
+                            break
+                        if isinstance(chunk, Exception):
+                            raise chunk
+                        zip_entry.write(chunk)
+                        
+                        data = output.drain()
+                        if data:
+                            yield data
+                
+                window.popleft()
+                __fill_window()
+                
+                data = output.drain()
+                if data:
+                    yield data
+        
+        data = output.drain()  # central directory
+        if data:
+            yield data
+    finally:
+        for _, _, _, task in window:
+            task.cancel()
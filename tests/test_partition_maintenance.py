@@ -0,0 +1,123 @@
+"""
+Срок хранения errlog, пока таблица не переведена на партиционирование: устаревшие строки удаляются пачками, партиции не трогаются.
+
+Запуск: python -m unittest discover -s tests
+"""
+import datetime
+import unittest
+from typing import Any, Dict, List, Optional, Tuple
+from unittest import mock
+
+from src.utils import partition_maintenance
+from src.utils.partition_maintenance import PartitionMaintenance
+
+
+class _FakeResult:
+    def __init__(self, scalar: Any = None, rows: Optional[List[Tuple[Any, ...]]] = None, rowcount: int = 0) -> None:
+        self.__scalar, self.__rows, self.rowcount = scalar, rows or [], rowcount
+    
+    def scalar(self) -> Any:
+        return self.__scalar
+    
+    def all(self) -> List[Tuple[Any, ...]]:
+        return self.__rows
+
+
+class _FakeConnection:
+    """Записывает выполненные выражения; relkind - вид таблицы в pg_class ('r' - обычная, 'p' - партиционированная)."""
+    def __init__(self, engine: "_FakeEngine") -> None:
+        self.engine = engine
+    
+    async def execute(self, statement: Any, parameters: Optional[Dict[str, Any]] = None) -> _FakeResult:
+        sql = str(statement)
+        self.engine.statements.append((sql, parameters or {}))
+        if "advisory" in sql:
+            return _FakeResult(scalar=self.engine.lock_available)
+        if "relkind" in sql:
+            return _FakeResult(scalar=self.engine.relkind)
+        if sql.startswith("DELETE"):
+            return _FakeResult(rowcount=self.engine.expired_rows.pop(0) if self.engine.expired_rows else 0)
+        return _FakeResult()
+
+
+class _FakeEngine:
+    def __init__(self, relkind: str, expired_rows: List[int], lock_available: bool = True) -> None:
+        self.relkind, self.expired_rows, self.lock_available = relkind, expired_rows, lock_available
+        self.statements: List[Tuple[str, Dict[str, Any]]] = []
+        self.transactions = 0
+    
+    def begin(self) -> "_FakeEngine":
+        return self
+    
+    async def __aenter__(self) -> _FakeConnection:
+        self.transactions += 1
+        return _FakeConnection(self)
+    
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+    
+    def sql(self, prefix: str) -> List[Tuple[str, Dict[str, Any]]]:
+        return [(sql, parameters) for sql, parameters in self.statements if sql.lstrip().startswith(prefix)]
+
+
+class DeleteExpiredRowsTest(unittest.IsolatedAsyncioTestCase):
+    TABLES = [("message", 0, False), ("notification", 30, False), ("errlog", 90, True)]
+    
+    async def __delete(self, engine: _FakeEngine, batch_size: int = 3) -> int:
+        with mock.patch.object(partition_maintenance, "async_engine", engine), \
+                mock.patch.object(PartitionMaintenance, "TABLES", self.TABLES), \
+                mock.patch.object(PartitionMaintenance, "DELETE_BATCH_SIZE", batch_size):
+            return await PartitionMaintenance.delete_expired_rows()
+    
+    async def test_plain_table_deletes_expired_rows_in_batches(self) -> None:
+        engine = _FakeEngine(relkind="r", expired_rows=[3, 3, 1])
+        started_at = datetime.datetime.now(datetime.timezone.utc)
+        
+        self.assertEqual(await self.__delete(engine), 7)
+        
+        deletes = engine.sql("DELETE")
+        self.assertEqual(len(deletes), 3)  # Последняя пачка неполная - удаление закончено
+        self.assertEqual(engine.transactions, 3)  # Каждая пачка - в своей транзакции
+        for sql, parameters in deletes:
+            self.assertIn("DELETE FROM errlog", sql)
+            self.assertIn("created_at < :expired_before", sql)
+            self.assertEqual(parameters["batch_size"], 3)
+            cutoff = started_at - datetime.timedelta(days=90)
+            self.assertLess(abs(parameters["expired_before"] - cutoff), datetime.timedelta(minutes=1))
+        self.assertEqual(engine.sql("DROP"), [])
+        self.assertEqual(engine.sql("ALTER"), [])
+    
+    async def test_archived_tables_are_not_deleted(self) -> None:
+        engine = _FakeEngine(relkind="r", expired_rows=[0])
+        
+        await self.__delete(engine)
+        
+        self.assertFalse([sql for sql, _ in engine.sql("DELETE") if "errlog" not in sql])
+    
+    async def test_partitioned_table_is_left_to_run(self) -> None:
+        engine = _FakeEngine(relkind="p", expired_rows=[3])
+        
+        self.assertEqual(await self.__delete(engine), 0)
+        self.assertEqual(engine.sql("DELETE"), [])
+    
+    async def test_other_worker_holds_lock(self) -> None:
+        engine = _FakeEngine(relkind="r", expired_rows=[3], lock_available=False)
+        
+        self.assertEqual(await self.__delete(engine), 0)
+        self.assertEqual(engine.sql("DELETE"), [])
+
+
+class RunPlainTableTest(unittest.IsolatedAsyncioTestCase):
+    async def test_run_skips_partition_ddl_for_plain_table(self) -> None:
+        engine = _FakeEngine(relkind="r", expired_rows=[])
+        
+        with mock.patch.object(partition_maintenance, "async_engine", engine):
+            await PartitionMaintenance.run(wait=True)
+        
+        self.assertEqual(engine.sql("CREATE"), [])
+        self.assertEqual(engine.sql("DROP"), [])
+        self.assertEqual(engine.sql("ALTER"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()